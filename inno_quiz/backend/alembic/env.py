@@ -0,0 +1,65 @@
+"""
+Alembic environment: migrates the database configured in `settings.DATABASE_URL`
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from backend.config import settings
+from backend.models import Base
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """
+    Emit the migration SQL to the script output without a database connection
+    """
+    context.configure(
+        url=str(settings.DATABASE_URL),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """
+    Run the migrations on a live connection.
+    A connection passed by the caller (see `init_db.py`) is used as is
+    """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_on_connection(connection)
+        return
+
+    engine = create_engine(str(settings.DATABASE_URL), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        _run_on_connection(connection)
+
+
+def _run_on_connection(connection) -> None:
+    # Batch mode lets ALTER-style operations work on SQLite
+    context.configure(
+        connection=connection, target_metadata=target_metadata, render_as_batch=True
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
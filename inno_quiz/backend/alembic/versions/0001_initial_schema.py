@@ -0,0 +1,89 @@
+"""Initial schema, as created by `init_db.py` before migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("username", sa.String(length=64), nullable=False),
+        sa.Column("password", sa.String(length=128), nullable=False),
+        sa.PrimaryKeyConstraint("username"),
+    )
+    op.create_table(
+        "quizzes",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("author_username", sa.String(length=64), nullable=False),
+        sa.Column("name", sa.String(length=128), nullable=False),
+        sa.Column("category", sa.String(length=64), nullable=False),
+        sa.Column("is_submitted", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["author_username"], ["users.username"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "questions",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("quiz_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("text", sa.String(length=512), nullable=False),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "answer_options",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("text", sa.String(length=512), nullable=False),
+        sa.Column("is_correct", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "user_attempts",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("username", sa.String(length=64), nullable=False),
+        sa.Column("quiz_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("completion_time", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"]),
+        sa.ForeignKeyConstraint(["username"], ["users.username"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "user_answers",
+        sa.Column("attempt_id", sa.Integer(), nullable=False),
+        sa.Column("question_id", sa.String(), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(), nullable=False),
+        sa.Column("selected_options", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["attempt_id"], ["user_attempts.id"]),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+        sa.PrimaryKeyConstraint("attempt_id", "question_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_answers")
+    op.drop_table("user_attempts")
+    op.drop_table("answer_options")
+    op.drop_table("questions")
+    op.drop_table("quizzes")
+    op.drop_table("users")
@@ -0,0 +1,48 @@
+"""Index foreign keys used in hot lookups and the leaderboard ordering
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Databases created with `create_all` after the leaderboard index was added
+# to the model already have it, so every index is created only if missing
+INDEXES = [
+    ("ix_quizzes_author_username", "quizzes", ["author_username"]),
+    ("ix_questions_quiz_id", "questions", ["quiz_id"]),
+    ("ix_answer_options_question_id", "answer_options", ["question_id"]),
+    ("ix_user_attempts_username", "user_attempts", ["username"]),
+    (
+        "ix_user_attempts_quiz_score_time",
+        "user_attempts",
+        ["quiz_id", "score", "completion_time"],
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build PostgreSQL indexes without locking out writes on live tables;
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, if_not_exists=True, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,47 @@
+"""Add the local bank of Open Trivia DB questions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "question_bank",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("category", sa.String(length=128), nullable=False),
+        sa.Column("type", sa.String(length=16), nullable=False),
+        sa.Column("difficulty", sa.String(length=16), nullable=False),
+        sa.Column("question", sa.String(length=512), nullable=False),
+        sa.Column("correct_answer", sa.String(length=512), nullable=False),
+        sa.Column("incorrect_answers", sa.String(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("question"),
+    )
+    op.create_index(
+        "ix_question_bank_category_difficulty",
+        "question_bank",
+        ["category_id", "difficulty"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_question_bank_category_difficulty", table_name="question_bank")
+    op.drop_table("question_bank")
@@ -0,0 +1,31 @@
+"""Record which worker runs an import job
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("import_jobs", sa.Column("owner", sa.String(length=64), nullable=True))
+    op.add_column("import_jobs", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("import_jobs") as batch_op:
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("owner")
@@ -0,0 +1,56 @@
+"""Index attempts in the exact leaderboard order
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build the PostgreSQL index without locking out submissions, then drop
+    # the one it replaces; CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_attempts_leaderboard",
+            "user_attempts",
+            ["quiz_id", sa.text("score DESC"), "completion_time", "id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_user_attempts_quiz_score_time",
+            table_name="user_attempts",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_attempts_quiz_score_time",
+            "user_attempts",
+            ["quiz_id", "score", "completion_time"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_user_attempts_leaderboard",
+            table_name="user_attempts",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -1,10 +1,13 @@
-from .jwt import create_access_token, get_current_user, TokenData
+from .jwt import create_access_token, decode_principal, get_current_user, TokenData
 from .password import get_password_hash, verify_password
+from .token_cache import token_cache
 
 __all__ = [
     "create_access_token",
+    "decode_principal",
     "get_current_user",
     "TokenData",
     "get_password_hash",
-    "verify_password"
+    "verify_password",
+    "token_cache",
 ]
@@ -0,0 +1,176 @@
+"""
+Password hashing on a dedicated process pool
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from backend.config import settings
+
+from .password import (
+    calibrate_rounds,
+    get_hash_rounds,
+    get_password_hash,
+    set_hash_rounds,
+    verify_and_update,
+    verify_password,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_context() -> multiprocessing.context.BaseContext:
+    """
+    Start workers from a clean process: by the first login the API process
+    runs threads, and a forked child could inherit locks they were holding
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # The server imports the hashing code once, workers fork from it ready to run
+        context.set_forkserver_preload([get_password_hash.__module__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class HasherBusyError(Exception):
+    """
+    Too many hashing jobs are waiting for a worker
+    """
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in worker processes, so hashing uses all cores instead of
+    holding the GIL and the request thread pool.
+
+    At most `workers` jobs run at once and `queue_limit` more may wait;
+    further jobs are rejected with HasherBusyError instead of queueing
+    without bound. The pool starts with the first job.
+    """
+
+    def __init__(self, workers: int = 2, queue_limit: int = 64):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.completed = 0
+        self.rejected = 0
+        self.pending = 0
+        self.max_pending = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = Lock()
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password
+        """
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Check a password against its hash
+        """
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password against its hash, with a new hash
+        when the stored one was made at another cost
+        """
+        return await self._run(verify_and_update, plain_password, hashed_password)
+
+    def set_rounds(self, rounds: int) -> None:
+        """
+        Use another bcrypt cost for new hashes, running workers are replaced
+        """
+        set_hash_rounds(rounds)
+        self.shutdown()
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self.pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise HasherBusyError("Password hashing queue is full")
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=_worker_context(),
+                    initializer=set_hash_rounds,
+                    initargs=(get_hash_rounds(),),
+                )
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+            started = time.perf_counter()
+            try:
+                future = self._executor.submit(func, *args)
+            except Exception:
+                self.pending -= 1
+                raise
+        future.add_done_callback(lambda done: self._finished(done, started))
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, future: Future, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.pending -= 1
+            if not future.cancelled() and future.exception() is None:
+                self.completed += 1
+                self.total_seconds += elapsed
+                self.max_seconds = max(self.max_seconds, elapsed)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Queue depth, rejections and latency of completed jobs, including queueing
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_latency_ms": (
+                    1000 * self.total_seconds / self.completed if self.completed else 0.0
+                ),
+                "max_latency_ms": 1000 * self.max_seconds,
+            }
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes, a later job starts a new pool
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def configure_hash_cost() -> None:
+    """
+    Set the bcrypt cost from the settings, calibrating it
+    to PASSWORD_HASH_TARGET_MS when configured
+    """
+    rounds = settings.PASSWORD_HASH_ROUNDS
+    if settings.PASSWORD_HASH_TARGET_MS is not None:
+        rounds = calibrate_rounds(settings.PASSWORD_HASH_TARGET_MS)
+        logger.info(
+            "Calibrated bcrypt to %d rounds for %.0f ms hashes",
+            rounds, settings.PASSWORD_HASH_TARGET_MS,
+        )
+    password_hasher.set_rounds(rounds)
+
+
+# Create a singleton instance
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
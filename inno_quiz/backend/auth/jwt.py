@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from backend.config import settings
 from backend.db import get_db
+from backend.domain.auth import Principal
 from backend.repo.user import get_user_by_username
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="v1/users/login")
@@ -20,15 +21,33 @@ class TokenData(BaseModel):
 
 def create_access_token(data: dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
+    now = datetime.now(UTC)
     if expires_delta:
-        expire = datetime.now(UTC) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+def decode_principal(token: str) -> Principal:
+    """
+    Verify a token and build the principal from its claims.
+    Raises JWTError for invalid or expired tokens and tokens without a subject
+    """
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    username = payload.get("sub")
+    if not isinstance(username, str) or username.strip() == "" or "exp" not in payload:
+        raise JWTError("Token has no subject or expiry")
+    issued_at = payload.get("iat")
+    return Principal(
+        username=username,
+        expires_at=datetime.fromtimestamp(payload["exp"], UTC),
+        issued_at=datetime.fromtimestamp(issued_at, UTC) if issued_at is not None else None,
+    )
+
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
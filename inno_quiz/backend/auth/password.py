@@ -1,6 +1,16 @@
+import time
+from typing import Optional, Tuple
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib's default bcrypt cost, used unless a cost or target time is configured
+DEFAULT_ROUNDS = 12
+# Calibration never goes below this cost, whatever the target time
+MIN_ROUNDS = 10
+MAX_ROUNDS = 18
+
+# Hashes made at another cost report needs_update and are rehashed on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=DEFAULT_ROUNDS)
 
 
 def get_password_hash(password: str) -> str:
@@ -9,3 +19,40 @@ def get_password_hash(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password and return a new hash when the stored one
+    was made at another cost than the current one
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def get_hash_rounds() -> int:
+    return pwd_context.to_dict()["bcrypt__rounds"]
+
+
+def set_hash_rounds(rounds: int) -> None:
+    pwd_context.update(bcrypt__rounds=rounds)
+
+
+def calibrate_rounds(
+    target_ms: float, min_rounds: int = MIN_ROUNDS, max_rounds: int = MAX_ROUNDS
+) -> int:
+    """
+    Find the highest bcrypt cost hashing within target_ms on this machine.
+    Every extra round doubles the work, so one measured cost predicts the others
+    """
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=min_rounds)
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        context.hash("calibration")
+        timings.append(time.perf_counter() - started)
+    base_ms = min(timings) * 1000
+
+    rounds = min_rounds
+    while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+        rounds += 1
+    return rounds
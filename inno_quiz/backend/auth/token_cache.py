@@ -0,0 +1,238 @@
+"""
+Verified access tokens cached in process memory
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, UTC
+from threading import Lock
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.config import settings
+from backend.domain.auth import Principal
+from backend.service.cache_backend import CacheBackend, CacheBackendError, create_cache_backend
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "token-revocations"
+
+
+class TokenCache:
+    """
+    LRU cache of principals of verified tokens, keyed by the SHA-256 digest
+    of the token so raw tokens are not kept in memory.
+
+    Entries never outlive the `exp` claim of their token. Users whose
+    credentials are no longer valid, e.g. deleted users, must be revoked
+    explicitly: their cached tokens are dropped and tokens issued before the
+    revocation are rejected until they would have expired.
+
+    With a shared backend revocations reach the other workers: they are
+    published to drop the cached tokens there, and stored for the token
+    lifetime so a worker that missed the message still rejects the tokens
+    it verifies next. Missed messages are covered by dropping every cached
+    token on (re)subscription. Reading stored revocations blocks on the
+    backend: `get` runs off the event loop, `get_async` hands that read to
+    the threadpool.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        token_lifetime: timedelta = timedelta(hours=2),
+        shared: Optional[CacheBackend] = None,
+    ):
+        self.max_entries = max_entries
+        self.token_lifetime = token_lifetime
+        self.shared: Optional[CacheBackend] = None
+        self.hits = 0
+        self.misses = 0
+        self._principals: "OrderedDict[str, Principal]" = OrderedDict()
+        self._digests_by_user: Dict[str, Set[str]] = {}
+        self._revoked: Dict[str, datetime] = {}
+        self._lock = Lock()
+        self.connect(shared)
+
+    def connect(self, shared: Optional[CacheBackend]) -> None:
+        """
+        Share revocations through a backend and subscribe
+        to those other workers publish on it
+        """
+        self.shared = shared
+        if shared is not None:
+            shared.subscribe(
+                REVOCATION_CHANNEL, self._on_revocation, on_subscribe=self._drop_principals
+            )
+
+    def start(self) -> None:
+        """
+        Connect to the shared cache configured by CACHE_BACKEND, if any
+        """
+        self.connect(create_cache_backend())
+
+    def close(self) -> None:
+        """
+        Stop sharing revocations and release the backend
+        """
+        shared, self.shared = self.shared, None
+        if shared is not None:
+            shared.close()
+
+    def get(self, token: str, loader: Callable[[], Principal]) -> Optional[Principal]:
+        """
+        Get the principal of a token, calling loader to verify it on a miss.
+        Returns None for tokens of revoked users; errors of loader propagate
+        and invalid tokens are not cached
+        """
+        principal, digest = self._lookup(token)
+        if principal is not None:
+            return principal
+        principal = loader()
+        if self.shared is not None:
+            self._get_shared(self.shared, principal.username)
+        return self._store(digest, principal)
+
+    async def get_async(self, token: str, loader: Callable[[], Principal]) -> Optional[Principal]:
+        """
+        Variant of `get` reading the revocations of the shared backend from the threadpool
+        """
+        principal, digest = self._lookup(token)
+        if principal is not None:
+            return principal
+        principal = loader()
+        if self.shared is not None:
+            await run_in_threadpool(self._get_shared, self.shared, principal.username)
+        return self._store(digest, principal)
+
+    def revoke_user(self, username: str) -> None:
+        """
+        Reject the tokens of a user issued up to now, on every worker
+        sharing the cache backend
+        """
+        revoked_at = datetime.now(UTC)
+        self._revoke(username, revoked_at)
+        if self.shared is None:
+            return
+        message = {"username": username, "revoked_at": revoked_at.isoformat()}
+        try:
+            self.shared.set(
+                self._shared_key(username),
+                revoked_at.isoformat().encode(),
+                self.token_lifetime.total_seconds(),
+            )
+            self.shared.publish(REVOCATION_CHANNEL, json.dumps(message).encode())
+        except CacheBackendError as e:
+            logger.warning("Token revocation of %s not shared: %s", username, e)
+
+    def clear(self) -> None:
+        """
+        Drop all principals and revocations and reset counters
+        """
+        with self._lock:
+            self._principals.clear()
+            self._digests_by_user.clear()
+            self._revoked.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit and miss counters with the current number of cached tokens
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._principals)}
+
+    def _lookup(self, token: str) -> Tuple[Optional[Principal], str]:
+        """
+        Get the unexpired principal of a token and the digest of the token
+        """
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        with self._lock:
+            principal = self._principals.get(digest)
+            if principal is not None:
+                if principal.expires_at > datetime.now(UTC):
+                    self._principals.move_to_end(digest)
+                    self.hits += 1
+                    return principal, digest
+                self._remove(digest)
+            self.misses += 1
+            return None, digest
+
+    def _store(self, digest: str, principal: Principal) -> Optional[Principal]:
+        with self._lock:
+            # Checked under the lock, a concurrent revocation is never missed
+            if self._is_revoked(principal):
+                return None
+            if principal.expires_at > datetime.now(UTC):
+                if digest in self._principals:
+                    self._remove(digest)
+                self._principals[digest] = principal
+                self._digests_by_user.setdefault(principal.username, set()).add(digest)
+                if len(self._principals) > self.max_entries:
+                    self._remove(next(iter(self._principals)))
+        return principal
+
+    def _revoke(self, username: str, revoked_at: datetime) -> None:
+        with self._lock:
+            for digest in list(self._digests_by_user.get(username, ())):
+                self._remove(digest)
+            self._revoked[username] = max(revoked_at, self._revoked.get(username, revoked_at))
+            # Tokens issued before older revocations have expired by now
+            expired = datetime.now(UTC) - self.token_lifetime
+            for revoked, earlier in list(self._revoked.items()):
+                if earlier < expired:
+                    del self._revoked[revoked]
+
+    def _is_revoked(self, principal: Principal) -> bool:
+        revoked_at = self._revoked.get(principal.username)
+        if revoked_at is None:
+            return False
+        # The issue time has a one second resolution, tokens of that second are rejected
+        return principal.issued_at is None or principal.issued_at <= revoked_at
+
+    def _remove(self, digest: str) -> None:
+        principal = self._principals.pop(digest)
+        digests = self._digests_by_user[principal.username]
+        digests.discard(digest)
+        if not digests:
+            del self._digests_by_user[principal.username]
+
+    @staticmethod
+    def _shared_key(username: str) -> str:
+        return f"revoked:{username}"
+
+    def _get_shared(self, shared: CacheBackend, username: str) -> None:
+        """
+        Apply a revocation of username stored by another worker
+        """
+        try:
+            (stored,) = shared.get_many([self._shared_key(username)])
+        except CacheBackendError as e:
+            logger.warning("Shared token revocations unavailable: %s", e)
+            return
+        if stored is not None:
+            self._revoke(username, datetime.fromisoformat(stored.decode()))
+
+    def _on_revocation(self, message: bytes) -> None:
+        payload = json.loads(message)
+        self._revoke(payload["username"], datetime.fromisoformat(payload["revoked_at"]))
+
+    def _drop_principals(self) -> None:
+        """
+        Drop tokens cached while the subscription was down,
+        they are checked against the stored revocations again
+        """
+        with self._lock:
+            self._principals.clear()
+            self._digests_by_user.clear()
+
+
+# Create a singleton instance
+token_cache = TokenCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    token_lifetime=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+)
@@ -0,0 +1,158 @@
+"""
+Throughput of the sync (thread pool) and async (AsyncSession) routes.
+
+The same leaderboard read is served by a `def` route on a Session and by an
+`async def` route on an AsyncSession, and each route is driven by the given
+number of concurrent clients over an in-process ASGI transport.
+
+The async route awaits its statements and takes no thread per request.
+On SQLite, aiosqlite still runs every connection on a thread of its own and
+hands each statement over to it, so the async stack is not expected to
+serve more requests per second there; point --database-url at PostgreSQL
+to compare the stacks against a network database.
+
+Run from inno_quiz/backend with the project installed:
+
+    python -m backend.benchmarks.async_throughput --clients 500 --requests 5000
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+from uuid import uuid4
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import repo
+from backend.db import get_async_url
+from backend.domain.question_request import QuestionRequest
+from backend.models import Base, Quiz, User
+from backend.service import quiz as quiz_service, quiz_async
+
+
+def seed(database_url: str, attempts: int) -> str:
+    """
+    Create the schema and a quiz with questions and attempts, return the quiz id
+    """
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        author = User(username="bench_author", password="hashed")
+        quiz = Quiz(id=uuid4(), name="Bench Quiz", category="9", author=author)
+        db.add_all([author, quiz])
+        db.commit()
+        questions = [
+            QuestionRequest(text=f"Q{i}?", options=["A", "B", "C"], correct_options=[0])
+            for i in range(20)
+        ]
+        repo.question.bulk_create_with_options(db, quiz.id, questions)
+        for i in range(attempts):
+            repo.user_attempt.create_with_answers(
+                db,
+                username=author.username,
+                quiz_id=quiz.id,
+                score=i % 21,
+                completion_time=float(i % 97),
+                answers=[],
+            )
+        quiz_id = str(quiz.id)
+    engine.dispose()
+    return quiz_id
+
+
+def build_app(database_url: str, pool_size: int) -> FastAPI:
+    """
+    Application with the same read served by the sync and the async stack
+    """
+    engine = create_engine(database_url, pool_size=pool_size, max_overflow=0)
+    session_factory = sessionmaker(expire_on_commit=False, bind=engine)
+    async_engine = create_async_engine(
+        get_async_url(database_url), pool_size=pool_size, max_overflow=0
+    )
+    async_session_factory = async_sessionmaker(expire_on_commit=False, bind=async_engine)
+
+    app = FastAPI()
+
+    @app.get("/sync/{quiz_id}")
+    def sync_leaderboard(quiz_id: str):
+        with session_factory() as db:
+            return quiz_service.get_leaderboard(quiz_id, db=db, limit=10)
+
+    @app.get("/async/{quiz_id}")
+    async def async_leaderboard(quiz_id: str):
+        async with async_session_factory() as db:
+            return await quiz_async.get_leaderboard(quiz_id, db=db, limit=10)
+
+    return app
+
+
+async def drive(app: FastAPI, url: str, clients: int, requests: int) -> dict:
+    """
+    Send `requests` GETs to `url` from `clients` concurrent clients
+    """
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def client(http: httpx.AsyncClient) -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await http.get(url)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=20)
+    parser.add_argument(
+        "--database-url",
+        help="benchmark against this database instead of a temporary SQLite file",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        quiz_id = seed(database_url, args.attempts)
+        app = build_app(database_url, args.pool_size)
+
+        print(f"{args.clients} clients, {args.requests} requests per stack")
+        print(f"{'stack':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for stack in ("sync", "async"):
+            result = asyncio.run(drive(app, f"/{stack}/{quiz_id}", args.clients, args.requests))
+            print(
+                f"{stack:<8}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}"
+                f"{result['p99_ms']:>10.1f}{result['errors']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Micro-benchmarks of password hashing and JWT handling.
+
+Times `get_password_hash`, `verify_password`, `create_access_token` and
+decoding the token as the cookie dependency does, so login latency can be
+split into hashing and token work. Also prints the time of one hash per
+bcrypt cost and the cost `PASSWORD_HASH_TARGET_MS` would pick.
+
+Run from inno_quiz/backend with the project installed:
+
+    python -m backend.benchmarks.auth --rounds 12 --target-ms 250
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from passlib.context import CryptContext
+
+from backend.auth.jwt import create_access_token, decode_principal
+from backend.auth.password import (
+    MIN_ROUNDS,
+    calibrate_rounds,
+    get_password_hash,
+    set_hash_rounds,
+    verify_password,
+)
+
+
+def measure(func: Callable[[], object], repeat: int) -> List[float]:
+    """
+    Run func repeat times and return the duration of each call in milliseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> float:
+    median = statistics.median(timings)
+    p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+    print(f"{name:<22}{len(timings):>8}{median:>12.3f}{p95:>12.3f}{1000 / median:>12.0f}")
+    return median
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost to benchmark")
+    parser.add_argument("--hash-repeat", type=int, default=10)
+    parser.add_argument("--jwt-repeat", type=int, default=10_000)
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    args = parser.parse_args()
+    set_hash_rounds(args.rounds)
+
+    hashed = get_password_hash("benchmark-password")
+    token = create_access_token({"sub": "bench_user"})
+
+    print(f"bcrypt cost {args.rounds}")
+    print(f"{'operation':<22}{'calls':>8}{'p50 ms':>12}{'p95 ms':>12}{'ops/s':>12}")
+    report("get_password_hash", measure(lambda: get_password_hash("pw"), args.hash_repeat))
+    verify = report(
+        "verify_password",
+        measure(lambda: verify_password("benchmark-password", hashed), args.hash_repeat),
+    )
+    create = report(
+        "create_access_token",
+        measure(lambda: create_access_token({"sub": "bench_user"}), args.jwt_repeat),
+    )
+    decode = report("decode_principal", measure(lambda: decode_principal(token), args.jwt_repeat))
+    print(f"hashing share of login: {100 * verify / (verify + create):.2f}%")
+    print(f"token work per authenticated request: {decode:.3f} ms")
+
+    print()
+    print(f"{'cost':<8}{'hash ms':>10}")
+    for rounds in range(MIN_ROUNDS, args.rounds + 3):
+        context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        print(f"{rounds:<8}{min(measure(lambda: context.hash('pw'), 2)):>10.1f}")
+    print(f"cost for a {args.target_ms:.0f} ms target: {calibrate_rounds(args.target_ms)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Concurrent quiz submissions and leaderboard reads on SQLite, default vs tuned.
+
+Writer threads submit attempts the way `submit_quiz_answers` does: read the
+answer key, then store the attempt with its answers in one transaction.
+Reader threads page the leaderboard at the same time. Both run once on an
+engine with SQLite defaults (rollback journal, driver-managed transactions)
+and once on the engine from `backend.db.create_db_engine` with the PRAGMA
+profile and BEGIN IMMEDIATE for writers.
+
+Run from inno_quiz/backend with the project installed:
+
+    python -m backend.benchmarks.sqlite_concurrency --writers 16 --readers 16
+"""
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import create_engine, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend import repo
+from backend.benchmarks.async_throughput import seed
+from backend.db import WRITER_OPTIONS, create_db_engine
+
+
+class Worker(threading.Thread):
+    """
+    Thread running one kind of transaction until the deadline
+    """
+
+    def __init__(self, engine: Engine, quiz_id: UUID, deadline: float, write: bool):
+        super().__init__()
+        self.session_factory = sessionmaker(expire_on_commit=False, bind=engine)
+        self.quiz_id = quiz_id
+        self.deadline = deadline
+        self.write = write
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def run(self) -> None:
+        while time.perf_counter() < self.deadline:
+            started = time.perf_counter()
+            try:
+                with self.session_factory() as db:
+                    if self.write:
+                        self.submit(db)
+                    else:
+                        repo.user_attempt.get_leaderboard_page(db, self.quiz_id, limit=10)
+            except OperationalError:
+                # "database is locked" after the busy timeout
+                self.errors += 1
+                continue
+            self.latencies.append(time.perf_counter() - started)
+
+    def submit(self, db) -> None:
+        answer_key = repo.question.get_answer_key(db, self.quiz_id)
+        repo.user_attempt.create_with_answers(
+            db,
+            username="bench_author",
+            quiz_id=self.quiz_id,
+            score=len(answer_key) // 2,
+            completion_time=12.5,
+            answers=[(question_id, [0]) for question_id in answer_key],
+        )
+
+
+def run(engine: Engine, write_engine: Engine, quiz_id: UUID, args) -> dict:
+    """
+    Run writer and reader threads for the configured duration
+    """
+    deadline = time.perf_counter() + args.seconds
+    workers = [Worker(write_engine, quiz_id, deadline, True) for _ in range(args.writers)]
+    workers += [Worker(engine, quiz_id, deadline, False) for _ in range(args.readers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    result = {}
+    for kind, write in (("writes", True), ("reads", False)):
+        latencies = [lat for w in workers if w.write == write for lat in w.latencies]
+        errors = sum(w.errors for w in workers if w.write == write)
+        p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else 0.0
+        result[kind] = (len(latencies) / args.seconds, p99 * 1000, errors)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--attempts", type=int, default=500)
+    args = parser.parse_args()
+    pool = {"pool_size": args.writers + args.readers, "max_overflow": 0}
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds}s per profile")
+    print(f"{'profile':<9}{'kind':<8}{'tx/s':>10}{'p99 ms':>10}{'errors':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in ("default", "tuned"):
+            database_url = f"sqlite:///{Path(tmp) / f'{profile}.db'}"
+            quiz_id = UUID(seed(database_url, args.attempts))
+            if profile == "default":
+                engine = write_engine = create_engine(database_url, **pool)
+            else:
+                engine = create_db_engine(database_url, **pool)
+                write_engine = engine.execution_options(**WRITER_OPTIONS)
+
+            result = run(engine, write_engine, quiz_id, args)
+            engine.dispose()
+            for kind, (rate, p99, errors) in result.items():
+                print(f"{profile:<9}{kind:<8}{rate:>10.1f}{p99:>10.1f}{errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
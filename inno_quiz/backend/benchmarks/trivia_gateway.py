@@ -0,0 +1,80 @@
+"""
+Trivia gateway against a local stub of Open Trivia DB that injects latency.
+
+Compares one-off `requests.get` calls, which open a connection per request,
+with the gateway's pooled session, then shows how long a caller waits on a
+hanging upstream: bounded by the read timeout and retries while the circuit
+breaker is closed, immediate once it is open. The stub speaks plain HTTP,
+so the pooled numbers exclude the TLS handshakes saved against the real API.
+
+Run from inno_quiz/backend with the project installed:
+
+    python -m backend.benchmarks.trivia_gateway --latency 0.02 --requests 50
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+import requests
+
+from backend.gateways.trivia import CircuitBreaker, TriviaGateway
+from backend.tests.trivia_stub import StubTriviaServer
+
+
+def measure(func: Callable[[], object], repeat: int) -> List[float]:
+    """
+    Run func repeat times and return the duration of each call in milliseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            func()
+        except (ConnectionError, ValueError):
+            pass
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> None:
+    print(f"{name:<34}{statistics.median(timings):>10.1f}{max(timings):>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.02, help="stub answer delay, s")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--hang", type=float, default=5.0, help="delay of a hanging upstream")
+    parser.add_argument("--read-timeout", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = StubTriviaServer(delay=args.latency).start()
+    try:
+        print(f"{'client':<34}{'p50 ms':>10}{'max ms':>10}")
+        connections = server.connections
+        report(
+            "requests.get per call",
+            measure(lambda: requests.get(server.url, params={"amount": 1}), args.requests),
+        )
+        print(f"  connections opened: {server.connections - connections}")
+
+        gateway = TriviaGateway(base_url=server.url)
+        connections = server.connections
+        report("pooled gateway", measure(lambda: gateway.get_questions(amount=1), args.requests))
+        print(f"  connections opened: {server.connections - connections}")
+
+        server.delay = args.hang
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        gateway = TriviaGateway(
+            base_url=server.url, read_timeout=args.read_timeout, retries=2, breaker=breaker
+        )
+        report("hanging upstream, breaker closed", measure(gateway.get_questions, 1))
+        report("hanging upstream, breaker open", measure(gateway.get_questions, args.requests))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
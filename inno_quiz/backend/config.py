@@ -1,12 +1,92 @@
+from typing import List, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./inno_quiz.db"
+    # Replica serving read-only routes; reads use DATABASE_URL when unset
+    READ_DATABASE_URL: Optional[str] = None
+    # How long a client reads from the primary after writing
+    READ_YOUR_WRITES_SECONDS: int = 10
+
+    # Connection pool; ignored for in-memory SQLite
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+
+    # SQLite connection profile
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KIB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
 
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 120
+    # Processes hashing passwords, 0 for one per CPU, and how many jobs may
+    # wait for them before requests are rejected with 503
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
+    # bcrypt cost of new hashes; PASSWORD_HASH_TARGET_MS calibrates it at startup
+    # to the highest cost hashing within that time instead
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_TARGET_MS: Optional[float] = None
+    # Verified tokens cached in process memory
+    TOKEN_CACHE_MAX_ENTRIES: int = 10_000
+
+    # In-process cache of quiz service responses
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10_000
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Quiz info and questions are cached per content version of the quiz
+    QUIZ_CONTENT_CACHE_TTL_SECONDS: float = 300.0
+    # Bounds how long attempts stored by other workers stay off the leaderboard
+    LEADERBOARD_CACHE_TTL_SECONDS: float = 2.0
+    # Second cache level shared by all workers: "none", "memory" or "redis"
+    CACHE_BACKEND: str = "none"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_TIMEOUT_SECONDS: float = 0.5
+    # Consecutive Redis failures after which the shared cache is skipped, and for how long
+    REDIS_BREAKER_FAILURES: int = 3
+    REDIS_BREAKER_RESET_SECONDS: float = 10.0
+    CACHE_KEY_PREFIX: str = "inno_quiz:"
+
+    # Open Trivia DB client: timeouts, retries of transient failures and
+    # the circuit breaker failing fast after consecutive failures
+    TRIVIA_CONNECT_TIMEOUT_SECONDS: float = 3.05
+    TRIVIA_READ_TIMEOUT_SECONDS: float = 10.0
+    TRIVIA_RETRIES: int = 2
+    TRIVIA_BACKOFF_SECONDS: float = 0.5
+    TRIVIA_BREAKER_FAILURES: int = 5
+    TRIVIA_BREAKER_RESET_SECONDS: float = 30.0
+    # Minimum time between requests to Open Trivia DB from this process
+    TRIVIA_MIN_INTERVAL_SECONDS: float = 5.0
+    # How long an import may fetch chunks before it answers with a continuation
+    TRIVIA_IMPORT_BUDGET_SECONDS: float = 30.0
+    # Background import jobs running at once per process, and how often and how
+    # long apart a job retries an unavailable upstream before it fails
+    IMPORT_JOB_WORKERS: int = 2
+    IMPORT_JOB_RETRIES: int = 3
+    IMPORT_JOB_RETRY_SECONDS: float = 30.0
+    # Jobs of a worker that has not renewed its lease for this long are taken over by others
+    IMPORT_JOB_LEASE_SECONDS: float = 60.0
+    # Local question bank serving imports: every TRIVIA_BANK_REFRESH_SECONDS it is
+    # topped up to TRIVIA_BANK_RESERVE questions of each category id listed in
+    # TRIVIA_BANK_CATEGORIES (a JSON list such as [9, 18]); empty disables prefetching
+    TRIVIA_BANK_CATEGORIES: List[int] = []
+    TRIVIA_BANK_RESERVE: int = 200
+    TRIVIA_BANK_REFRESH_SECONDS: float = 300.0
+    # Questions inserted per transaction by bulk content imports, and rows
+    # fetched from the database cursor at a time by content exports
+    CONTENT_IMPORT_BATCH_SIZE: int = 500
+    # Longest line, or CSV record spanning lines, accepted by content imports
+    CONTENT_IMPORT_MAX_LINE_BYTES: int = 64 * 1024
+    CONTENT_EXPORT_BATCH_SIZE: int = 1000
+    # Rows of attempts and answers fetched from the database cursor at a time by exports
+    ATTEMPT_EXPORT_BATCH_SIZE: int = 5000
 
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
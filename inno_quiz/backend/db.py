@@ -1,22 +1,182 @@
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event, make_url, Engine, URL
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker, Session
 
 from backend.config import settings
 
-engine = create_engine(str(settings.DATABASE_URL), pool_pre_ping=True)
+# asyncio drivers used for each database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+# Requests with these methods only read
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Execution options of connections used by writing requests: on SQLite their
+# transactions take the write lock up front with BEGIN IMMEDIATE, so a read
+# followed by a write waits for `busy_timeout` instead of failing as locked
+WRITER_OPTIONS = {"sqlite_begin": "IMMEDIATE"}
+
+# Cookie sending a client's reads to the primary for a while after it wrote,
+# so it sees its own writes before the replica catches up
+READ_PRIMARY_COOKIE = "read_primary"
+
+
+def get_async_url(database_url: str) -> URL:
+    """
+    Switch a database URL to the asyncio driver of its backend.
+    """
+    url = make_url(database_url)
+    async_driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if async_driver is None:
+        return url
+    return url.set(drivername=async_driver)
+
+
+def is_memory_sqlite(url: URL) -> bool:
+    """
+    Check whether the URL points to an in-memory SQLite database.
+    """
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def get_engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    Engine keyword arguments for the pool settings.
+    """
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if is_memory_sqlite(make_url(database_url)):
+        # In-memory SQLite keeps a single connection per thread, there is no pool to size
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def get_sqlite_pragmas() -> Dict[str, Any]:
+    """
+    PRAGMA statements applied to every new SQLite connection.
+    """
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        # Negative values are in KiB rather than pages
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KIB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+    }
+
+
+def set_sqlite_profile(engine: Engine) -> None:
+    """
+    Apply the SQLite PRAGMA profile on connect and take over transaction begin.
+    Pass `AsyncEngine.sync_engine` for asyncio engines.
+    """
+    pragmas = get_sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, _connection_record):
+        # Stop the driver from emitting BEGIN itself, see `begin_transaction`
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(connection):
+        mode = connection.get_execution_options().get("sqlite_begin", "DEFERRED")
+        connection.exec_driver_sql(f"BEGIN {mode}")
+
+
+def create_db_engine(database_url: str, **kwargs: Any) -> Engine:
+    """
+    Create an engine with the pool settings and, on SQLite, the connection profile.
+    """
+    engine = create_engine(database_url, **{**get_engine_options(database_url), **kwargs})
+    if engine.dialect.name == "sqlite":
+        set_sqlite_profile(engine)
+    return engine
+
+
+def create_async_db_engine(database_url: str, **kwargs: Any) -> AsyncEngine:
+    """
+    Asyncio variant of `create_db_engine`.
+    """
+    engine = create_async_engine(
+        get_async_url(database_url), **{**get_engine_options(database_url), **kwargs}
+    )
+    if engine.dialect.name == "sqlite":
+        set_sqlite_profile(engine.sync_engine)
+    return engine
+
+
+engine = create_db_engine(str(settings.DATABASE_URL))
+write_engine = engine.execution_options(**WRITER_OPTIONS)
 SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
 )
 
+async_engine = create_async_db_engine(str(settings.DATABASE_URL))
+async_write_engine = async_engine.execution_options(**WRITER_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False, expire_on_commit=False, bind=async_engine
+)
 
-def get_db() -> Generator[Session, None, None]:
+read_async_engine = (
+    create_async_db_engine(settings.READ_DATABASE_URL)
+    if settings.READ_DATABASE_URL
+    else async_engine
+)
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
     """
     Get a database session.
+    Sessions of writing requests start their transactions as writers.
     """
-    db = SessionLocal()
+    request.state.used_primary = True
+    bind = engine if request.method in SAFE_METHODS else write_engine
+    db = SessionLocal(bind=bind)
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get an asyncio database session.
+    Sessions of writing requests start their transactions as writers.
+    """
+    request.state.used_primary = True
+    bind = async_engine if request.method in SAFE_METHODS else async_write_engine
+    async with AsyncSessionLocal(bind=bind) as db:
+        yield db
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get an asyncio database session for read-only routes.
+    Reads go to the replica unless the client wrote recently, see `READ_PRIMARY_COOKIE`.
+    `db.info["replica"]` tells whether the session reads from the replica
+    """
+    replica = (
+        READ_PRIMARY_COOKIE not in request.cookies and read_async_engine is not async_engine
+    )
+    bind = read_async_engine if replica else async_engine
+    async with AsyncSessionLocal(bind=bind, info={"replica": replica}) as db:
+        yield db
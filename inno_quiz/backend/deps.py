@@ -1,20 +1,17 @@
-from fastapi import Cookie, Depends, HTTPException, status
-from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from fastapi import Cookie, HTTPException, status
+from jose import JWTError
 
-from backend.auth.jwt import TokenData
-from backend.config import settings
-from backend.db import get_db
-from backend.models.user import User
-from backend.repo.user import get_user_by_username
+from backend.auth.jwt import decode_principal
+from backend.auth.token_cache import token_cache
+from backend.domain.auth import Principal
 
 
-def get_current_user_from_cookie(
+async def get_current_principal(
     access_token: str = Cookie(None, alias="access_token"),
-    db: Session = Depends(get_db),
-) -> User:
+) -> Principal:
     """
-    Get the current user from the JWT token in the cookie
+    Get the caller from the JWT token in the cookie without loading the user.
+    Verified tokens are cached until they expire or their user is revoked
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -30,25 +27,17 @@ def get_current_user_from_cookie(
         access_token = access_token[7:]
 
     try:
-        payload = jwt.decode(
-            access_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        principal = await token_cache.get_async(
+            access_token, lambda: decode_principal(access_token)
         )
-        username: str = payload.get("sub")
-        if username is None or username.strip() == "":
-            raise credentials_exception
-        token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
     except Exception:
         # Catch any other errors during token decode
         raise credentials_exception
 
-    # Ensure username is not None before using it
-    if token_data.username is None:
+    # The user was revoked after the token was issued
+    if principal is None:
         raise credentials_exception
 
-    user = get_user_by_username(db, username=token_data.username)
-    if user is None:
-        raise credentials_exception
-
-    return user
+    return principal
@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
 
 
 class Token(BaseModel):
@@ -18,6 +21,18 @@ class TokenData(BaseModel):
     username: str | None = None
 
 
+class Principal(BaseModel):
+    """
+    Model representing the authenticated caller, built from verified token claims.
+    Used by endpoints that only need the username, without loading the user.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    username: str
+    expires_at: datetime
+    issued_at: Optional[datetime] = None
+
+
 class UserLogin(BaseModel):
     """
     Model for user login credentials.
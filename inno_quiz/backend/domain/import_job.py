@@ -0,0 +1,32 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ImportJobStatus(str, Enum):
+    """State of a background import job."""
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class ImportJobRead(BaseModel):
+    """
+    Model representing an import job with its progress.
+    Used for API responses.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    quiz_id: UUID
+    status: ImportJobStatus
+    requested: int
+    imported: int
+    unavailable: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from datetime import datetime
+from enum import Enum
 from pydantic import BaseModel
 from .question_request import QuestionResponse
 
@@ -36,6 +37,23 @@ class LeaderboardResponse(BaseModel):
     quiz_id: str
     quiz_name: str
     entries: List[LeaderboardEntry]
+    total_entries: int
+    next_cursor: Optional[str] = None
+
+
+class ScoreBucket(BaseModel):
+    """Model for the number of attempts with a given score"""
+
+    score: int
+    count: int
+
+
+class ScoreDistributionResponse(BaseModel):
+    """Response model for quiz score distribution"""
+
+    quiz_id: str
+    total_attempts: int
+    buckets: List[ScoreBucket]
 
 
 class QuizQuestionsResponse(BaseModel):
@@ -47,6 +65,38 @@ class QuizQuestionsResponse(BaseModel):
     questions: List[QuestionResponse]
 
 
+class ExternalImportResponse(QuizQuestionsResponse):
+    """Response model for questions imported from the external API"""
+
+    # Requested questions the external API does not have
+    unavailable: int = 0
+    # Pass back to import the rest, None when the import is complete
+    continuation: Optional[str] = None
+
+
+class ContentFormat(str, Enum):
+    """File format of bulk quiz content, one question per line or CSV row."""
+    jsonl = "jsonl"
+    csv = "csv"
+
+
+class ContentImportError(BaseModel):
+    """Model for a line of bulk quiz content that could not be imported"""
+
+    line: int
+    error: str
+
+
+class ContentImportResponse(BaseModel):
+    """Response model for a bulk import of quiz content"""
+
+    quiz_id: str
+    imported: int
+    failed: int
+    # The first failed lines, `failed` counts all of them
+    errors: List[ContentImportError]
+
+
 class QuizCreateRequest(BaseModel):
     """Request model for creating a quiz"""
 
@@ -87,3 +137,4 @@ class QuizSubmissionResponse(BaseModel):
     total: int
     completion_time: float
     rank: Optional[int] = None
+    percentile: Optional[float] = None
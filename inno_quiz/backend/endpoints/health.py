@@ -1,6 +1,14 @@
+from typing import Dict
+
 from fastapi import APIRouter
 from pydantic import BaseModel
 
+from backend.auth.hashing import password_hasher
+from backend.auth.token_cache import token_cache
+from backend.service.answer_key import answer_key_cache
+from backend.service.question_bank import question_bank
+from backend.service.response_cache import response_cache
+
 router = APIRouter(tags=["Health"])
 
 
@@ -8,6 +16,13 @@ class HealthResponse(BaseModel):
     status: str
 
 
+class CacheStatsResponse(BaseModel):
+    answer_keys: Dict[str, int]
+    responses: Dict[str, int]
+    tokens: Dict[str, int]
+    question_bank: Dict[str, int]
+
+
 @router.get(
     "/ping",
     response_model=HealthResponse,
@@ -22,3 +37,43 @@ def health_check():
         HealthResponse: Object containing the status "ok" if everything is working
     """
     return {"status": "ok"}
+
+
+@router.get(
+    "/stats/cache",
+    response_model=CacheStatsResponse,
+    summary="Cache Statistics",
+    description="Returns hit, miss and size counters of the in-process caches",
+)
+def cache_stats():
+    """
+    Report in-process cache counters of this worker.
+
+    Returns:
+        CacheStatsResponse: Counters of the compiled answer key cache
+        the service response cache, the verified token cache
+        and the question bank
+    """
+    return {
+        "answer_keys": answer_key_cache.stats(),
+        "responses": response_cache.stats(),
+        "tokens": token_cache.stats(),
+        "question_bank": question_bank.stats(),
+    }
+
+
+@router.get(
+    "/stats/hashing",
+    response_model=Dict[str, float],
+    summary="Password Hashing Statistics",
+    description="Returns queue depth and latency of the password hashing workers",
+)
+def hashing_stats():
+    """
+    Report password hashing counters of this worker.
+
+    Returns:
+        Dict[str, float]: Pool size, pending and rejected jobs,
+        and latency of completed jobs in milliseconds
+    """
+    return password_hasher.stats()
@@ -1,105 +1,301 @@
+from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.domain.auth import Principal
+from backend.domain.import_job import ImportJobRead
 from backend.domain.question_request import QuestionRequest, QuestionResponse
 from backend.domain.quiz import QuizBase, QuizRead
 from backend.domain.quiz_request import (
+    ContentFormat,
+    ContentImportResponse,
+    ExternalImportResponse,
     QuizInfoResponse,
     LeaderboardResponse,
+    ScoreDistributionResponse,
     QuizQuestionsResponse,
     QuizSubmissionRequest,
     QuizSubmissionResponse,
 )
-from backend.service import quiz as quiz_service, errors as service_errors
-from backend.db import get_db
-from backend.deps import get_current_user_from_cookie
-from backend.models.user import User
+from backend.service import (
+    attempt_export,
+    quiz_async,
+    quiz_content,
+    trivia_import,
+    errors as service_errors,
+)
+from backend.db import get_async_db, get_read_db
+from backend.service.import_jobs import import_job_runner
+from backend.deps import get_current_principal
 
 router = APIRouter(
     prefix="/quiz",
     tags=["quiz"],
-    dependencies=[Depends(get_current_user_from_cookie)],
+    dependencies=[Depends(get_current_principal)],
 )
 
+# Quiz content is served behind authentication and changes rarely: clients
+# may keep it, but must revalidate it with its ETag before every reuse
+CONTENT_CACHE_CONTROL = "private, no-cache"
+
+
+def _content_etag(quiz_id: str, resource: str, version: int) -> str:
+    return f'"{resource}-{quiz_id}-{version}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag with the weak comparison
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags
+
 
 @router.post("/", response_model=QuizRead, status_code=status.HTTP_201_CREATED)
-def create_quiz(
+async def create_quiz(
     quiz_in: QuizBase,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     try:
-        return quiz_service.create_quiz_template(quiz_in, current_user.username, db=db)
+        return await quiz_async.create_quiz_template(quiz_in, current_user.username, db=db)
     except service_errors.ServiceError as e:
         raise HTTPException(status_code=400, detail=str(e)) from None
 
 
 @router.put("/{quiz_id}/submit", response_model=QuizRead)
-def submit_quiz_endpoint(
+async def submit_quiz_endpoint(
     quiz_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     try:
-        return quiz_service.submit_quiz(quiz_id, db=db)
+        return await quiz_async.submit_quiz(quiz_id, db=db)
     except service_errors.QuizNotFoundError:
         raise HTTPException(status_code=404, detail="Quiz does not exist") from None
 
 
 @router.post("/{quiz_id}/questions", response_model=QuestionResponse)
-def add_question(
+async def add_question(
     quiz_id: str,
     question: QuestionRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Add a question to a quiz
     """
     try:
-        return quiz_service.add_question(quiz_id, question, db=db)
+        return await quiz_async.add_question(quiz_id, question, db=db)
     except service_errors.QuizNotFoundError:
         raise HTTPException(status_code=404, detail="Quiz not found") from None
     except service_errors.ServiceError as e:
         raise HTTPException(status_code=400, detail=str(e)) from None
 
 
-@router.get("/{quiz_id}/load_questions", response_model=QuizQuestionsResponse)
-def load_external_questions(
+@router.get("/{quiz_id}/load_questions", response_model=ExternalImportResponse)
+async def load_external_questions(
     quiz_id: str,
-    count: int,
-    category: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_from_cookie),
+    count: Optional[int] = Query(None, gt=0),
+    category: Optional[List[str]] = Query(None),
+    difficulty: Optional[List[str]] = Query(None),
+    continuation: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
-    Load questions from external API
+    Load count questions per category, and per difficulty if given, from external API.
+    Repeat category or difficulty to fetch several of them concurrently.
+    Large imports are fetched in chunks; when they take too long, the questions
+    imported so far are returned with a continuation: pass it instead of
+    count, category and difficulty to import the rest
     """
+    if continuation is None and (count is None or not category):
+        raise HTTPException(
+            status_code=422, detail="count and category are required without continuation"
+        )
     try:
-        return quiz_service.load_external_questions(quiz_id, count, category, db=db)
+        return await trivia_import.load_external_questions(
+            quiz_id,
+            count,
+            category or [],
+            db=db,
+            difficulties=difficulty or (None,),
+            continuation=continuation,
+        )
     except service_errors.QuizNotFoundError:
         raise HTTPException(status_code=404, detail="Quiz not found") from None
     except service_errors.ServiceError as e:
         raise HTTPException(status_code=400, detail=str(e)) from None
+    except ConnectionError as e:
+        raise HTTPException(
+            status_code=503, detail=f"External API unavailable: {str(e)}"
+        ) from None
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"External API error: {str(e)}"
         ) from None
 
 
+@router.post(
+    "/{quiz_id}/load_questions/jobs",
+    response_model=ImportJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def start_import_job(
+    quiz_id: str,
+    response: Response,
+    count: int = Query(..., gt=0),
+    category: List[str] = Query(...),
+    difficulty: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Load questions like load_questions, in the background.
+    Answers at once with the job; poll the URL in the Location header for its progress
+    """
+    try:
+        job = await import_job_runner.submit(
+            quiz_id,
+            count,
+            category,
+            current_user.username,
+            db=db,
+            difficulties=difficulty or (None,),
+        )
+    except service_errors.QuizNotFoundError:
+        raise HTTPException(status_code=404, detail="Quiz not found") from None
+    except service_errors.ServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    response.headers["Location"] = f"/v1/quiz/{quiz_id}/load_questions/jobs/{job.id}"
+    return job
+
+
+@router.get("/{quiz_id}/load_questions/jobs/{job_id}", response_model=ImportJobRead)
+async def get_import_job(
+    quiz_id: str,
+    job_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Get the status and progress of an import job.
+    Read from the primary database, which the job updates after every chunk
+    """
+    try:
+        return await import_job_runner.get(quiz_id, job_id, db=db)
+    except service_errors.ImportJobNotFoundError:
+        raise HTTPException(status_code=404, detail="Import job not found") from None
+
+
+@router.post("/{quiz_id}/content", response_model=ContentImportResponse)
+async def import_quiz_content(
+    quiz_id: str,
+    request: Request,
+    content_format: ContentFormat = Query(ContentFormat.jsonl, alias="format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Add the questions of a JSON Lines or CSV request body to a quiz, in the
+    format of the content export. The body is parsed while it is received
+    and questions are inserted in batches; invalid lines are skipped and
+    reported with their line numbers
+    """
+    try:
+        return await quiz_content.import_content(
+            quiz_id, content_format, request.stream(), db=db
+        )
+    except service_errors.QuizNotFoundError:
+        raise HTTPException(status_code=404, detail="Quiz not found") from None
+    except service_errors.ServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+
+
+@router.get("/{quiz_id}/content")
+async def export_quiz_content(
+    quiz_id: str,
+    content_format: ContentFormat = Query(ContentFormat.jsonl, alias="format"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Download the questions of a quiz with their options as JSON Lines or CSV,
+    streamed from the database without loading the quiz whole
+    """
+    try:
+        await quiz_async.get_content_version(quiz_id, db=db)
+    except service_errors.QuizNotFoundError:
+        raise HTTPException(status_code=404, detail="Quiz not found") from None
+    filename = f"quiz-{quiz_id}.{content_format.value}"
+    return StreamingResponse(
+        quiz_content.export_content(quiz_id, content_format, db.bind),
+        media_type=quiz_content.MEDIA_TYPES[content_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/{quiz_id}/attempts/export")
+async def export_quiz_attempts(
+    quiz_id: str,
+    content_format: ContentFormat = Query(ContentFormat.jsonl, alias="format"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Download the attempts of a quiz with their answers, one line per answer,
+    as JSON Lines or CSV. Only the author of the quiz may export them.
+    since and until limit the export to attempts started in [since, until),
+    naive datetimes are taken as UTC. Rows are streamed from a server-side
+    cursor, so exports of any size use constant memory
+    """
+    try:
+        await quiz_async.check_quiz_author(quiz_id, current_user.username, db=db)
+    except service_errors.QuizNotFoundError:
+        raise HTTPException(status_code=404, detail="Quiz not found") from None
+    except service_errors.NotQuizAuthorError as e:
+        raise HTTPException(status_code=403, detail=str(e)) from None
+    filename = f"quiz-{quiz_id}-attempts.{content_format.value}"
+    return StreamingResponse(
+        attempt_export.export_attempts(quiz_id, content_format, db.bind, since, until),
+        media_type=quiz_content.MEDIA_TYPES[content_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{quiz_id}", response_model=QuizInfoResponse)
-def get_quiz_info(
+async def get_quiz_info(
     quiz_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_from_cookie),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
-    Get quiz information by ID
+    Get quiz information by ID.
+    Answers 304 Not Modified when If-None-Match holds the current ETag
     """
     try:
-        return quiz_service.get_quiz_info(quiz_id, db=db)
+        version = await quiz_async.get_content_version(quiz_id, db=db)
+        headers = {
+            "ETag": _content_etag(quiz_id, "info", version),
+            "Cache-Control": CONTENT_CACHE_CONTROL,
+        }
+        if _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return await quiz_async.get_quiz_info(quiz_id, db=db)
     except service_errors.QuizNotFoundError:
         raise HTTPException(status_code=404, detail="Quiz not found") from None
     except service_errors.ServiceError as e:
@@ -107,16 +303,35 @@ def get_quiz_info(
 
 
 @router.get("/{quiz_id}/leaderboard", response_model=LeaderboardResponse)
-def get_leaderboard(
+async def get_leaderboard(
+    quiz_id: str,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Get a page of the quiz leaderboard, best attempts first
+    """
+    try:
+        return await quiz_async.get_leaderboard(quiz_id, db=db, limit=limit, cursor=cursor)
+    except service_errors.QuizNotFoundError:
+        raise HTTPException(status_code=404, detail="Quiz not found") from None
+    except service_errors.ServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+
+
+@router.get("/{quiz_id}/distribution", response_model=ScoreDistributionResponse)
+async def get_score_distribution(
     quiz_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
-    Get quiz leaderboard
+    Get the number of attempts per score for a quiz
     """
     try:
-        return quiz_service.get_leaderboard(quiz_id, db=db)
+        return await quiz_async.get_score_distribution(quiz_id, db=db)
     except service_errors.QuizNotFoundError:
         raise HTTPException(status_code=404, detail="Quiz not found") from None
     except service_errors.ServiceError as e:
@@ -124,16 +339,28 @@ def get_leaderboard(
 
 
 @router.get("/{quiz_id}/questions", response_model=QuizQuestionsResponse)
-def get_quiz_questions(
+async def get_quiz_questions(
     quiz_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_from_cookie),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
-    Get all questions for a quiz
+    Get all questions for a quiz.
+    Answers 304 Not Modified when If-None-Match holds the current ETag
+    without reading the questions
     """
     try:
-        return quiz_service.get_quiz_questions(quiz_id, db=db)
+        version = await quiz_async.get_content_version(quiz_id, db=db)
+        headers = {
+            "ETag": _content_etag(quiz_id, "questions", version),
+            "Cache-Control": CONTENT_CACHE_CONTROL,
+        }
+        if _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return await quiz_async.get_quiz_questions(quiz_id, db=db)
     except service_errors.QuizNotFoundError:
         raise HTTPException(status_code=404, detail="Quiz not found") from None
     except service_errors.ServiceError as e:
@@ -141,10 +368,10 @@ def get_quiz_questions(
 
 
 @router.post("/{quiz_id}/answers", response_model=QuizSubmissionResponse)
-def submit_quiz_answers(
+async def submit_quiz_answers(
     request: QuizSubmissionRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_from_cookie),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Submit answers for a quiz
@@ -153,7 +380,7 @@ def submit_quiz_answers(
     request.user_id = current_user.username
 
     try:
-        return quiz_service.submit_quiz_answers(request, db=db)
+        return await quiz_async.submit_quiz_answers(request, db=db)
     except service_errors.QuizNotFoundError:
         raise HTTPException(status_code=404, detail="Quiz not found") from None
     except service_errors.UserNotFoundError:
@@ -3,65 +3,106 @@ from typing import Annotated, List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.auth import create_access_token, get_password_hash, verify_password
+from backend.auth import create_access_token
+from backend.auth.hashing import HasherBusyError, password_hasher
 from backend.config import settings
-from backend.db import get_db
-from backend.domain.auth import Token
+from backend.db import get_async_db, get_read_db
+from backend.domain.auth import Principal, Token
 from backend.domain.user import UserCreate, UserRead, UserInfo
 from backend.domain.quiz import QuizRead
-from backend.models.user import User
-from backend.repo.user import create_user, get_user_by_username, verify_username_unique
-from backend.deps import get_current_user_from_cookie
+from backend.deps import get_current_principal
 from backend import repo
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+def _username_taken() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Username already registered"
+    )
+
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, try again later",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/create", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_create: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new user with the provided username and password.
     """
     # Check if username already exists
-    is_unique = verify_username_unique(db, user_create.username)
-    if not is_unique:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
+    existing_user = await repo.aio.user.get_by_username(db, user_create.username)
+    if existing_user is not None:
+        raise _username_taken()
+
+    # Do not hold the write transaction open while the password is hashed:
+    # on SQLite it holds the database write lock
+    await db.commit()
+
+    # Hash the password in a worker process, bcrypt is CPU bound
+    try:
+        hashed_password = await password_hasher.hash(user_create.password)
+    except HasherBusyError:
+        raise _hasher_busy() from None
+
+    # Create new user, another registration may have taken the name meanwhile
+    try:
+        user = await repo.aio.user.create(
+            db, obj_in=UserCreate(username=user_create.username, password=hashed_password)
         )
-
-    # Hash the password
-    hashed_password = get_password_hash(user_create.password)
-
-    # Create new user
-    user = create_user(db, user_create.username, hashed_password)
+    except IntegrityError:
+        await db.rollback()
+        raise _username_taken() from None
 
     return user
 
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     response: Response,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Authenticate a user and return a JWT token for further API access.
     """
     # Validate user credentials
-    user = get_user_by_username(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.password):
+    user = await repo.aio.user.get_by_username(db, form_data.username)
+
+    # Do not hold the write transaction open while the password is verified,
+    # the rehash below runs in a transaction of its own
+    await db.commit()
+
+    try:
+        verified, new_hash = (
+            await password_hasher.verify_and_update(form_data.password, user.password)
+            if user is not None else (False, None)
+        )
+    except HasherBusyError:
+        raise _hasher_busy() from None
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Rehash passwords stored at another cost than the configured one
+    if new_hash is not None:
+        await repo.aio.user.update(db, db_obj=user, obj_in={"password": new_hash})
+
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -82,7 +123,7 @@ def login_for_access_token(
 
 
 @router.get("/me", response_model=UserInfo)
-def get_user_me(current_user: User = Depends(get_current_user_from_cookie)):
+async def get_user_me(current_user: Principal = Depends(get_current_principal)):
     """
     Get information about the currently authenticated user.
     This endpoint requires authentication.
@@ -95,17 +136,17 @@ def get_user_me(current_user: User = Depends(get_current_user_from_cookie)):
 
 
 @router.get("/{username}/quizzes", response_model=List[QuizRead])
-def get_user_quizzes(
+async def get_user_quizzes(
     username: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user_from_cookie)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get all quizzes created by a specific user.
     This endpoint requires authentication.
     """
     # Verify user exists
-    user = get_user_by_username(db, username)
+    user = await repo.aio.user.get_by_username(db, username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -113,5 +154,5 @@ def get_user_quizzes(
         )
 
     # Get user's quizzes
-    quizzes = repo.quiz.get_by_author(db, username)
+    quizzes = await repo.aio.quiz.get_by_author(db, username)
     return quizzes
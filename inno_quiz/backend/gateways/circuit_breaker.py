@@ -0,0 +1,77 @@
+"""
+Circuit breaker shared by the clients of upstream services
+"""
+
+import time
+from threading import Lock
+
+
+class CircuitOpenError(ConnectionError):
+    """
+    The upstream failed repeatedly, calls fail fast until the breaker resets
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling an unhealthy upstream.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    calls fail fast for `reset_timeout` seconds. Then a single trial call is
+    let through (half-open): its success closes the breaker, its failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def before_call(self) -> None:
+        """
+        Raise CircuitOpenError unless a call may go to the upstream
+        """
+        with self._lock:
+            state = self._state()
+            if state == self.OPEN or (state == self.HALF_OPEN and self._trial_running):
+                raise CircuitOpenError("Upstream is unavailable, try again later")
+            if state == self.HALF_OPEN:
+                self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+
+    def abandon_call(self) -> None:
+        """
+        Forget a call cancelled before its outcome was known
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
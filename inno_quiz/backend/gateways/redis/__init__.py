@@ -0,0 +1,3 @@
+from .client import RedisClient, RedisError
+
+__all__ = ["RedisClient", "RedisError"]
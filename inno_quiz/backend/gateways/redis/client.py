@@ -0,0 +1,218 @@
+import logging
+import socket
+import threading
+from queue import Empty, LifoQueue
+from typing import Any, Callable, List, Optional, Set, Union
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+Reply = Union[None, int, bytes, str, List[Any]]
+
+
+class RedisError(Exception):
+    """
+    Error reply of the server or a broken connection
+    """
+
+
+class RedisConnection:
+    """
+    Single connection speaking RESP2
+    """
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def send(self, *args: Union[str, bytes, int, float]) -> None:
+        """
+        Send a command as an array of bulk strings
+        """
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self.sock.sendall(b"".join(parts))
+
+    def read_reply(self) -> Reply:
+        """
+        Read one reply, error replies are raised as RedisError
+        """
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Connection closed by server")
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self.read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply type {kind!r}")
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisClient:
+    """
+    Minimal client for servers speaking the Redis protocol (RESP2).
+
+    Commands run on pooled connections; a connection that failed is dropped
+    instead of returned to the pool. Subscriptions run on a dedicated
+    connection in a daemon thread that reconnects after failures.
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0, max_idle_connections: int = 10):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._idle: "LifoQueue[RedisConnection]" = LifoQueue(maxsize=max_idle_connections)
+        self._subscriptions: Set[RedisConnection] = set()
+        self._closed = threading.Event()
+
+    def _connect(self, timeout: Optional[float]) -> RedisConnection:
+        conn = RedisConnection(self.host, self.port, self.timeout)
+        conn.sock.settimeout(timeout)
+        try:
+            if self.password is not None:
+                conn.send("AUTH", self.password)
+                conn.read_reply()
+            if self.db:
+                conn.send("SELECT", self.db)
+                conn.read_reply()
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def execute(self, *args: Union[str, bytes, int, float]) -> Reply:
+        """
+        Run a command and return its reply.
+        Raises RedisError for error replies and connection failures
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except Empty:
+            conn = None
+        try:
+            if conn is None:
+                conn = self._connect(self.timeout)
+            conn.send(*args)
+            reply = conn.read_reply()
+        except RedisError:
+            # The server answered with an error, the connection is still usable
+            # unless it was refused while connecting, then _connect closed it
+            if conn is not None:
+                self._release(conn)
+            raise
+        except (OSError, ValueError) as e:
+            if conn is not None:
+                conn.close()
+            raise RedisError(f"Redis connection error: {e}") from e
+        self._release(conn)
+        return reply
+
+    def _release(self, conn: RedisConnection) -> None:
+        if self._closed.is_set() or self._idle.full():
+            conn.close()
+        else:
+            self._idle.put_nowait(conn)
+
+    def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[bytes], None],
+        on_subscribe: Optional[Callable[[], None]] = None,
+        retry_delay: float = 1.0,
+    ) -> threading.Thread:
+        """
+        Call callback with every message published on channel until the client
+        is closed. on_subscribe runs after every (re)subscription, messages
+        published while disconnected are lost.
+        Returns the listener thread once it subscribed or failed its first attempt
+        """
+        attempted = threading.Event()
+
+        def listen() -> None:
+            while not self._closed.is_set():
+                try:
+                    # Wait for messages without a read timeout
+                    conn = self._connect(None)
+                except (OSError, RedisError) as e:
+                    logger.warning("Redis subscription to %s failed: %s", channel, e)
+                    attempted.set()
+                    self._closed.wait(retry_delay)
+                    continue
+                self._subscriptions.add(conn)
+                try:
+                    conn.send("SUBSCRIBE", channel)
+                    conn.read_reply()
+                    attempted.set()
+                    if on_subscribe is not None:
+                        self._run_callback(on_subscribe)
+                    while not self._closed.is_set():
+                        reply = conn.read_reply()
+                        if isinstance(reply, list) and reply[0] == b"message":
+                            self._run_callback(callback, reply[2])
+                except (OSError, ValueError, RedisError) as e:
+                    if not self._closed.is_set():
+                        logger.warning("Redis subscription to %s failed: %s", channel, e)
+                finally:
+                    attempted.set()
+                    self._subscriptions.discard(conn)
+                    conn.close()
+                self._closed.wait(retry_delay)
+
+        thread = threading.Thread(target=listen, name=f"redis-subscribe-{channel}", daemon=True)
+        thread.start()
+        attempted.wait(self.timeout)
+        return thread
+
+    @staticmethod
+    def _run_callback(callback: Callable[..., None], *args: Any) -> None:
+        try:
+            callback(*args)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Redis subscription callback failed")
+
+    def close(self) -> None:
+        """
+        Close pooled connections and stop subscriptions
+        """
+        self._closed.set()
+        for conn in list(self._subscriptions):
+            try:
+                # Unblocks the listener waiting for the next message
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
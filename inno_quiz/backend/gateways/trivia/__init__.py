@@ -1,4 +1,28 @@
-from .gateway import trivia_gateway, TriviaGateway
-from .models import TriviaQuestion
+from backend.gateways.circuit_breaker import CircuitBreaker, CircuitOpenError
 
-__all__ = ["trivia_gateway", "TriviaGateway", "TriviaQuestion"]
+from .async_gateway import async_trivia_gateway, AsyncTriviaGateway
+from .gateway import (
+    trivia_gateway,
+    TriviaGateway,
+    NotEnoughQuestionsError,
+    RateLimitedError,
+    TokenNotFoundError,
+)
+from .models import CategoryCount, TriviaQuery, TriviaQuestion
+from .resilience import RateLimiter
+
+__all__ = [
+    "async_trivia_gateway",
+    "AsyncTriviaGateway",
+    "trivia_gateway",
+    "TriviaGateway",
+    "NotEnoughQuestionsError",
+    "RateLimitedError",
+    "TokenNotFoundError",
+    "CategoryCount",
+    "TriviaQuery",
+    "TriviaQuestion",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "RateLimiter",
+]
@@ -0,0 +1,229 @@
+import asyncio
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from backend.config import settings
+from backend.gateways.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+from .gateway import (
+    RETRY_STATUSES,
+    RateLimitedError,
+    TriviaGateway,
+    build_params,
+    parse_category_count,
+    parse_questions,
+    sibling_url,
+    trivia_breaker,
+    trivia_rate_limiter,
+)
+from .models import CategoryCount, TriviaQuery, TriviaQuestion
+from .resilience import RateLimiter, backoff_delays
+
+
+class AsyncTriviaGateway:
+    """
+    Open Trivia DB client for the event loop, built on httpx.AsyncClient.
+
+    Requests go through the same kind of circuit breaker, jittered retries
+    and rate limiter as `TriviaGateway`; the singletons share the breaker
+    and the rate limiter, so sync and async callers respect one schedule.
+    """
+
+    def __init__(
+        self,
+        base_url: str = TriviaGateway.BASE_URL,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_backoff: float = 5.0,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        pool_size: int = 10,
+        count_ttl: float = 3600.0,
+    ):
+        self.base_url = base_url
+        self.count_url = sibling_url(base_url, "api_count.php")
+        self.token_url = sibling_url(base_url, "api_token.php")
+        self.count_ttl = count_ttl
+        self._counts: Dict[int, Tuple[float, CategoryCount]] = {}
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Pooled client of the running event loop, connections cannot move between loops
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled connections
+        """
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def get_questions(
+        self,
+        amount: int = 10,
+        category: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        question_type: Optional[str] = None,
+        token: Optional[str] = None,
+    ) -> List[TriviaQuestion]:
+        """
+        Fetch trivia questions from the Open Trivia Database API,
+        see `TriviaGateway.get_questions`. With a session token
+        the API never returns a question twice
+        """
+        params = build_params(amount, category, difficulty, question_type, token)
+        return parse_questions(await self._get_json(self.base_url, params))
+
+    async def get_many(
+        self,
+        amount: int,
+        categories: Sequence[Optional[int]] = (None,),
+        difficulties: Sequence[Optional[str]] = (None,),
+        question_type: Optional[str] = None,
+    ) -> List[TriviaQuestion]:
+        """
+        Fetch amount questions for every combination of category and
+        difficulty concurrently, merged in the order of the combinations.
+        The first failure cancels the other fetches and is raised
+        """
+        batches = await self.get_each(
+            [
+                TriviaQuery(amount, category, difficulty)
+                for category, difficulty in itertools.product(categories, difficulties)
+            ],
+            question_type,
+        )
+        return [question for batch in batches for question in batch]
+
+    async def get_each(
+        self,
+        queries: Sequence[TriviaQuery],
+        question_type: Optional[str] = None,
+        token: Optional[str] = None,
+        return_exceptions: bool = False,
+    ) -> List[Union[List[TriviaQuestion], Exception]]:
+        """
+        Fetch the questions of every query concurrently, one list per query
+        in the order of the queries. The first failure cancels the other
+        fetches and is raised, unless return_exceptions is set: then every
+        query runs to its end and a failed one gives its exception
+        """
+        fetches = [
+            self.get_questions(amount, category, difficulty, question_type, token)
+            for amount, category, difficulty in queries
+        ]
+        if return_exceptions:
+            return await asyncio.gather(*fetches, return_exceptions=True)
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(fetch) for fetch in fetches]
+        except ExceptionGroup as errors:
+            raise errors.exceptions[0] from None
+        return [task.result() for task in tasks]
+
+    async def get_category_count(self, category: int) -> CategoryCount:
+        """
+        Number of questions of a category per difficulty, cached for `count_ttl`
+        """
+        cached = self._counts.get(category)
+        if cached is not None and time.monotonic() - cached[0] < self.count_ttl:
+            return cached[1]
+        count = parse_category_count(
+            await self._get_json(self.count_url, {"category": category})
+        )
+        self._counts[category] = (time.monotonic(), count)
+        return count
+
+    async def request_token(self) -> str:
+        """
+        Request a session token, questions fetched with it are not repeated
+        """
+        data = await self._get_json(self.token_url, {"command": "request"})
+        if data.get("response_code") != 0:
+            raise ValueError(f"API Error: Response code {data.get('response_code')}")
+        return data["token"]
+
+    async def _get_json(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = await self._get(url, params)
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429:
+                raise RateLimitedError(f"Trivia API is rate limiting: {str(e)}")
+            raise ValueError(f"HTTP error from Trivia API: {str(e)}")
+        except httpx.HTTPError as e:
+            raise ConnectionError(f"Error connecting to Trivia API: {str(e)}")
+
+    async def _get(self, url: str, params: Dict[str, Any]) -> httpx.Response:
+        """
+        Send the request through the rate limiter and the circuit breaker,
+        retrying connection failures, timeouts and overload answers
+        """
+        delays = backoff_delays(self.retries, self.backoff, self.max_backoff)
+        while True:
+            # Fail fast instead of waiting for a rate limiter slot first
+            if self.breaker.state == CircuitBreaker.OPEN:
+                raise CircuitOpenError("Upstream is unavailable, try again later")
+            if self.rate_limiter is not None:
+                await self.rate_limiter.wait_async()
+            self.breaker.before_call()
+            try:
+                response = await self.client.get(url, params=params)
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                delay = next(delays, None)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except httpx.HTTPError:
+                self.breaker.record_success()
+                raise
+            except asyncio.CancelledError:
+                # Another fetch of the batch failed, this one proves nothing
+                self.breaker.abandon_call()
+                raise
+            if response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success()
+                return response
+            self.breaker.record_failure()
+            delay = next(delays, None)
+            if delay is None:
+                return response
+            await asyncio.sleep(delay)
+
+
+# Create a singleton instance
+async_trivia_gateway = AsyncTriviaGateway(
+    connect_timeout=settings.TRIVIA_CONNECT_TIMEOUT_SECONDS,
+    read_timeout=settings.TRIVIA_READ_TIMEOUT_SECONDS,
+    retries=settings.TRIVIA_RETRIES,
+    backoff=settings.TRIVIA_BACKOFF_SECONDS,
+    breaker=trivia_breaker,
+    rate_limiter=trivia_rate_limiter,
+)
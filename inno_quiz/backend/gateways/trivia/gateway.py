@@ -1,12 +1,136 @@
-import requests
+import time
 from typing import List, Dict, Any, Optional
 
-from .models import TriviaQuestion
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.config import settings
+from backend.gateways.circuit_breaker import CircuitBreaker
+
+from .models import CategoryCount, TriviaQuestion
+from .resilience import RateLimiter, backoff_delays
+
+# Upstream answers worth retrying: overload and gateway errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class NotEnoughQuestionsError(ValueError):
+    """
+    The upstream has fewer questions left than requested
+    """
+
+
+class TokenNotFoundError(ValueError):
+    """
+    The session token expired or never existed
+    """
+
+
+class RateLimitedError(ConnectionError):
+    """
+    The upstream throttles this client, the request may be repeated later
+    """
+
+
+def build_params(
+    amount: int,
+    category: Optional[int] = None,
+    difficulty: Optional[str] = None,
+    question_type: Optional[str] = None,
+    token: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Query parameters of an api.php request
+    """
+    params: Dict[str, Any] = {"amount": amount}
+
+    if category is not None:
+        params["category"] = category
+
+    if difficulty is not None:
+        params["difficulty"] = difficulty
+
+    if question_type is not None:
+        params["type"] = question_type
+
+    if token is not None:
+        params["token"] = token
+
+    return params
+
+
+def parse_questions(data: Dict[str, Any]) -> List[TriviaQuestion]:
+    """
+    Questions of an api.php answer, ValueError for API error codes
+    and RateLimitedError when the API throttles us
+    """
+    if data["response_code"] != 0:
+        # Handle API errors based on response codes
+        if data["response_code"] == 1:
+            raise NotEnoughQuestionsError("Not enough questions available")
+        elif data["response_code"] == 2:
+            raise ValueError("Invalid parameter")
+        elif data["response_code"] == 3:
+            raise TokenNotFoundError("Session token not found")
+        elif data["response_code"] == 4:
+            raise NotEnoughQuestionsError("Session token has returned all questions")
+        elif data["response_code"] == 5:
+            raise RateLimitedError("Too many requests to Trivia API")
+        else:
+            raise ValueError(f"API Error: Response code {data['response_code']}")
+
+    return [TriviaQuestion(**q) for q in data["results"]]
+
+
+def parse_category_count(data: Dict[str, Any]) -> CategoryCount:
+    """
+    Question counts of an api_count.php answer
+    """
+    counts = data["category_question_count"]
+    return CategoryCount(
+        total=counts["total_question_count"],
+        easy=counts["total_easy_question_count"],
+        medium=counts["total_medium_question_count"],
+        hard=counts["total_hard_question_count"],
+    )
+
+
+def sibling_url(base_url: str, script: str) -> str:
+    """
+    URL of another API script next to api.php
+    """
+    return f"{base_url.rsplit('/', 1)[0]}/{script}"
 
 
 class TriviaGateway:
     BASE_URL = "https://opentdb.com/api.php"
 
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_backoff: float = 5.0,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        pool_size: int = 10,
+    ):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter
+        # Keep-alive connections are reused across imports instead of a TLS
+        # handshake per request; retries are handled below, not by urllib3
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
     def get_questions(
         self,
         amount: int = 10,
@@ -26,41 +150,73 @@ class TriviaGateway:
         Returns:
         - List of TriviaQuestion objects
         """
-        params: Dict[str, Any] = {"amount": amount}
-
-        if category is not None:
-            params["category"] = category
-
-        if difficulty is not None:
-            params["difficulty"] = difficulty
-
-        if question_type is not None:
-            params["type"] = question_type
+        params = build_params(amount, category, difficulty, question_type)
 
         try:
-            response = requests.get(self.BASE_URL, params=params)
+            response = self._get(params)
             response.raise_for_status()
 
-            data = response.json()
-
-            if data["response_code"] != 0:
-                # Handle API errors based on response codes
-                if data["response_code"] == 1:
-                    raise ValueError("Not enough questions available")
-                elif data["response_code"] == 2:
-                    raise ValueError("Invalid parameter")
-                else:
-                    raise ValueError(f"API Error: Response code {data['response_code']}")
-
-            return [TriviaQuestion(**q) for q in data["results"]]
+            return parse_questions(response.json())
 
         except requests.HTTPError as e:
             # Handle HTTP errors
+            if e.response is not None and e.response.status_code == 429:
+                raise RateLimitedError(f"Trivia API is rate limiting: {str(e)}")
             raise ValueError(f"HTTP error from Trivia API: {str(e)}")
         except requests.RequestException as e:
             # Handle other connection errors
             raise ConnectionError(f"Error connecting to Trivia API: {str(e)}")
 
+    def _get(self, params: Dict[str, Any]) -> requests.Response:
+        """
+        Send the request through the circuit breaker, retrying connection
+        failures, timeouts and overload answers with jittered backoff.
+        Raises CircuitOpenError while the upstream is considered down
+        """
+        delays = backoff_delays(self.retries, self.backoff, self.max_backoff)
+        while True:
+            self.breaker.before_call()
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait()
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self.breaker.record_failure()
+                if not self._wait(delays):
+                    raise
+                continue
+            except requests.RequestException:
+                self.breaker.record_success()
+                raise
+            if response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success()
+                return response
+            self.breaker.record_failure()
+            if not self._wait(delays):
+                return response
+
+    @staticmethod
+    def _wait(delays) -> bool:
+        delay = next(delays, None)
+        if delay is None:
+            return False
+        time.sleep(delay)
+        return True
+
+
+# Open Trivia DB allows one request per IP every 5 seconds, the gateways share one schedule
+trivia_rate_limiter = RateLimiter(settings.TRIVIA_MIN_INTERVAL_SECONDS)
+trivia_breaker = CircuitBreaker(
+    failure_threshold=settings.TRIVIA_BREAKER_FAILURES,
+    reset_timeout=settings.TRIVIA_BREAKER_RESET_SECONDS,
+)
 
 # Create a singleton instance
-trivia_gateway = TriviaGateway()
+trivia_gateway = TriviaGateway(
+    connect_timeout=settings.TRIVIA_CONNECT_TIMEOUT_SECONDS,
+    read_timeout=settings.TRIVIA_READ_TIMEOUT_SECONDS,
+    retries=settings.TRIVIA_RETRIES,
+    backoff=settings.TRIVIA_BACKOFF_SECONDS,
+    breaker=trivia_breaker,
+    rate_limiter=trivia_rate_limiter,
+)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, NamedTuple, Optional
 from pydantic import BaseModel
 
 
@@ -9,3 +9,22 @@ class TriviaQuestion(BaseModel):
     question: str
     correct_answer: str
     incorrect_answers: List[str]
+
+
+class TriviaQuery(NamedTuple):
+    amount: int
+    category: Optional[int] = None
+    difficulty: Optional[str] = None
+
+
+class CategoryCount(BaseModel):
+    total: int
+    easy: int
+    medium: int
+    hard: int
+
+    def available(self, difficulty: Optional[str] = None) -> int:
+        """
+        Number of questions of a difficulty, of any difficulty when None
+        """
+        return self.total if difficulty is None else getattr(self, difficulty, 0)
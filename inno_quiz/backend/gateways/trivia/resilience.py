@@ -0,0 +1,48 @@
+import asyncio
+import random
+import time
+from threading import Lock
+from typing import Iterator
+
+
+def backoff_delays(retries: int, base: float, cap: float) -> Iterator[float]:
+    """
+    Delays before each retry: exponential backoff with full jitter,
+    so clients failing together do not retry together
+    """
+    for attempt in range(retries):
+        yield random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class RateLimiter:
+    """
+    Spaces calls at least `interval` seconds apart.
+
+    Each caller reserves the next free slot and waits for it, so calls from
+    threads and from coroutines of any event loop share one schedule.
+    The schedule is local to the process.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+
+    def wait(self) -> None:
+        """
+        Block until the caller may make its call
+        """
+        time.sleep(self._reserve())
+
+    async def wait_async(self) -> None:
+        """
+        Sleep until the caller may make its call
+        """
+        await asyncio.sleep(self._reserve())
@@ -1,18 +1,49 @@
-from sqlalchemy import create_engine
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, Engine
+
 from backend.config import settings
-from backend.models.user import Base as UserBase
-from backend.models.quiz import Base as QuizBase
+
+ALEMBIC_INI = Path(__file__).resolve().parent / "alembic.ini"
+
+# Revision matching the schema `init_db` created with `create_all`
+# before migrations were introduced
+BASELINE_REVISION = "0001"
+
+
+def migrate(engine: Engine, revision: str = "head") -> None:
+    """
+    Bring the database schema to `revision` with the Alembic migrations
+    """
+    alembic_cfg = Config(str(ALEMBIC_INI))
+    alembic_cfg.attributes["configure_logger"] = False
+
+    tables = set(inspect(engine).get_table_names())
+
+    with engine.connect() as connection:
+        # Alembic manages the transactions on this connection itself
+        alembic_cfg.attributes["connection"] = connection
+
+        if "users" in tables and "alembic_version" not in tables:
+            # Database created before migrations existed: mark it as the
+            # baseline so only the later revisions are applied
+            command.stamp(alembic_cfg, BASELINE_REVISION)
+
+        command.upgrade(alembic_cfg, revision)
+        connection.commit()
 
 
 def init_db():
     # Create engine
     engine = create_engine(str(settings.DATABASE_URL))
 
-    # Create all tables
-    UserBase.metadata.create_all(bind=engine)
-    QuizBase.metadata.create_all(bind=engine)
+    # Create or upgrade all tables
+    migrate(engine)
+    engine.dispose()
 
-    print("Database tables created successfully!")
+    print("Database is up to date!")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,13 @@
 from fastapi import FastAPI
 
+from backend.auth.hashing import configure_hash_cost, password_hasher
+from backend.auth.token_cache import token_cache
 from backend.endpoints import router as api_router
+from backend.gateways.trivia import async_trivia_gateway
+from backend.middleware import read_your_writes
+from backend.service.import_jobs import import_job_runner
+from backend.service.question_bank import question_bank_prefetcher
+from backend.service.response_cache import response_cache
 
 app = FastAPI(
     title="InnoQuiz API",
@@ -61,3 +68,15 @@ app = FastAPI(
 )
 
 app.include_router(api_router)
+app.middleware("http")(read_your_writes)
+app.add_event_handler("startup", configure_hash_cost)
+app.add_event_handler("startup", response_cache.start)
+app.add_event_handler("startup", token_cache.start)
+app.add_event_handler("shutdown", password_hasher.shutdown)
+app.add_event_handler("startup", question_bank_prefetcher.start)
+app.add_event_handler("startup", import_job_runner.resume)
+app.add_event_handler("shutdown", import_job_runner.shutdown)
+app.add_event_handler("shutdown", question_bank_prefetcher.stop)
+app.add_event_handler("shutdown", async_trivia_gateway.aclose)
+app.add_event_handler("shutdown", response_cache.close)
+app.add_event_handler("shutdown", token_cache.close)
@@ -0,0 +1,29 @@
+"""
+HTTP middleware of the application
+"""
+
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+
+from backend.config import settings
+from backend.db import READ_PRIMARY_COOKIE
+
+
+async def read_your_writes(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """
+    Send the client's reads to the primary database for a while after a
+    successful request that used it, so the client sees its own writes
+    """
+    response = await call_next(request)
+    if getattr(request.state, "used_primary", False) and response.status_code < 400:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            "1",
+            max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
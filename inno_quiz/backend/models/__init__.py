@@ -5,3 +5,6 @@ from .question import Question
 from .answer_option import AnswerOption
 from .user_attempt import UserAttempt
 from .user_answer import UserAnswer
+from .bank_question import BankQuestion
+from .import_job import ImportJob
+from .lease import Lease
@@ -9,7 +9,7 @@ class AnswerOption(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     question_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("questions.id"), nullable=False
+        Integer, ForeignKey("questions.id"), nullable=False, index=True
     )
     text: Mapped[str] = mapped_column(String(512), nullable=False)
     is_correct: Mapped[bool] = mapped_column(Boolean, default=False)
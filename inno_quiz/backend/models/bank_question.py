@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+import json
+from typing import Optional
+
+from sqlalchemy import Integer, DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+# Question fetched from Open Trivia DB, kept to serve later imports
+class BankQuestion(Base):
+    __tablename__ = "question_bank"
+    __table_args__ = (
+        Index("ix_question_bank_category_difficulty", "category_id", "difficulty"),
+        # Serves samples of a category read in id order, see `BankQuestionRepo.sample`
+        Index("ix_question_bank_category_id", "category_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # Open Trivia DB category the question was requested for, None for any category
+    category_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    category: Mapped[str] = mapped_column(String(128), nullable=False)
+    type: Mapped[str] = mapped_column(String(16), nullable=False)
+    difficulty: Mapped[str] = mapped_column(String(16), nullable=False)
+    question: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
+    correct_answer: Mapped[str] = mapped_column(String(512), nullable=False)
+    incorrect_answers: Mapped[str] = mapped_column(String, nullable=False, default="[]")
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+
+    def get_incorrect_answers(self) -> list[str]:
+        """Convert the stored JSON string to a list of answers."""
+        return json.loads(self.incorrect_answers)
+
+    def set_incorrect_answers(self, answers: list[str]) -> None:
+        """Convert a list of answers to a JSON string for storage."""
+        self.incorrect_answers = json.dumps(answers)
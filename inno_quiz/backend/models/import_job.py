@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+import json
+import uuid
+from typing import Optional
+
+from sqlalchemy import Integer, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# Import of external questions into a quiz run in the background
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    quiz_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("quizzes.id"), nullable=False, index=True
+    )
+    username: Mapped[str] = mapped_column(
+        String(64), ForeignKey("users.username"), nullable=False
+    )
+    # queued, running, succeeded or failed
+    status: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    categories: Mapped[str] = mapped_column(String, nullable=False, default="[]")
+    difficulties: Mapped[str] = mapped_column(String, nullable=False, default="[]")
+    # Continuation of the import, None until it is planned
+    plan: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    requested: Mapped[int] = mapped_column(Integer, nullable=False)
+    imported: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    unavailable: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
+    # Worker running the job and when it last renewed its lease; unfinished
+    # jobs are resumed once the lease expires, see `ImportJobRunner`
+    owner: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=_now, onupdate=_now)
+
+    def get_categories(self) -> list[Optional[int]]:
+        """Convert the stored JSON string to a list of category ids."""
+        return json.loads(self.categories)
+
+    def get_difficulties(self) -> list[Optional[str]]:
+        """Convert the stored JSON string to a list of difficulties."""
+        return json.loads(self.difficulties)
@@ -10,10 +10,12 @@ class Question(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     quiz_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("quizzes.id"), nullable=False
+        UUID(as_uuid=True), ForeignKey("quizzes.id"), nullable=False, index=True
     )
     text: Mapped[str] = mapped_column(String(512), nullable=False)
 
     quiz = relationship("Quiz", back_populates="questions")
-    answer_options = relationship("AnswerOption", back_populates="question")
+    answer_options = relationship(
+        "AnswerOption", back_populates="question", order_by="AnswerOption.id"
+    )
     user_answers = relationship("UserAnswer", back_populates="question")
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import String, Boolean, DateTime, ForeignKey
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
@@ -15,11 +15,15 @@ class Quiz(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     author_username: Mapped[str] = mapped_column(
-        String(64), ForeignKey("users.username"), nullable=False
+        String(64), ForeignKey("users.username"), nullable=False, index=True
     )
     name: Mapped[str] = mapped_column(String(128), nullable=False)
     category: Mapped[str] = mapped_column(String(64), nullable=False)
     is_submitted: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Bumped whenever the questions or the quiz info change, used in ETags
+    content_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.now(timezone.utc)
     )
@@ -17,7 +17,7 @@ class UserAnswer(Base):
         String, ForeignKey("questions.id"), primary_key=True
     )
     submitted_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.now(timezone.utc)
+        DateTime, default=lambda: datetime.now(timezone.utc)
     )
     selected_options: Mapped[str] = mapped_column(String, nullable=False, default="[]")
 
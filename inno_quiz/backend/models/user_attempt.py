@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Float, Index, desc
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -9,16 +9,26 @@ from .base import Base
 
 class UserAttempt(Base):
     __tablename__ = "user_attempts"
+    __table_args__ = (
+        # Serves leaderboard pages in their exact order (score desc, completion
+        # time, id), so they are walked from the index without a sort, and
+        # rank counting; its leading quiz_id column also serves lookups by quiz
+        Index(
+            "ix_user_attempts_leaderboard", "quiz_id", desc("score"), "completion_time", "id"
+        ),
+        # Serves exports of a quiz's attempts in the order they started
+        Index("ix_user_attempts_quiz_started", "quiz_id", "started_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     username: Mapped[str] = mapped_column(
-        String(64), ForeignKey("users.username"), nullable=False
+        String(64), ForeignKey("users.username"), nullable=False, index=True
     )
     quiz_id: Mapped[str] = mapped_column(
         UUID(as_uuid=True), ForeignKey("quizzes.id"), nullable=False
     )
     started_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.now(timezone.utc)
+        DateTime, default=lambda: datetime.now(timezone.utc)
     )
     score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     completion_time: Mapped[float] = mapped_column(Float, nullable=True)
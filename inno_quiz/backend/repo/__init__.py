@@ -4,3 +4,7 @@ from .answer_option import answer_option
 from .user import user
 from .user_attempt import user_attempt
 from .user_answer import user_answer
+from . import aio
+from .bank_question import bank_question
+from .import_job import import_job
+from .lease import lease
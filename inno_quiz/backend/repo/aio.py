@@ -0,0 +1,52 @@
+"""
+Async variants of the data operations
+"""
+
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .quiz import quiz as sync_quiz
+from .question import question as sync_question
+from .answer_option import answer_option as sync_answer_option
+from .user import user as sync_user
+from .user_attempt import user_attempt as sync_user_attempt
+from .user_answer import user_answer as sync_user_answer
+from .bank_question import bank_question as sync_bank_question
+from .import_job import import_job as sync_import_job
+
+RepoType = TypeVar("RepoType")  # pylint: disable=invalid-name
+
+
+class AsyncCRUD(Generic[RepoType]):
+    """
+    Async variant of a CRUD object.
+
+    Every method of the wrapped repo becomes a coroutine taking an
+    AsyncSession instead of a Session. The query code of the sync repo runs
+    on the session's asyncio connection through `AsyncSession.run_sync`,
+    so statements are awaited on the event loop and never block a thread.
+    """
+
+    def __init__(self, sync_repo: RepoType):
+        self.sync_repo = sync_repo
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        method = getattr(self.sync_repo, name)
+
+        async def run(db: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+            return await db.run_sync(lambda session: method(session, *args, **kwargs))
+
+        run.__name__ = name
+        run.__doc__ = method.__doc__
+        return run
+
+
+quiz = AsyncCRUD(sync_quiz)
+question = AsyncCRUD(sync_question)
+answer_option = AsyncCRUD(sync_answer_option)
+user = AsyncCRUD(sync_user)
+user_attempt = AsyncCRUD(sync_user_attempt)
+user_answer = AsyncCRUD(sync_user_answer)
+bank_question = AsyncCRUD(sync_bank_question)
+import_job = AsyncCRUD(sync_import_job)
@@ -14,7 +14,11 @@ class AnswerOptionRepo(CRUDBase[AnswerOption, AnswerOptionCreate, AnswerOptionRe
         """
         Get answer options for a specific question
         """
-        query = select(AnswerOption).where(AnswerOption.question_id == question_id)
+        query = (
+            select(AnswerOption)
+            .where(AnswerOption.question_id == question_id)
+            .order_by(AnswerOption.id)
+        )
         result = db.execute(query)
         options = result.scalars().all()
         return options
@@ -0,0 +1,117 @@
+import random
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .default import CRUDBase
+from backend.gateways.trivia import TriviaQuestion
+from backend.models.bank_question import BankQuestion
+from backend.models.question import Question
+
+
+class BankQuestionRepo(CRUDBase[BankQuestion, TriviaQuestion, TriviaQuestion]):
+    def sample(
+        self,
+        db: Session,
+        *,
+        amount: int,
+        category_id: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        exclude_quiz_id: Optional[UUID] = None,
+    ) -> List[TriviaQuestion]:
+        """
+        Pick up to amount random questions of a category and difficulty,
+        any when None, leaving out questions the quiz already has.
+        Every question is the first one from a random id on, wrapping around
+        to the lowest ids, so picks are spread over the bank and it is never
+        sorted as a whole
+        """
+        filters = []
+        if category_id is not None:
+            filters.append(BankQuestion.category_id == category_id)
+        if difficulty is not None:
+            filters.append(BankQuestion.difficulty == difficulty)
+        lowest, highest = db.execute(
+            select(func.min(BankQuestion.id), func.max(BankQuestion.id)).where(*filters)
+        ).one()
+        if lowest is None:
+            return []
+        if exclude_quiz_id is not None:
+            filters.append(
+                BankQuestion.question.not_in(
+                    select(Question.text).where(Question.quiz_id == exclude_quiz_id)
+                )
+            )
+        query = select(BankQuestion).where(*filters).order_by(BankQuestion.id).limit(1)
+        picked: List[BankQuestion] = []
+        while len(picked) < amount:
+            start = random.randint(lowest, highest)
+            unpicked = BankQuestion.id.not_in([q.id for q in picked])
+            pick = db.scalars(query.where(BankQuestion.id >= start, unpicked)).first()
+            if pick is None:
+                pick = db.scalars(query.where(BankQuestion.id < start, unpicked)).first()
+            if pick is None:
+                # Every matching question is picked
+                break
+            picked.append(pick)
+        return [
+            TriviaQuestion(
+                category=q.category,
+                type=q.type,
+                difficulty=q.difficulty,
+                question=q.question,
+                correct_answer=q.correct_answer,
+                incorrect_answers=q.get_incorrect_answers(),
+            )
+            for q in picked
+        ]
+
+    def add_many(
+        self, db: Session, category_id: Optional[int], questions: Sequence[TriviaQuestion]
+    ) -> int:
+        """
+        Store questions the bank does not hold yet and commit.
+        Returns the number of questions added
+        """
+        texts = {q.question for q in questions}
+        known = set(
+            db.scalars(select(BankQuestion.question).where(BankQuestion.question.in_(texts)))
+        )
+        added = 0
+        for q in questions:
+            if q.question in known:
+                continue
+            known.add(q.question)
+            bank_question = BankQuestion(
+                category_id=category_id,
+                category=q.category,
+                type=q.type,
+                difficulty=q.difficulty,
+                question=q.question,
+                correct_answer=q.correct_answer,
+            )
+            bank_question.set_incorrect_answers(q.incorrect_answers)
+            db.add(bank_question)
+            added += 1
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent import stored some of them first, they are banked anyway
+            db.rollback()
+            return 0
+        return added
+
+    def count_by_category(self, db: Session) -> Dict[Optional[int], int]:
+        """
+        Count stored questions per requested category
+        """
+        query = select(BankQuestion.category_id, func.count()).group_by(
+            BankQuestion.category_id
+        )
+        return {category_id: count for category_id, count in db.execute(query)}
+
+
+bank_question = BankQuestionRepo(BankQuestion)
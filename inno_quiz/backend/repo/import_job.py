@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from .default import CRUDBase
+from backend.domain.import_job import ImportJobRead, ImportJobStatus
+from backend.models.import_job import ImportJob
+
+UNFINISHED = [ImportJobStatus.queued, ImportJobStatus.running]
+
+
+def _utcnow() -> datetime:
+    # Stored without time zone, in UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _lease_expired(lease: float):
+    """Condition of jobs without an owner or whose owner did not renew the lease in time"""
+    return or_(
+        ImportJob.owner.is_(None),
+        ImportJob.heartbeat_at.is_(None),
+        ImportJob.heartbeat_at < _utcnow() - timedelta(seconds=lease),
+    )
+
+
+class ImportJobRepo(CRUDBase[ImportJob, ImportJobRead, ImportJobRead]):
+    def get_claimable(self, db: Session, lease: float) -> List[UUID]:
+        """
+        Get the ids of unfinished jobs that may be claimed, oldest first:
+        jobs without an owner or whose owner did not renew its lease for lease seconds
+        """
+        query = (
+            select(ImportJob.id)
+            .where(ImportJob.status.in_(UNFINISHED), _lease_expired(lease))
+            .order_by(ImportJob.created_at)
+        )
+        return db.scalars(query).all()
+
+    def claim(self, db: Session, job_id: UUID, owner: str, lease: float) -> bool:
+        """
+        Make owner the owner of an unfinished job that may be claimed and commit.
+        The check and the update are a single statement, so of several
+        workers claiming a job at once only one succeeds
+        """
+        result = db.execute(
+            update(ImportJob)
+            .where(
+                ImportJob.id == job_id,
+                ImportJob.status.in_(UNFINISHED),
+                _lease_expired(lease),
+            )
+            .values(owner=owner, heartbeat_at=_utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    def renew(self, db: Session, owner: str, job_ids: Sequence[UUID]) -> None:
+        """
+        Renew the lease of owner on its unfinished jobs among job_ids and commit
+        """
+        db.execute(
+            update(ImportJob)
+            .where(
+                ImportJob.id.in_(job_ids),
+                ImportJob.owner == owner,
+                ImportJob.status.in_(UNFINISHED),
+            )
+            .values(heartbeat_at=_utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def release(self, db: Session, owner: str) -> None:
+        """
+        Give up the unfinished jobs of owner so other workers resume them at once, and commit
+        """
+        db.execute(
+            update(ImportJob)
+            .where(ImportJob.owner == owner, ImportJob.status.in_(UNFINISHED))
+            .values(owner=None, heartbeat_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def get_by_quiz_id(self, db: Session, quiz_id: UUID, job_id: UUID) -> Optional[ImportJob]:
+        """
+        Get a job of a quiz, None if the quiz has no such job
+        """
+        query = select(ImportJob).where(ImportJob.id == job_id, ImportJob.quiz_id == quiz_id)
+        return db.scalar(query)
+
+    def set_fields(
+        self, db: Session, job_id: UUID, *, owner: Optional[str] = None, **values: Any
+    ) -> bool:
+        """
+        Update fields of a job and commit.
+        With owner, only while the job belongs to owner; returns whether it was updated
+        """
+        query = update(ImportJob).where(ImportJob.id == job_id)
+        if owner is not None:
+            query = query.where(ImportJob.owner == owner)
+        result = db.execute(
+            query.values(**values).execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+
+import_job = ImportJobRepo(ImportJob)
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+from pydantic import BaseModel
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .default import CRUDBase
+from backend.models.lease import Lease
+
+
+def _utcnow() -> datetime:
+    # Stored without time zone, in UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class LeaseRepo(CRUDBase[Lease, BaseModel, BaseModel]):
+    def acquire(self, db: Session, name: str, owner: str, duration: float) -> bool:
+        """
+        Take or renew the lease name for duration seconds and commit.
+        Fails while another owner holds an unexpired lease; of several
+        workers acquiring a free lease at once only one succeeds
+        """
+        now = _utcnow()
+        expires_at = now + timedelta(seconds=duration)
+        result = db.execute(
+            update(Lease)
+            .where(Lease.name == name, or_(Lease.owner == owner, Lease.expires_at < now))
+            .values(owner=owner, expires_at=expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            db.commit()
+            return True
+        if db.get(Lease, name) is not None:
+            db.commit()
+            return False
+        db.add(Lease(name=name, owner=owner, expires_at=expires_at))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker created it first
+            db.rollback()
+            return False
+        return True
+
+
+lease = LeaseRepo(Lease)
@@ -1,13 +1,15 @@
 from uuid import UUID
-from typing import List
+from typing import Dict, List
 
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, insert, select, func
+from sqlalchemy.orm import Session, selectinload
 
 from .default import CRUDBase
+from .quiz import quiz as quiz_repo
 from backend.models.question import Question
 from backend.models.answer_option import AnswerOption
 from backend.domain.question import QuestionCreate, QuestionRead
+from backend.domain.question_request import QuestionRequest
 
 
 class QuestionRepo(CRUDBase[Question, QuestionCreate, QuestionRead]):
@@ -15,7 +17,7 @@ class QuestionRepo(CRUDBase[Question, QuestionCreate, QuestionRead]):
         """
         Get all questions for a specific quiz
         """
-        query = select(Question).where(Question.quiz_id == quiz_id)
+        query = select(Question).where(Question.quiz_id == quiz_id).order_by(Question.id)
         result = db.execute(query)
         questions = result.scalars().all()
         return [QuestionRead.model_validate(q) for q in questions]
@@ -24,7 +26,77 @@ class QuestionRepo(CRUDBase[Question, QuestionCreate, QuestionRead]):
         """
         Get all questions for a specific quiz (sync version)
         """
-        return db.query(Question).filter(Question.quiz_id == quiz_id).all()
+        return (
+            db.query(Question)
+            .filter(Question.quiz_id == quiz_id)
+            .order_by(Question.id)
+            .all()
+        )
+
+    def content_query(self, quiz_id: UUID) -> Select:
+        """
+        Rows of question id, question text, option text and option correctness
+        of a quiz, ordered by question then option. A question without options
+        has a single row with None option columns.
+        Execute it with `yield_per` to stream a quiz without loading it whole
+        """
+        return (
+            select(Question.id, Question.text, AnswerOption.text, AnswerOption.is_correct)
+            .outerjoin(AnswerOption, AnswerOption.question_id == Question.id)
+            .where(Question.quiz_id == quiz_id)
+            .order_by(Question.id, AnswerOption.id)
+        )
+
+    def get_with_options_by_quiz_id(self, db: Session, quiz_id: UUID) -> List[Question]:
+        """
+        Get all questions for a specific quiz with their answer options loaded.
+        Options are fetched in a single extra statement, ordered by option id
+        """
+        query = (
+            select(Question)
+            .where(Question.quiz_id == quiz_id)
+            .options(selectinload(Question.answer_options))
+            .order_by(Question.id)
+        )
+        return db.scalars(query).all()
+
+    def get_with_options_by_ids(self, db: Session, ids: List[int]) -> List[Question]:
+        """
+        Get questions by their ids with their answer options loaded
+        """
+        if not ids:
+            return []
+        query = (
+            select(Question)
+            .where(Question.id.in_(ids))
+            .options(selectinload(Question.answer_options))
+            .order_by(Question.id)
+        )
+        return db.scalars(query).all()
+
+    def get_answer_key(self, db: Session, quiz_id: UUID) -> Dict[int, List[int]]:
+        """
+        Get the answer key of a quiz in a single query:
+        question id -> indices of its correct options (in option id order)
+        """
+        query = (
+            select(Question.id, AnswerOption.is_correct)
+            .outerjoin(AnswerOption, AnswerOption.question_id == Question.id)
+            .where(Question.quiz_id == quiz_id)
+            .order_by(Question.id, AnswerOption.id)
+        )
+        answer_key: Dict[int, List[int]] = {}
+        option_counts: Dict[int, int] = {}
+        for question_id, is_correct in db.execute(query):
+            correct_indices = answer_key.setdefault(question_id, [])
+            if is_correct is None:
+                # Question without any options
+                continue
+            index = option_counts.get(question_id, 0)
+            option_counts[question_id] = index + 1
+            if is_correct:
+                correct_indices.append(index)
+        return answer_key
 
     def count_by_quiz_id(self, db: Session, quiz_id: str) -> int:
         """
@@ -45,7 +117,7 @@ class QuestionRepo(CRUDBase[Question, QuestionCreate, QuestionRead]):
         correct_options: List[int],
     ) -> Question:
         """
-        Create a question with its answer options
+        Create a question with its answer options and bump the quiz content version
         """
         # Create question
         question = Question(text=text, quiz_id=quiz_id)
@@ -60,9 +132,53 @@ class QuestionRepo(CRUDBase[Question, QuestionCreate, QuestionRead]):
             )
             db.add(option)
 
+        quiz_repo.bump_content_version(db, quiz_id)
         db.commit()
         db.refresh(question)
         return question
 
+    def bulk_create_with_options(
+        self, db: Session, quiz_id: UUID, questions: List[QuestionRequest]
+    ) -> List[int]:
+        """
+        Create many questions with their answer options in one transaction
+        and bump the quiz content version.
+        Questions are inserted with a multi-row INSERT .. RETURNING,
+        options with a single executemany.
+        Returns ids of the created questions in the order of `questions`
+        """
+        if not questions:
+            return []
+
+        rows = [{"quiz_id": quiz_id, "text": q.text} for q in questions]
+        if db.get_bind().dialect.name == "sqlite":
+            # Asking RETURNING for parameter order makes SQLite fall back to one
+            # INSERT per row; its rowids are assigned in VALUES order anyway
+            question_ids = sorted(
+                db.scalars(insert(Question).returning(Question.id), rows).all()
+            )
+        else:
+            # Other databases may assign and return ids in any order
+            question_ids = db.scalars(
+                insert(Question).returning(Question.id, sort_by_parameter_order=True),
+                rows,
+            ).all()
+
+        option_rows = [
+            {
+                "question_id": question_id,
+                "text": option_text,
+                "is_correct": i in q.correct_options,
+            }
+            for question_id, q in zip(question_ids, questions)
+            for i, option_text in enumerate(q.options)
+        ]
+        if option_rows:
+            db.execute(insert(AnswerOption), option_rows)
+
+        quiz_repo.bump_content_version(db, quiz_id)
+        db.commit()
+        return question_ids
+
 
 question = QuestionRepo(Question)
@@ -1,6 +1,7 @@
 from typing import List, Optional
 from uuid import UUID
 
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from backend.models.quiz import Quiz
@@ -21,5 +22,23 @@ class QuizRepo(CRUDBase[Quiz, QuizCreate, QuizRead]):
         """
         return db.query(Quiz).filter(Quiz.author_username == author_username).all()
 
+    def get_content_version(self, db: Session, id: UUID) -> Optional[int]:
+        """
+        Get the content version of a quiz, None if the quiz does not exist
+        """
+        return db.scalar(select(Quiz.content_version).where(Quiz.id == id))
+
+    def bump_content_version(self, db: Session, id: UUID) -> None:
+        """
+        Increment the content version of a quiz in the current transaction.
+        The caller commits
+        """
+        db.execute(
+            update(Quiz)
+            .where(Quiz.id == id)
+            .values(content_version=Quiz.content_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
 
 quiz = QuizRepo(Quiz)
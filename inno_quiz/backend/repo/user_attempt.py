@@ -1,7 +1,12 @@
-from typing import List
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Select, and_, func, insert, or_, select
 from sqlalchemy.orm import Session
 
 from .default import CRUDBase
+from backend.models.user_answer import UserAnswer
 from backend.models.user_attempt import UserAttempt
 from backend.domain.user_attempt import UserAttemptCreate, UserAttemptRead
 
@@ -13,6 +18,133 @@ class UserAttemptRepo(CRUDBase[UserAttempt, UserAttemptCreate, UserAttemptRead])
         """
         return db.query(UserAttempt).filter(UserAttempt.quiz_id == quiz_id).all()
 
+    def count_by_quiz_id(self, db: Session, quiz_id: str) -> int:
+        """
+        Count user attempts for a specific quiz
+        """
+        query = (
+            select(func.count())
+            .select_from(UserAttempt)
+            .where(UserAttempt.quiz_id == quiz_id)
+        )
+        return db.scalar(query)
+
+    def export_query(
+        self,
+        quiz_id: UUID,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Select:
+        """
+        Rows of the attempts of a quiz started in [since, until) joined with
+        their answers, one row per answer, in the order attempts started.
+        An attempt without answers has a single row with None answer columns.
+        Execute it with `yield_per` to stream the rows from a server-side cursor
+        """
+        query = (
+            select(
+                UserAttempt.id,
+                UserAttempt.username,
+                UserAttempt.started_at,
+                UserAttempt.score,
+                UserAttempt.completion_time,
+                UserAnswer.question_id,
+                UserAnswer.submitted_at,
+                UserAnswer.selected_options,
+            )
+            .outerjoin(UserAnswer, UserAnswer.attempt_id == UserAttempt.id)
+            .where(UserAttempt.quiz_id == quiz_id)
+            .order_by(UserAttempt.started_at, UserAttempt.id, UserAnswer.question_id)
+        )
+        if since is not None:
+            query = query.where(UserAttempt.started_at >= since)
+        if until is not None:
+            query = query.where(UserAttempt.started_at < until)
+        return query
+
+    def get_leaderboard_page(
+        self,
+        db: Session,
+        quiz_id: str,
+        *,
+        limit: int,
+        after: Optional[Tuple[int, float, int]] = None,
+    ) -> List[UserAttempt]:
+        """
+        Get user attempts for a quiz in leaderboard order:
+        score (desc), completion time (asc), id (asc).
+        `after` is the (score, completion_time, id) of the last attempt of the
+        previous page; the page starts right behind it
+        """
+        query = (
+            select(UserAttempt)
+            .where(UserAttempt.quiz_id == quiz_id)
+            .order_by(
+                UserAttempt.score.desc(),
+                UserAttempt.completion_time.asc(),
+                UserAttempt.id.asc(),
+            )
+            .limit(limit)
+        )
+        if after is not None:
+            score, completion_time, attempt_id = after
+            query = query.where(
+                or_(
+                    UserAttempt.score < score,
+                    and_(
+                        UserAttempt.score == score,
+                        UserAttempt.completion_time > completion_time,
+                    ),
+                    and_(
+                        UserAttempt.score == score,
+                        UserAttempt.completion_time == completion_time,
+                        UserAttempt.id > attempt_id,
+                    ),
+                )
+            )
+        return db.scalars(query).all()
+
+    def get_score_counts(self, db: Session, quiz_id: str) -> Tuple[Dict[int, int], int]:
+        """
+        Get the number of attempts per score for a specific quiz,
+        and the id of the last attempt counted (0 without attempts)
+        """
+        query = (
+            select(UserAttempt.score, func.count(), func.max(UserAttempt.id))
+            .where(UserAttempt.quiz_id == quiz_id)
+            .group_by(UserAttempt.score)
+        )
+        counts = {}
+        last_attempt_id = 0
+        for score, count, max_id in db.execute(query):
+            counts[score] = count
+            last_attempt_id = max(last_attempt_id, max_id)
+        return counts, last_attempt_id
+
+    def get_rank(self, db: Session, attempt: UserAttempt) -> int:
+        """
+        Get the 1-based leaderboard position of an attempt within its quiz.
+        Attempts rank by score (desc), completion time (asc), then submission order
+        """
+        ahead = or_(
+            UserAttempt.score > attempt.score,
+            and_(
+                UserAttempt.score == attempt.score,
+                UserAttempt.completion_time < attempt.completion_time,
+            ),
+            and_(
+                UserAttempt.score == attempt.score,
+                UserAttempt.completion_time == attempt.completion_time,
+                UserAttempt.id < attempt.id,
+            ),
+        )
+        query = (
+            select(func.count())
+            .select_from(UserAttempt)
+            .where(UserAttempt.quiz_id == attempt.quiz_id, ahead)
+        )
+        return db.scalar(query) + 1
+
     def create(
         self,
         db: Session,
@@ -36,5 +168,47 @@ class UserAttemptRepo(CRUDBase[UserAttempt, UserAttemptCreate, UserAttemptRead])
         db.refresh(attempt)
         return attempt
 
+    def create_with_answers(
+        self,
+        db: Session,
+        *,
+        username: str,
+        quiz_id: str,
+        score: int,
+        completion_time: float,
+        answers: List[Tuple[int, List[int]]]
+    ) -> UserAttempt:
+        """
+        Create a user attempt with all its answers in one transaction.
+        `answers` holds (question id, selected options) pairs.
+        Nothing is stored if any insert fails
+        """
+        attempt = UserAttempt(
+            username=username,
+            quiz_id=quiz_id,
+            score=score,
+            completion_time=completion_time,
+        )
+        try:
+            db.add(attempt)
+            db.flush()  # Get the ID
+            if answers:
+                db.execute(
+                    insert(UserAnswer),
+                    [
+                        {
+                            "attempt_id": attempt.id,
+                            "question_id": str(question_id),
+                            "selected_options": json.dumps(selected_options),
+                        }
+                        for question_id, selected_options in answers
+                    ],
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return attempt
+
 
 user_attempt = UserAttemptRepo(UserAttempt)
@@ -0,0 +1,140 @@
+"""
+Compiled per-quiz answer keys cached in process memory
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from .pending_loads import PendingLoads
+
+AnswerKey = Mapping[int, FrozenSet[int]]
+
+
+def compile_answer_key(raw_key: Dict[int, List[int]]) -> AnswerKey:
+    """
+    Freeze a question id -> correct indices mapping into an immutable answer key
+    """
+    return MappingProxyType(
+        {question_id: frozenset(indices) for question_id, indices in raw_key.items()}
+    )
+
+
+class AnswerKeyCache:
+    """
+    LRU cache of compiled answer keys keyed by quiz id.
+
+    Keys are stored with the content version of their quiz and only served
+    for that version. Every write to a quiz's questions bumps the version
+    in the database, so a key cached before another worker added a question
+    is reloaded instead of rejecting answers to it.
+
+    A key loaded concurrently with a quiz change is returned to its caller
+    but never stored, see `PendingLoads`.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # quiz id -> (content version, answer key)
+        self._keys: "OrderedDict[Any, Tuple[int, AnswerKey]]" = OrderedDict()
+        self._loads = PendingLoads()
+        self._lock = Lock()
+
+    def get(
+        self, quiz_id: Any, version: int, loader: Callable[[], Dict[int, List[int]]]
+    ) -> AnswerKey:
+        """
+        Get the compiled answer key of a quiz at a content version,
+        calling loader on a miss
+        """
+        answer_key, generation = self._lookup(quiz_id, version)
+        if answer_key is not None:
+            return answer_key
+        try:
+            answer_key = compile_answer_key(loader())
+        except BaseException:
+            self._abandon(quiz_id, generation)
+            raise
+        self._store(quiz_id, version, answer_key, generation)
+        return answer_key
+
+    async def get_async(
+        self,
+        quiz_id: Any,
+        version: int,
+        loader: Callable[[], Awaitable[Dict[int, List[int]]]],
+    ) -> AnswerKey:
+        """
+        Variant of `get` awaiting loader
+        """
+        answer_key, generation = self._lookup(quiz_id, version)
+        if answer_key is not None:
+            return answer_key
+        try:
+            answer_key = compile_answer_key(await loader())
+        except BaseException:
+            self._abandon(quiz_id, generation)
+            raise
+        self._store(quiz_id, version, answer_key, generation)
+        return answer_key
+
+    def invalidate(self, quiz_id: Any) -> None:
+        """
+        Drop the answer key of a quiz whose questions or state changed
+        """
+        with self._lock:
+            self._keys.pop(quiz_id, None)
+            self._loads.invalidate(quiz_id)
+
+    def _lookup(self, quiz_id: Any, version: int) -> Tuple[Optional[AnswerKey], int]:
+        """
+        Get the cached key of a quiz at version, or start loading it
+        and get its generation
+        """
+        with self._lock:
+            entry = self._keys.get(quiz_id)
+            if entry is not None and entry[0] == version:
+                self._keys.move_to_end(quiz_id)
+                self.hits += 1
+                return entry[1], 0
+            self.misses += 1
+            return None, self._loads.start(quiz_id)
+
+    def _store(self, quiz_id: Any, version: int, answer_key: AnswerKey, generation: int) -> None:
+        with self._lock:
+            unchanged = self._loads.finish(quiz_id, generation)
+            entry = self._keys.get(quiz_id)
+            newer_cached = entry is not None and entry[0] > version
+            if unchanged and not newer_cached:
+                self._keys[quiz_id] = (version, answer_key)
+                self._keys.move_to_end(quiz_id)
+                if len(self._keys) > self.max_entries:
+                    self._keys.popitem(last=False)
+
+    def _abandon(self, quiz_id: Any, generation: int) -> None:
+        with self._lock:
+            self._loads.finish(quiz_id, generation)
+
+    def clear(self) -> None:
+        """
+        Drop all answer keys and reset counters
+        """
+        with self._lock:
+            self._keys.clear()
+            self._loads.invalidate_all()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit and miss counters with the current number of cached keys
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._keys)}
+
+
+# Create a singleton instance
+answer_key_cache = AnswerKeyCache()
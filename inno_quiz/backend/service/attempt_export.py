@@ -0,0 +1,89 @@
+"""
+Export of quiz attempts with their answers for analytics, as JSON Lines or CSV
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Optional
+from uuid import UUID
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend import repo
+from backend.config import settings
+from backend.db import AsyncSessionLocal
+from backend.domain.quiz_request import ContentFormat
+
+from .quiz_content import csv_row
+
+COLUMNS = [
+    "attempt_id",
+    "username",
+    "started_at",
+    "score",
+    "completion_time",
+    "question_id",
+    "submitted_at",
+    "selected_options",
+]
+
+
+def to_database_time(moment: Optional[datetime]) -> Optional[datetime]:
+    """
+    Naive UTC datetime as stored in the database, naive datetimes are taken as UTC
+    """
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def export_attempts(
+    quiz_id: str,
+    content_format: ContentFormat,
+    bind: AsyncEngine,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream the attempts of a quiz started in [since, until), one line per
+    answer, in the given format. Rows are fetched from a server-side cursor
+    one batch at a time and the event loop is free between batches, so
+    memory stays constant whatever the number of rows.
+    The export runs on a session of its own on bind: it is consumed after
+    the session of the request has been closed
+    """
+    query = repo.user_attempt.export_query(
+        UUID(quiz_id), to_database_time(since), to_database_time(until)
+    ).execution_options(yield_per=settings.ATTEMPT_EXPORT_BATCH_SIZE)
+    encode = _encode_csv if content_format == ContentFormat.csv else _encode_jsonl
+    if content_format == ContentFormat.csv:
+        yield csv_row(COLUMNS)
+
+    async with AsyncSessionLocal(bind=bind) as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield "".join(encode(row) for row in rows)
+
+
+def _encode_jsonl(row: Row) -> str:
+    line = dict(zip(COLUMNS, row))
+    for column in ("started_at", "submitted_at"):
+        if line[column] is not None:
+            line[column] = line[column].isoformat()
+    if line["selected_options"] is not None:
+        line["selected_options"] = json.loads(line["selected_options"])
+    return json.dumps(line, ensure_ascii=False) + "\n"
+
+
+def _encode_csv(row: Row) -> str:
+    # Selected options are stored as a JSON array already
+    return csv_row([_csv_cell(value) for value in row])
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
@@ -0,0 +1,211 @@
+"""
+Cache storage shared by the workers serving the API
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.config import settings
+from backend.gateways.redis import RedisClient, RedisError
+from backend.gateways.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackendError(Exception):
+    """
+    The shared cache is unreachable or failed a command
+    """
+
+
+class CacheBackend(ABC):
+    """
+    Byte-level key value store with expiry, counters and pub/sub.
+
+    Implementations raise CacheBackendError when the store is unavailable;
+    callers treat that as a miss and keep serving from the database.
+    """
+
+    @abstractmethod
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """
+        Get the values of several keys in one round trip, None for missing keys
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """
+        Store a value expiring after ttl seconds
+        """
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """
+        Increment a counter, missing counters start at zero
+        """
+
+    @abstractmethod
+    def publish(self, channel: str, message: bytes) -> None:
+        """
+        Send a message to the subscribers of a channel, including this process
+        """
+
+    @abstractmethod
+    def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[bytes], None],
+        on_subscribe: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Call callback with every message published on channel.
+        on_subscribe runs whenever the subscription is (re)established,
+        messages published before it may have been missed
+        """
+
+    def close(self) -> None:
+        """
+        Release connections held by the backend
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Backend kept in process memory, shared by the caches of one process.
+    Expired values are dropped on access, the least recently used ones
+    once there are more than max_entries
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._values: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._subscribers: Dict[str, List[Callable[[bytes], None]]] = {}
+        self._lock = Lock()
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            return [self._get(key) for key in keys]
+
+    def _get(self, key: str) -> Optional[bytes]:
+        value, expires_at = self._values.get(key, (None, None))
+        if value is None:
+            return None
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._values[key]
+            return None
+        self._values.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._store(key, value, time.monotonic() + ttl)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            counter = int(self._get(key) or 0) + 1
+            self._store(key, str(counter).encode(), None)
+            return counter
+
+    def _store(self, key: str, value: bytes, expires_at: Optional[float]) -> None:
+        self._values[key] = (value, expires_at)
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+
+    def publish(self, channel: str, message: bytes) -> None:
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, ()))
+        for callback in callbacks:
+            callback(message)
+
+    def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[bytes], None],
+        on_subscribe: Optional[Callable[[], None]] = None,
+    ) -> None:
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+        if on_subscribe is not None:
+            on_subscribe()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend on a server speaking the Redis protocol, shared by all workers
+    and hosts pointed at it. Keys and channels are namespaced with prefix.
+
+    Commands block their thread for up to the client timeout, so callers run
+    them off the event loop. After repeated failures the breaker fails
+    commands at once, instead of every request waiting for the timeout while
+    the server is down.
+    """
+
+    def __init__(
+        self,
+        client: RedisClient,
+        prefix: str = "inno_quiz:",
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.breaker = breaker or CircuitBreaker()
+
+    def _execute(self, *args):
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError as e:
+            raise CacheBackendError(str(e)) from e
+        try:
+            reply = self.client.execute(*args)
+        except RedisError as e:
+            self.breaker.record_failure()
+            raise CacheBackendError(str(e)) from e
+        self.breaker.record_success()
+        return reply
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return self._execute("MGET", *(self.prefix + key for key in keys))
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._execute("SET", self.prefix + key, value, "PX", max(1, int(ttl * 1000)))
+
+    def incr(self, key: str) -> int:
+        return self._execute("INCR", self.prefix + key)
+
+    def publish(self, channel: str, message: bytes) -> None:
+        self._execute("PUBLISH", self.prefix + channel, message)
+
+    def subscribe(
+        self,
+        channel: str,
+        callback: Callable[[bytes], None],
+        on_subscribe: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.client.subscribe(self.prefix + channel, callback, on_subscribe=on_subscribe)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def create_cache_backend() -> Optional[CacheBackend]:
+    """
+    Create the shared cache configured by CACHE_BACKEND,
+    None when caches stay local to each worker
+    """
+    if settings.CACHE_BACKEND == "none":
+        return None
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCacheBackend()
+    if settings.CACHE_BACKEND == "redis":
+        client = RedisClient(settings.REDIS_URL, timeout=settings.REDIS_TIMEOUT_SECONDS)
+        breaker = CircuitBreaker(
+            failure_threshold=settings.REDIS_BREAKER_FAILURES,
+            reset_timeout=settings.REDIS_BREAKER_RESET_SECONDS,
+        )
+        return RedisCacheBackend(client, prefix=settings.CACHE_KEY_PREFIX, breaker=breaker)
+    raise ValueError(f"Unknown cache backend: {settings.CACHE_BACKEND}")
@@ -8,3 +8,31 @@ class QuizNotFoundError(ServiceError):
 
 class UserNotFoundError(ServiceError):
     ...
+
+
+class QuestionNotInQuizError(ServiceError):
+    ...
+
+
+class DuplicateAnswerError(ServiceError):
+    ...
+
+
+class InvalidCursorError(ServiceError):
+    ...
+
+
+class InvalidContinuationError(ServiceError):
+    ...
+
+
+class ImportJobNotFoundError(ServiceError):
+    ...
+
+
+class InvalidContentError(ServiceError):
+    ...
+
+
+class NotQuizAuthorError(ServiceError):
+    ...
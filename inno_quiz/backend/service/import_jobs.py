@@ -0,0 +1,260 @@
+"""
+Imports of external questions run as background jobs
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import repo
+from backend.config import settings
+from backend.db import AsyncSessionLocal, async_write_engine
+from backend.domain.import_job import ImportJobRead, ImportJobStatus
+from backend.models.import_job import ImportJob
+
+from . import errors, quiz, quiz_async, trivia_import
+from .trivia_import import ImportPlan
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLostError(Exception):
+    """The job was claimed by another runner after this one stopped renewing its lease"""
+
+
+class ImportJobRunner:
+    """
+    Runs import jobs as tasks of the event loop, at most `workers` at once;
+    further jobs stay queued.
+
+    A job imports one round of chunks at a time and stores its continuation
+    after each, so unfinished jobs resume where they stopped after a restart.
+    Upstream failures are retried `retries` times, `retry_delay` seconds
+    apart and longer each time, before the job fails.
+
+    With several worker processes, a job is run by the runner owning it.
+    Runners renew the lease on their jobs every third of `lease` seconds,
+    and take over jobs whose owner stopped renewing it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        workers: int = 2,
+        retries: int = 3,
+        retry_delay: float = 30.0,
+        lease: float = 60.0,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.lease = lease
+        # Identifies this runner as the owner of its jobs across processes and hosts
+        self.owner = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._tasks: Dict[asyncio.Task, UUID] = {}
+        self._maintenance: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(
+        self,
+        quiz_id: str,
+        count: int,
+        categories: Sequence[str],
+        username: str,
+        db: AsyncSession,
+        difficulties: Sequence[Optional[str]] = (None,),
+    ) -> ImportJobRead:
+        """
+        Store a job importing count questions per category and difficulty,
+        owned by this runner, and start it in the background
+        """
+        await quiz_async.prepare_external_import(quiz_id, db)
+        job = ImportJob(
+            quiz_id=UUID(quiz_id),
+            username=username,
+            status=ImportJobStatus.queued.value,
+            count=count,
+            categories=json.dumps([quiz.parse_category(category) for category in categories]),
+            difficulties=json.dumps(list(difficulties)),
+            requested=count * len(categories) * len(difficulties),
+            owner=self.owner,
+            heartbeat_at=datetime.now(timezone.utc).replace(tzinfo=None),
+        )
+        db.add(job)
+        await db.commit()
+        self._start(job.id)
+        return ImportJobRead.model_validate(job)
+
+    async def get(self, quiz_id: str, job_id: UUID, db: AsyncSession) -> ImportJobRead:
+        """
+        Get a job of a quiz with its progress
+        """
+        job = await repo.aio.import_job.get_by_quiz_id(db, UUID(quiz_id), job_id)
+        if job is None:
+            raise errors.ImportJobNotFoundError()
+        return ImportJobRead.model_validate(job)
+
+    async def resume(self) -> None:
+        """
+        Claim and restart the unfinished jobs no live runner owns,
+        then keep renewing the lease on running jobs and claiming
+        the jobs of runners that stopped until `shutdown`
+        """
+        resumed = await self._claim_expired()
+        if resumed:
+            logger.info("Resumed %d import jobs", resumed)
+        if self._maintenance is None or self._maintenance.done():
+            self._maintenance = asyncio.get_running_loop().create_task(self._maintain())
+
+    async def shutdown(self) -> None:
+        """
+        Stop running jobs and give them up, they resume in another worker or at the next start
+        """
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            await asyncio.gather(self._maintenance, return_exceptions=True)
+            self._maintenance = None
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        async with self.session_factory() as db:
+            await repo.aio.import_job.release(db, self.owner)
+
+    async def wait(self) -> None:
+        """
+        Wait for the jobs started so far to end
+        """
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def _start(self, job_id: UUID) -> None:
+        task = asyncio.get_running_loop().create_task(self._run(job_id))
+        # The loop only keeps weak references to tasks
+        self._tasks[task] = job_id
+        task.add_done_callback(self._forget)
+
+    def _forget(self, task: asyncio.Task) -> None:
+        self._tasks.pop(task, None)
+
+    async def _claim_expired(self) -> int:
+        async with self.session_factory() as db:
+            job_ids = await repo.aio.import_job.get_claimable(db, self.lease)
+            running = set(self._tasks.values())
+            claimed = 0
+            for job_id in job_ids:
+                if job_id in running:
+                    continue
+                if await repo.aio.import_job.claim(db, job_id, self.owner, self.lease):
+                    self._start(job_id)
+                    claimed += 1
+        return claimed
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                if self._tasks:
+                    async with self.session_factory() as db:
+                        await repo.aio.import_job.renew(db, self.owner, list(self._tasks.values()))
+                resumed = await self._claim_expired()
+                if resumed:
+                    logger.info("Took over %d import jobs of stopped workers", resumed)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Renewing import job leases failed")
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """
+        Semaphore of the running event loop bounding concurrent jobs
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._slots_loop = loop
+        return self._slots
+
+    async def _run(self, job_id: UUID) -> None:
+        async with self.slots, self.session_factory() as db:
+            try:
+                await self._import(job_id, db)
+            except LeaseLostError:
+                logger.warning("Import job %s was taken over by another worker", job_id)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.exception("Import job %s failed", job_id)
+                await db.rollback()
+                await repo.aio.import_job.set_fields(
+                    db,
+                    job_id,
+                    owner=self.owner,
+                    status=ImportJobStatus.failed.value,
+                    error=str(e)[:512],
+                )
+
+    async def _update(self, db: AsyncSession, job_id: UUID, **values: Any) -> None:
+        # Progress of a job this runner no longer owns would race its new owner
+        if not await repo.aio.import_job.set_fields(db, job_id, owner=self.owner, **values):
+            raise LeaseLostError()
+
+    async def _import(self, job_id: UUID, db: AsyncSession) -> None:
+        job = await repo.aio.import_job.get_by_id(db, job_id)
+        imported, unavailable = job.imported, job.unavailable
+        if job.plan is None:
+            plan, unplanned = await trivia_import.plan_import(
+                job.count, job.get_categories(), job.get_difficulties()
+            )
+            unavailable += unplanned
+        else:
+            plan = ImportPlan.model_validate_json(job.plan)
+        await self._update(
+            db,
+            job_id,
+            status=ImportJobStatus.running.value,
+            plan=plan.model_dump_json(),
+            unavailable=unavailable,
+        )
+
+        failures = 0
+        while plan.remaining:
+            try:
+                result = await trivia_import.import_questions(
+                    str(job.quiz_id), plan, db, budget=0
+                )
+            except ConnectionError as e:
+                failures += 1
+                if failures > self.retries:
+                    raise
+                logger.warning("Import job %s waits for the upstream: %s", job_id, e)
+                await asyncio.sleep(self.retry_delay * failures)
+                continue
+            failures = 0
+            plan = (
+                trivia_import.decode_continuation(result.continuation)
+                if result.continuation
+                else ImportPlan(remaining=[])
+            )
+            imported += len(result.questions)
+            unavailable += result.unavailable
+            await self._update(
+                db, job_id, plan=plan.model_dump_json(), imported=imported, unavailable=unavailable
+            )
+
+        await self._update(db, job_id, status=ImportJobStatus.succeeded.value)
+
+
+# Create a singleton instance
+import_job_runner = ImportJobRunner(
+    lambda: AsyncSessionLocal(bind=async_write_engine),
+    workers=settings.IMPORT_JOB_WORKERS,
+    retries=settings.IMPORT_JOB_RETRIES,
+    retry_delay=settings.IMPORT_JOB_RETRY_SECONDS,
+    lease=settings.IMPORT_JOB_LEASE_SECONDS,
+)
@@ -0,0 +1,60 @@
+"""
+Generations of the keys a cache is loading
+"""
+
+from typing import Dict, Hashable, List
+
+
+class PendingLoads:
+    """
+    Tracks the loads a cache runs without holding its lock.
+
+    A load starts under the cache's lock and gets the generation of its key;
+    invalidating the key bumps the generation, so the cache only stores a
+    result when the generation is unchanged once the load finishes. Keys are
+    forgotten when their last load finishes, so the memory used is bounded by
+    the loads in flight rather than by every key ever invalidated.
+
+    Not thread-safe: call every method with the cache's lock held.
+    """
+
+    def __init__(self):
+        # key -> [loads in flight, generation]
+        self._loads: Dict[Hashable, List[int]] = {}
+
+    def start(self, key: Hashable) -> int:
+        """
+        Start a load of key and get its generation
+        """
+        load = self._loads.setdefault(key, [0, 0])
+        load[0] += 1
+        return load[1]
+
+    def finish(self, key: Hashable, generation: int) -> bool:
+        """
+        End a load of key started at generation, whether it succeeded or not.
+        Returns True when the key was not invalidated since the load started
+        """
+        load = self._loads[key]
+        load[0] -= 1
+        if load[0] == 0:
+            del self._loads[key]
+        return load[1] == generation
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Make the loads of key in flight stale
+        """
+        load = self._loads.get(key)
+        if load is not None:
+            load[1] += 1
+
+    def invalidate_all(self) -> None:
+        """
+        Make every load in flight stale
+        """
+        for load in self._loads.values():
+            load[1] += 1
+
+    def __len__(self) -> int:
+        return len(self._loads)
@@ -0,0 +1,250 @@
+"""
+Local bank of Open Trivia DB questions read through by imports
+"""
+
+import itertools
+import logging
+import os
+import socket
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Union
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend import repo
+from backend.config import settings
+from backend.db import SessionLocal, write_engine
+from backend.gateways.trivia import (
+    AsyncTriviaGateway,
+    TriviaGateway,
+    TriviaQuery,
+    TriviaQuestion,
+    async_trivia_gateway,
+    trivia_gateway,
+)
+
+logger = logging.getLogger(__name__)
+
+# Most questions Open Trivia DB returns for one request
+MAX_BATCH = 50
+
+
+class QuestionBank:
+    """
+    Serves imports from questions stored earlier, the upstream is only asked
+    for the questions the bank is short of.
+
+    Questions stay in the bank once served, a quiz is never given a question
+    it already has. Fetched questions are banked for later imports.
+    """
+
+    def __init__(self, async_gateway: AsyncTriviaGateway):
+        self.async_gateway = async_gateway
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    async def get_many(
+        self,
+        db: AsyncSession,
+        quiz_id: UUID,
+        amount: int,
+        categories: Sequence[Optional[int]] = (None,),
+        difficulties: Sequence[Optional[str]] = (None,),
+    ) -> List[TriviaQuestion]:
+        """
+        Get amount questions for every combination of category and difficulty,
+        merged in the order of the combinations. Questions the bank is short of
+        are fetched from the upstream concurrently
+        """
+        batches = await self.get_each(
+            db,
+            quiz_id,
+            [
+                TriviaQuery(amount, category, difficulty)
+                for category, difficulty in itertools.product(categories, difficulties)
+            ],
+        )
+        return [question for batch in batches for question in batch]
+
+    async def get_each(
+        self,
+        db: AsyncSession,
+        quiz_id: UUID,
+        queries: Sequence[TriviaQuery],
+        token: Optional[str] = None,
+        return_exceptions: bool = False,
+    ) -> List[Union[List[TriviaQuestion], Exception]]:
+        """
+        Get the questions of every query, one list per query in the order
+        of the queries. The upstream is asked concurrently for the questions
+        the bank is short of, see `AsyncTriviaGateway.get_each` for token and
+        return_exceptions. When the upstream fails, a query the bank served
+        in part gets its banked questions only, fewer than its amount
+        """
+        batches: List[Union[List[TriviaQuestion], Exception]] = await db.run_sync(
+            lambda session: self._sample(session, quiz_id, queries)
+        )
+        missing = [i for i, batch in enumerate(batches) if len(batch) < queries[i].amount]
+        if missing:
+            fetched = await self.async_gateway.get_each(
+                [queries[i]._replace(amount=queries[i].amount - len(batches[i])) for i in missing],
+                token=token,
+                return_exceptions=True,
+            )
+            for i, batch in zip(missing, fetched):
+                banked = batches[i]
+                if isinstance(batch, BaseException):
+                    if banked:
+                        logger.warning("Serving banked questions only: %s", batch)
+                    elif return_exceptions:
+                        batches[i] = batch
+                    else:
+                        raise batch
+                    continue
+                await repo.aio.bank_question.add_many(db, queries[i].category, batch)
+                known = {q.question for q in banked}
+                batches[i] = banked + [q for q in batch if q.question not in known]
+        return batches
+
+    def _sample(
+        self, db: Session, quiz_id: UUID, queries: Sequence[TriviaQuery]
+    ) -> List[List[TriviaQuestion]]:
+        batches = [
+            repo.bank_question.sample(
+                db,
+                amount=amount,
+                category_id=category,
+                difficulty=difficulty,
+                exclude_quiz_id=quiz_id,
+            )
+            for amount, category, difficulty in queries
+        ]
+        # Do not hold a read transaction open while the upstream API answers
+        db.commit()
+        served = sum(len(batch) == query.amount for batch, query in zip(batches, queries))
+        with self._lock:
+            self.hits += served
+            self.misses += len(batches) - served
+        return batches
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+class QuestionBankPrefetcher:
+    """
+    Keeps at least `reserve` questions of every category in the bank,
+    topping it up from a background thread every `interval` seconds.
+
+    Requests go through the gateway's rate limiter, so imports wait for
+    at most one prefetch request. A category the upstream has no new
+    questions for is skipped until the next round.
+
+    The rate limiter only paces this process: with a lease name, only the
+    worker holding that lease in the database prefetches. The holder renews
+    it before every request; other workers take over once it has not been
+    renewed for two intervals.
+    """
+
+    def __init__(
+        self,
+        gateway: TriviaGateway,
+        session_factory: Callable[[], Session],
+        categories: Sequence[int],
+        reserve: int = 200,
+        interval: float = 300.0,
+        lease_name: Optional[str] = None,
+    ):
+        self.gateway = gateway
+        self.session_factory = session_factory
+        self.categories = list(categories)
+        self.reserve = reserve
+        self.interval = interval
+        self.lease_name = lease_name
+        # Identifies this process as the holder of the lease
+        self.owner = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.fetched = 0
+        self.errors = 0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Start topping up in the background, nothing to do without categories
+        """
+        if not self.categories or self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="question-bank-prefetch", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop after the request in flight
+        """
+        self._stopped.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=1.0)
+
+    def top_up(self) -> int:
+        """
+        Fetch questions until every category holds the reserve.
+        Returns the number of questions added
+        """
+        added = 0
+        with self.session_factory() as db:
+            counts = repo.bank_question.count_by_category(db)
+            db.commit()
+            for category in self.categories:
+                missing = self.reserve - counts.get(category, 0)
+                while missing > 0 and not self._stopped.is_set():
+                    if not self._hold_lease(db):
+                        # Another worker prefetches
+                        return added
+                    try:
+                        questions = self.gateway.get_questions(
+                            amount=min(missing, MAX_BATCH), category=category
+                        )
+                    except (ConnectionError, ValueError) as e:
+                        self.errors += 1
+                        logger.warning("Prefetching category %s failed: %s", category, e)
+                        break
+                    stored = repo.bank_question.add_many(db, category, questions)
+                    if not stored:
+                        break
+                    missing -= stored
+                    added += stored
+                    self.fetched += stored
+        return added
+
+    def _hold_lease(self, db: Session) -> bool:
+        if self.lease_name is None:
+            return True
+        return repo.lease.acquire(db, self.lease_name, self.owner, 2 * self.interval)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.top_up()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Prefetching questions failed")
+            self._stopped.wait(self.interval)
+
+
+# Create singleton instances
+question_bank = QuestionBank(async_trivia_gateway)
+question_bank_prefetcher = QuestionBankPrefetcher(
+    trivia_gateway,
+    lambda: SessionLocal(bind=write_engine),
+    categories=settings.TRIVIA_BANK_CATEGORIES,
+    reserve=settings.TRIVIA_BANK_RESERVE,
+    interval=settings.TRIVIA_BANK_REFRESH_SECONDS,
+    lease_name="question-bank-prefetch",
+)
@@ -1,3 +1,6 @@
+import base64
+import json
+from typing import Optional, Sequence, Tuple
 from uuid import uuid4, UUID
 
 from sqlalchemy.orm import Session
@@ -7,28 +10,67 @@ from backend.domain.quiz_request import (
     QuizInfoResponse,
     LeaderboardResponse,
     LeaderboardEntry,
+    ScoreBucket,
+    ScoreDistributionResponse,
     QuizQuestionsResponse,
     QuizSubmissionRequest,
     QuizSubmissionResponse,
 )
-from backend.gateways.trivia import trivia_gateway
 from backend.domain.quiz import QuizBase, QuizCreate, QuizRead
-from backend.models import Quiz
+from backend.models import Quiz, Question, UserAttempt
 from backend import repo
-from . import errors
+from backend.config import settings
+from . import errors, scoring
+from .answer_key import answer_key_cache
+from .response_cache import response_cache
+from .score_distribution import ScoreHistogram, score_distributions
 
 
-def create_quiz_template(
-    quiz_data: QuizBase, author_username: str, *, db: Session
-) -> Quiz:
-    quiz = QuizCreate(
+def _on_remote_invalidation(quiz_id: str, kinds: Tuple[str, ...]) -> None:
+    """
+    Drop the answer key and score histogram of a quiz another worker changed.
+    A new attempt there invalidates the leaderboard, the histogram misses it
+    """
+    quiz_key = UUID(quiz_id)
+    if not kinds:
+        answer_key_cache.invalidate(quiz_key)
+    if not kinds or "leaderboard" in kinds:
+        score_distributions.invalidate(quiz_key)
+
+
+response_cache.add_invalidation_listener(_on_remote_invalidation)
+
+
+def to_question_response(question: Question) -> QuestionResponse:
+    """
+    Build a question response from a question with its options loaded
+    """
+    options = question.answer_options
+    return QuestionResponse(
+        id=str(question.id),
+        text=question.text,
+        options=[opt.text for opt in options],
+        correct_options=[i for i, opt in enumerate(options) if opt.is_correct],
+    )
+
+
+def new_quiz(quiz_data: QuizBase, author_username: str) -> QuizCreate:
+    """
+    Build a new quiz of an author with a fresh id
+    """
+    return QuizCreate(
         id=uuid4(),
         name=quiz_data.name,
         category=quiz_data.category,
         author_username=author_username,
         is_submitted=quiz_data.is_submitted,
     )
-    return repo.quiz.create(db, obj_in=quiz)
+
+
+def create_quiz_template(
+    quiz_data: QuizBase, author_username: str, *, db: Session
+) -> Quiz:
+    return repo.quiz.create(db, obj_in=new_quiz(quiz_data, author_username))
 
 
 def submit_quiz(quiz_id: uuid4, *, db: Session) -> QuizRead:
@@ -38,7 +80,11 @@ def submit_quiz(quiz_id: uuid4, *, db: Session) -> QuizRead:
     quiz = repo.quiz.get_by_id(db, quiz_id)
     if quiz is None:
         raise errors.QuizNotFoundError()
-    return repo.quiz.update(db, db_obj=quiz, obj_in={"is_submitted": True})
+    repo.quiz.bump_content_version(db, quiz.id)
+    updated = repo.quiz.update(db, db_obj=quiz, obj_in={"is_submitted": True})
+    answer_key_cache.invalidate(quiz.id)
+    response_cache.invalidate(quiz.id)
+    return updated
 
 
 def add_question(
@@ -61,85 +107,70 @@ def add_question(
         correct_options=question.correct_options,
     )
 
-    # Get options separately since Question model doesn't have options field directly
-    options = repo.answer_option.get_by_question_id(question_id=question_obj.id, db=db)
+    answer_key_cache.invalidate(quiz.id)
+    response_cache.invalidate(quiz.id)
 
-    return QuestionResponse(
-        id=str(question_obj.id),
-        text=question_obj.text,
-        options=[opt.text for opt in options],
-        correct_options=[i for i, opt in enumerate(options) if opt.is_correct],
-    )
+    # Re-read the question together with its options in one round trip
+    (question_obj,) = repo.question.get_with_options_by_ids(db, [question_obj.id])
 
+    return to_question_response(question_obj)
 
-def load_external_questions(
-    quiz_id: str, count: int, category: str, db: Session
-) -> QuizQuestionsResponse:
+
+def parse_category(category: str) -> Optional[int]:
     """
-    Load questions from external API
+    Open Trivia DB category id of a request parameter, None for any category
+    """
+    return int(category) if category.isdigit() else None
+
+
+def check_quiz_author(quiz_id: str, username: str, db: Session) -> None:
+    """
+    Check the quiz exists and was written by username
     """
-    # Check if quiz exists
     quiz = repo.quiz.get_by_id(db, UUID(quiz_id))
     if quiz is None:
         raise errors.QuizNotFoundError()
+    if quiz.author_username != username:
+        raise errors.NotQuizAuthorError("Only the author of the quiz may export its attempts")
 
-    # Use the existing trivia gateway to fetch questions
-    trivia_questions = trivia_gateway.get_questions(
-        amount=count, category=int(category) if category.isdigit() else None
-    )
-
-    # Save questions to database
-    added_questions = []
-    for q in trivia_questions:
-        # Combine correct and incorrect answers
-        options = [q.correct_answer] + q.incorrect_answers
-
-        # The first option (index 0) is the correct answer
-        correct_indices = [0]
-
-        # Create a new question with options
-        question_obj = repo.question.create_with_options(
-            db=db,
-            quiz_id=UUID(quiz_id),
-            text=q.question,
-            options=options,
-            correct_options=correct_indices,
-        )
-
-        # Get options for the created question
-        question_options = repo.answer_option.get_by_question_id(
-            question_id=question_obj.id, db=db
-        )
-
-        added_questions.append(
-            QuestionResponse(
-                id=str(question_obj.id),
-                text=question_obj.text,
-                options=[opt.text for opt in question_options],
-                correct_options=[
-                    i for i, opt in enumerate(question_options) if opt.is_correct
-                ],
-            )
-        )
 
-    return QuizQuestionsResponse(
-        quiz_id=quiz_id,
-        name=quiz.name,
-        category=str(quiz.category),
-        questions=added_questions,
-    )
+def get_content_version(quiz_id: str, db: Session) -> int:
+    """
+    Get the content version of a quiz, it changes whenever
+    the quiz info or its questions change
+    """
+    version = repo.quiz.get_content_version(db, UUID(quiz_id))
+    if version is None:
+        raise errors.QuizNotFoundError()
+    return version
 
 
 def get_quiz_info(quiz_id: str, db: Session) -> QuizInfoResponse:
     """
-    Get quiz information by ID
+    Get quiz information by ID.
+    Responses are cached per content version of the quiz
     """
+    version = get_content_version(quiz_id, db)
+    return response_cache.get(
+        (UUID(quiz_id), "info", version),
+        lambda: _load_quiz_info(quiz_id, db),
+        ttl=settings.QUIZ_CONTENT_CACHE_TTL_SECONDS,
+        model=QuizInfoResponse,
+    )
+
+
+def _load_quiz_info(quiz_id: str, db: Session) -> QuizInfoResponse:
     quiz = repo.quiz.get_by_id(db, UUID(quiz_id))
     if quiz is None:
         raise errors.QuizNotFoundError()
 
-    question_count = repo.question.count_by_quiz_id(db, UUID(quiz_id))
+    return quiz_info_response(quiz, repo.question.count_by_quiz_id(db, UUID(quiz_id)))
 
+
+def quiz_info_response(quiz: Quiz, question_count: int) -> QuizInfoResponse:
+    """
+    Build the info response of a quiz
+    """
     return QuizInfoResponse(
         quiz_id=str(quiz.id),
         name=quiz.name,
@@ -150,20 +181,71 @@ def get_quiz_info(quiz_id: str, db: Session) -> QuizInfoResponse:
     )
 
 
-def get_leaderboard(quiz_id: str, db: Session) -> LeaderboardResponse:
+def _encode_leaderboard_cursor(attempt: UserAttempt) -> str:
+    position = [attempt.score, attempt.completion_time, attempt.id]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_leaderboard_cursor(cursor: str) -> Tuple[int, float, int]:
     """
-    Get quiz leaderboard
+    Position (score, completion time, id) of the last attempt of a page
     """
+    try:
+        score, completion_time, attempt_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return int(score), float(completion_time), int(attempt_id)
+    except (ValueError, TypeError):
+        raise errors.InvalidCursorError("Invalid leaderboard cursor") from None
+
+
+def get_leaderboard(
+    quiz_id: str, db: Session, limit: int = 100, cursor: Optional[str] = None
+) -> LeaderboardResponse:
+    """
+    Get a page of the quiz leaderboard.
+    Pass next_cursor of the previous page as cursor to continue.
+    Pages are cached for a short time, attempts show up at once on the
+    worker they were submitted to and on workers sharing the cache backend.
+    Pages read from a replica are cached apart from those read from the primary
+    """
+    return response_cache.get(
+        (UUID(quiz_id), "leaderboard", limit, cursor, db.info.get("replica", False)),
+        lambda: _load_leaderboard(quiz_id, db, limit, cursor),
+        ttl=settings.LEADERBOARD_CACHE_TTL_SECONDS,
+        model=LeaderboardResponse,
+    )
+
+
+def _load_leaderboard(
+    quiz_id: str, db: Session, limit: int, cursor: Optional[str]
+) -> LeaderboardResponse:
     quiz = repo.quiz.get_by_id(db, UUID(quiz_id))
     if quiz is None:
         raise errors.QuizNotFoundError()
 
-    # Get attempt records for this quiz
-    attempts = repo.user_attempt.get_by_quiz_id(db, UUID(quiz_id))
+    after = decode_leaderboard_cursor(cursor) if cursor else None
+
+    # Fetch one extra attempt to know whether another page follows
+    attempts = repo.user_attempt.get_leaderboard_page(
+        db, quiz.id, limit=limit + 1, after=after
+    )
+    return leaderboard_response(
+        quiz, attempts, limit, repo.user_attempt.count_by_quiz_id(db, quiz.id)
+    )
+
+
+def leaderboard_response(
+    quiz: Quiz, attempts: Sequence[UserAttempt], limit: int, total_entries: int
+) -> LeaderboardResponse:
+    """
+    Build a leaderboard page from up to limit + 1 attempts,
+    the extra one tells whether another page follows
+    """
+    has_more = len(attempts) > limit
+    attempts = attempts[:limit]
 
     entries = [
         LeaderboardEntry(
-            username=attempt.user.username,
+            username=attempt.username,
             score=attempt.score,
             completion_time=attempt.completion_time,
             date=attempt.started_at,
@@ -171,41 +253,79 @@ def get_leaderboard(quiz_id: str, db: Session) -> LeaderboardResponse:
         for attempt in attempts
     ]
 
-    # Sort entries by score (desc) and completion time (asc)
-    entries.sort(key=lambda e: (-e.score, e.completion_time))
-
     return LeaderboardResponse(
-        quiz_id=str(quiz.id), quiz_name=quiz.name, entries=entries
+        quiz_id=str(quiz.id),
+        quiz_name=quiz.name,
+        entries=entries,
+        total_entries=total_entries,
+        next_cursor=_encode_leaderboard_cursor(attempts[-1]) if has_more else None,
+    )
+
+
+def get_score_distribution(quiz_id: str, db: Session) -> ScoreDistributionResponse:
+    """
+    Get the number of attempts per score for a quiz
+    """
+    quiz = repo.quiz.get_by_id(db, UUID(quiz_id))
+    if quiz is None:
+        raise errors.QuizNotFoundError()
+
+    histogram = score_distributions.get(
+        quiz.id, lambda: repo.user_attempt.get_score_counts(db, quiz.id)
+    )
+    return score_distribution_response(quiz, histogram)
+
+
+def score_distribution_response(
+    quiz: Quiz, histogram: ScoreHistogram
+) -> ScoreDistributionResponse:
+    """
+    Build the score distribution response of a quiz from its histogram
+    """
+    return ScoreDistributionResponse(
+        quiz_id=str(quiz.id),
+        total_attempts=histogram.total,
+        buckets=[
+            ScoreBucket(score=score, count=count) for score, count in histogram.buckets()
+        ],
     )
 
 
 def get_quiz_questions(quiz_id: str, db: Session) -> QuizQuestionsResponse:
     """
-    Get all questions for a quiz
+    Get all questions for a quiz.
+    Responses are cached per content version of the quiz
     """
+    version = get_content_version(quiz_id, db)
+    return response_cache.get(
+        (UUID(quiz_id), "questions", version),
+        lambda: _load_quiz_questions(quiz_id, db),
+        ttl=settings.QUIZ_CONTENT_CACHE_TTL_SECONDS,
+        model=QuizQuestionsResponse,
+    )
+
+
+def _load_quiz_questions(quiz_id: str, db: Session) -> QuizQuestionsResponse:
     quiz = repo.quiz.get_by_id(db, UUID(quiz_id))
     if quiz is None:
         raise errors.QuizNotFoundError()
 
-    questions = repo.question.get_by_quiz_id(db, UUID(quiz_id))
-
-    question_responses = []
-    for q in questions:
-        options = repo.answer_option.get_by_question_id(question_id=q.id, db=db)
-        question_responses.append(
-            QuestionResponse(
-                id=str(q.id),
-                text=q.text,
-                options=[opt.text for opt in options],
-                correct_options=[i for i, opt in enumerate(options) if opt.is_correct],
-            )
-        )
+    return quiz_questions_response(
+        quiz, repo.question.get_with_options_by_quiz_id(db, UUID(quiz_id))
+    )
 
+
+def quiz_questions_response(
+    quiz: Quiz, questions: Sequence[Question]
+) -> QuizQuestionsResponse:
+    """
+    Build the questions response of a quiz from its questions with options loaded
+    """
     return QuizQuestionsResponse(
         quiz_id=str(quiz.id),
         name=quiz.name,
         category=str(quiz.category),
-        questions=question_responses,
+        questions=[to_question_response(q) for q in questions],
     )
 
 
@@ -224,63 +344,37 @@ def submit_quiz_answers(
     if user is None:
         raise errors.UserNotFoundError()
 
-    # Calculate score
-    total_questions = repo.question.count_by_quiz_id(db, UUID(request.quiz_id))
-    correct_count = 0
-
-    for answer in request.answers:
-        # Try to convert question_id to UUID, but handle case where it might be a different format
-        try:
-            question_uuid = UUID(answer.question_id)
-            question = repo.question.get_by_id(db, question_uuid)
-        except ValueError:
-            # If not a UUID, try to get it directly (might be a simple ID)
-            question = repo.question.get_by_id(db, answer.question_id)
-
-        if question is None:
-            continue
-
-        options = repo.answer_option.get_by_question_id(question_id=question.id, db=db)
-        correct_indices = [i for i, opt in enumerate(options) if opt.is_correct]
-
-        # Check if answered correctly (selected options match correct options exactly)
-        if sorted(answer.selected_options) == sorted(correct_indices):
-            correct_count += 1
+    # Score every answer in memory against the cached compiled answer key
+    answer_key = answer_key_cache.get(
+        quiz.id, quiz.content_version, lambda: repo.question.get_answer_key(db, quiz.id)
+    )
+    results = scoring.score_answers(answer_key, request.answers)
+    total_questions = len(answer_key)
+    correct_count = sum(results.values())
 
-    # Create user attempt record
-    attempt = repo.user_attempt.create(
+    # Store the attempt together with its answers in a single transaction
+    attempt = repo.user_attempt.create_with_answers(
         db=db,
         username=user.username,
-        quiz_id=UUID(request.quiz_id),
+        quiz_id=quiz.id,
         score=correct_count,
         completion_time=request.completion_time,
+        answers=[
+            (question_id, answer.selected_options)
+            for question_id, answer in zip(results, request.answers)
+        ],
     )
 
-    # Save individual answers
-    for answer in request.answers:
-        # Try to convert question_id to UUID, but handle case where it might be a different format
-        try:
-            question_id = UUID(answer.question_id)
-        except ValueError:
-            question_id = answer.question_id
-
-        repo.user_answer.create(
-            db=db,
-            attempt_id=attempt.id,
-            question_id=question_id,
-            selected_options=answer.selected_options,
-        )
+    # Count attempts ahead of this one instead of sorting the whole leaderboard
+    rank = repo.user_attempt.get_rank(db, attempt)
+    response_cache.invalidate(quiz.id, "leaderboard")
 
-    # Calculate rank if possible
-    rank = None
-    attempts = repo.user_attempt.get_by_quiz_id(db, UUID(request.quiz_id))
-    if attempts:
-        # Sort by score (desc) and completion time (asc)
-        sorted_attempts = sorted(attempts, key=lambda a: (-a.score, a.completion_time))
-        for i, a in enumerate(sorted_attempts):
-            if a.id == attempt.id:
-                rank = i + 1
-                break
+    histogram = score_distributions.record(
+        quiz.id,
+        attempt.id,
+        correct_count,
+        lambda: repo.user_attempt.get_score_counts(db, quiz.id),
+    )
 
     return QuizSubmissionResponse(
         quiz_id=str(quiz.id),
@@ -288,4 +382,5 @@ def submit_quiz_answers(
         total=total_questions,
         completion_time=request.completion_time,
         rank=rank,
+        percentile=histogram.percentile(correct_count),
     )
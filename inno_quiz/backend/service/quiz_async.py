@@ -0,0 +1,305 @@
+"""
+Async variants of the quiz service for callers holding an AsyncSession.
+
+Statements are awaited through `repo.aio` and the caches are used through
+their async methods, which hold their locks only around in-memory work; so
+a request never takes a thread of its own. Responses are built with the
+helpers of `service.quiz`, which stays the sync variant.
+"""
+
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import repo
+from backend.domain.question_request import QuestionRequest, QuestionResponse
+from backend.domain.quiz import QuizBase, QuizRead
+from backend.domain.quiz_request import (
+    LeaderboardResponse,
+    QuizInfoResponse,
+    QuizQuestionsResponse,
+    QuizSubmissionRequest,
+    QuizSubmissionResponse,
+    ScoreDistributionResponse,
+)
+from backend.config import settings
+from backend.gateways.trivia import TriviaQuestion
+from backend.models import Quiz
+
+from . import errors, scoring
+from .answer_key import answer_key_cache
+from .quiz import (
+    decode_leaderboard_cursor,
+    leaderboard_response,
+    new_quiz,
+    quiz_info_response,
+    quiz_questions_response,
+    score_distribution_response,
+    to_question_response,
+)
+from .response_cache import response_cache
+from .score_distribution import score_distributions
+
+
+async def _get_quiz(db: AsyncSession, quiz_id: UUID) -> Quiz:
+    quiz = await repo.aio.quiz.get_by_id(db, quiz_id)
+    if quiz is None:
+        raise errors.QuizNotFoundError()
+    return quiz
+
+
+async def create_quiz_template(
+    quiz_data: QuizBase, author_username: str, *, db: AsyncSession
+) -> Quiz:
+    return await repo.aio.quiz.create(db, obj_in=new_quiz(quiz_data, author_username))
+
+
+async def submit_quiz(quiz_id: UUID, *, db: AsyncSession) -> QuizRead:
+    """
+    Mark the quiz as submitted/ready for participants
+    """
+    quiz = await _get_quiz(db, quiz_id)
+    await repo.aio.quiz.bump_content_version(db, quiz.id)
+    updated = await repo.aio.quiz.update(db, db_obj=quiz, obj_in={"is_submitted": True})
+    answer_key_cache.invalidate(quiz.id)
+    await response_cache.invalidate_async(quiz.id)
+    return updated
+
+
+async def add_question(
+    quiz_id: str, question: QuestionRequest, db: AsyncSession
+) -> QuestionResponse:
+    """
+    Add a question to a quiz
+    """
+    quiz = await _get_quiz(db, UUID(quiz_id))
+    question_obj = await repo.aio.question.create_with_options(
+        db,
+        quiz_id=quiz.id,
+        text=question.text,
+        options=question.options,
+        correct_options=question.correct_options,
+    )
+    answer_key_cache.invalidate(quiz.id)
+    await response_cache.invalidate_async(quiz.id)
+
+    # Re-read the question together with its options in one round trip
+    (question_obj,) = await repo.aio.question.get_with_options_by_ids(db, [question_obj.id])
+    return to_question_response(question_obj)
+
+
+async def prepare_external_import(quiz_id: str, db: AsyncSession) -> None:
+    """
+    Check the quiz exists before questions for it are fetched or uploaded
+    """
+    await _get_quiz(db, UUID(quiz_id))
+
+    # Do not hold a read transaction open while the upstream API answers:
+    # on SQLite it could not be upgraded to a write once another writer commits
+    await db.commit()
+
+
+async def add_questions(
+    quiz_id: str, questions: Sequence[QuestionRequest], db: AsyncSession
+) -> List[int]:
+    """
+    Add questions to a quiz in one transaction, returns their ids in order
+    """
+    quiz = await _get_quiz(db, UUID(quiz_id))
+    return await _add_questions(quiz, questions, db)
+
+
+async def save_external_questions(
+    quiz_id: str, trivia_questions: Sequence[TriviaQuestion], db: AsyncSession
+) -> QuizQuestionsResponse:
+    """
+    Add questions fetched from external API to a quiz
+    """
+    quiz = await _get_quiz(db, UUID(quiz_id))
+
+    # The first option (index 0) is the correct answer
+    new_questions = [
+        QuestionRequest(
+            text=q.question,
+            options=[q.correct_answer] + q.incorrect_answers,
+            correct_options=[0],
+        )
+        for q in trivia_questions
+    ]
+
+    # Save all questions in one transaction and answer from the in-memory data
+    added_ids = await _add_questions(quiz, new_questions, db)
+
+    return QuizQuestionsResponse(
+        quiz_id=quiz_id,
+        name=quiz.name,
+        category=str(quiz.category),
+        questions=[
+            QuestionResponse(id=str(question_id), **q.model_dump())
+            for question_id, q in zip(added_ids, new_questions)
+        ],
+    )
+
+
+async def _add_questions(
+    quiz: Quiz, questions: Sequence[QuestionRequest], db: AsyncSession
+) -> List[int]:
+    added_ids = await repo.aio.question.bulk_create_with_options(
+        db, quiz_id=quiz.id, questions=list(questions)
+    )
+    answer_key_cache.invalidate(quiz.id)
+    await response_cache.invalidate_async(quiz.id)
+    return added_ids
+
+
+async def check_quiz_author(quiz_id: str, username: str, db: AsyncSession) -> None:
+    """
+    Check the quiz exists and was written by username
+    """
+    quiz = await _get_quiz(db, UUID(quiz_id))
+    if quiz.author_username != username:
+        raise errors.NotQuizAuthorError("Only the author of the quiz may export its attempts")
+
+
+async def get_content_version(quiz_id: str, db: AsyncSession) -> int:
+    """
+    Get the content version of a quiz, it changes whenever
+    the quiz info or its questions change
+    """
+    version = await repo.aio.quiz.get_content_version(db, UUID(quiz_id))
+    if version is None:
+        raise errors.QuizNotFoundError()
+    return version
+
+
+async def get_quiz_info(quiz_id: str, db: AsyncSession) -> QuizInfoResponse:
+    """
+    Get quiz information by ID.
+    Responses are cached per content version of the quiz
+    """
+    version = await get_content_version(quiz_id, db)
+
+    async def load() -> QuizInfoResponse:
+        quiz = await _get_quiz(db, UUID(quiz_id))
+        return quiz_info_response(quiz, await repo.aio.question.count_by_quiz_id(db, quiz.id))
+
+    return await response_cache.get_async(
+        (UUID(quiz_id), "info", version),
+        load,
+        ttl=settings.QUIZ_CONTENT_CACHE_TTL_SECONDS,
+        model=QuizInfoResponse,
+    )
+
+
+async def get_leaderboard(
+    quiz_id: str, db: AsyncSession, limit: int = 100, cursor: Optional[str] = None
+) -> LeaderboardResponse:
+    """
+    Get a page of the quiz leaderboard.
+    Pass next_cursor of the previous page as cursor to continue.
+    Pages read from a replica are cached apart from those read from the
+    primary, so a client reading its own writes is never served a replica page
+    """
+
+    async def load() -> LeaderboardResponse:
+        quiz = await _get_quiz(db, UUID(quiz_id))
+        after = decode_leaderboard_cursor(cursor) if cursor else None
+        # Fetch one extra attempt to know whether another page follows
+        attempts = await repo.aio.user_attempt.get_leaderboard_page(
+            db, quiz.id, limit=limit + 1, after=after
+        )
+        total_entries = await repo.aio.user_attempt.count_by_quiz_id(db, quiz.id)
+        return leaderboard_response(quiz, attempts, limit, total_entries)
+
+    return await response_cache.get_async(
+        (UUID(quiz_id), "leaderboard", limit, cursor, db.info.get("replica", False)),
+        load,
+        ttl=settings.LEADERBOARD_CACHE_TTL_SECONDS,
+        model=LeaderboardResponse,
+    )
+
+
+async def get_score_distribution(quiz_id: str, db: AsyncSession) -> ScoreDistributionResponse:
+    """
+    Get the number of attempts per score for a quiz
+    """
+    quiz = await _get_quiz(db, UUID(quiz_id))
+    histogram = await score_distributions.get_async(
+        quiz.id, lambda: repo.aio.user_attempt.get_score_counts(db, quiz.id)
+    )
+    return score_distribution_response(quiz, histogram)
+
+
+async def get_quiz_questions(quiz_id: str, db: AsyncSession) -> QuizQuestionsResponse:
+    """
+    Get all questions for a quiz.
+    Responses are cached per content version of the quiz
+    """
+    version = await get_content_version(quiz_id, db)
+
+    async def load() -> QuizQuestionsResponse:
+        quiz = await _get_quiz(db, UUID(quiz_id))
+        questions = await repo.aio.question.get_with_options_by_quiz_id(db, quiz.id)
+        return quiz_questions_response(quiz, questions)
+
+    return await response_cache.get_async(
+        (UUID(quiz_id), "questions", version),
+        load,
+        ttl=settings.QUIZ_CONTENT_CACHE_TTL_SECONDS,
+        model=QuizQuestionsResponse,
+    )
+
+
+async def submit_quiz_answers(
+    request: QuizSubmissionRequest, db: AsyncSession
+) -> QuizSubmissionResponse:
+    """
+    Submit answers for a quiz
+    """
+    quiz = await _get_quiz(db, UUID(request.quiz_id))
+    user = await repo.aio.user.get_by_username(db, request.user_id)
+    if user is None:
+        raise errors.UserNotFoundError()
+
+    # Score every answer in memory against the cached compiled answer key
+    answer_key = await answer_key_cache.get_async(
+        quiz.id,
+        quiz.content_version,
+        lambda: repo.aio.question.get_answer_key(db, quiz.id),
+    )
+    results = scoring.score_answers(answer_key, request.answers)
+    correct_count = sum(results.values())
+
+    # Store the attempt together with its answers in a single transaction
+    attempt = await repo.aio.user_attempt.create_with_answers(
+        db,
+        username=user.username,
+        quiz_id=quiz.id,
+        score=correct_count,
+        completion_time=request.completion_time,
+        answers=[
+            (question_id, answer.selected_options)
+            for question_id, answer in zip(results, request.answers)
+        ],
+    )
+
+    # Count attempts ahead of this one instead of sorting the whole leaderboard
+    rank = await repo.aio.user_attempt.get_rank(db, attempt)
+    await response_cache.invalidate_async(quiz.id, "leaderboard")
+
+    histogram = await score_distributions.record_async(
+        quiz.id,
+        attempt.id,
+        correct_count,
+        lambda: repo.aio.user_attempt.get_score_counts(db, quiz.id),
+    )
+
+    return QuizSubmissionResponse(
+        quiz_id=str(quiz.id),
+        score=correct_count,
+        total=len(answer_key),
+        completion_time=request.completion_time,
+        rank=rank,
+        percentile=histogram.percentile(correct_count),
+    )
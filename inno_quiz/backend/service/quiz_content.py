@@ -0,0 +1,299 @@
+"""
+Bulk import and export of quiz content as JSON Lines or CSV.
+
+Both formats hold one question per line with the fields of `QuestionRequest`:
+a JSON object per line, or CSV rows under a `text,options,correct_options`
+header with options and correct_options as JSON arrays.
+"""
+
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, List, Optional, Tuple, Union
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from backend import repo
+from backend.config import settings
+from backend.db import AsyncSessionLocal
+from backend.domain.question_request import QuestionRequest
+from backend.domain.quiz_request import (
+    ContentFormat,
+    ContentImportError,
+    ContentImportResponse,
+)
+
+from . import errors, quiz_async
+
+MEDIA_TYPES = {
+    ContentFormat.jsonl: "application/x-ndjson",
+    ContentFormat.csv: "text/csv",
+}
+
+CSV_HEADER = ["text", "options", "correct_options"]
+
+# Failed lines listed in an import response, further ones are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+class InvalidLineError(ValueError):
+    """A line of imported content that is not a valid question"""
+
+
+# Line number with the text of the line or why it cannot be read
+NumberedLine = Tuple[int, Union[str, InvalidLineError]]
+
+# Line number with the question parsed from it or why it is invalid
+ParsedLine = Tuple[int, Union[QuestionRequest, InvalidLineError]]
+
+
+async def export_content(
+    quiz_id: str, content_format: ContentFormat, bind: AsyncEngine
+) -> AsyncIterator[str]:
+    """
+    Stream the questions of a quiz in the given format, one chunk per batch
+    of rows fetched from the database cursor, so only a batch is in memory.
+    The export runs on a session of its own on bind: it is consumed after
+    the session of the request has been closed
+    """
+    query = repo.question.content_query(UUID(quiz_id)).execution_options(
+        yield_per=settings.CONTENT_EXPORT_BATCH_SIZE
+    )
+    encode = _encode_csv if content_format == ContentFormat.csv else _encode_jsonl
+    if content_format == ContentFormat.csv:
+        yield csv_row(CSV_HEADER)
+
+    async with AsyncSessionLocal(bind=bind) as db:
+        result = await db.stream(query)
+        # Rows of a question are consecutive, it is encoded once the next one starts
+        current_id: Optional[int] = None
+        current: Optional[QuestionRequest] = None
+        async for rows in result.partitions():
+            chunk = []
+            for question_id, text, option_text, is_correct in rows:
+                if question_id != current_id:
+                    if current is not None:
+                        chunk.append(encode(current))
+                    current_id = question_id
+                    current = QuestionRequest(text=text, options=[], correct_options=[])
+                if option_text is not None:
+                    if is_correct:
+                        current.correct_options.append(len(current.options))
+                    current.options.append(option_text)
+            yield "".join(chunk)
+        if current is not None:
+            yield encode(current)
+
+
+async def import_content(
+    quiz_id: str,
+    content_format: ContentFormat,
+    chunks: AsyncIterator[bytes],
+    db: AsyncSession,
+    batch_size: int = settings.CONTENT_IMPORT_BATCH_SIZE,
+    max_line_bytes: int = settings.CONTENT_IMPORT_MAX_LINE_BYTES,
+) -> ContentImportResponse:
+    """
+    Import questions into a quiz from content read chunk by chunk.
+    Lines are parsed as they arrive and valid questions are inserted in
+    transactions of batch_size questions, invalid lines are reported and
+    skipped. Lines and CSV records longer than max_line_bytes are invalid.
+    Batches inserted before a failure stay imported
+    """
+    await quiz_async.prepare_external_import(quiz_id, db)
+
+    parse = _parse_csv if content_format == ContentFormat.csv else _parse_jsonl
+    imported = 0
+    failed: List[ContentImportError] = []
+    failed_count = 0
+    batch: List[QuestionRequest] = []
+
+    async def flush() -> None:
+        nonlocal imported, batch
+        questions, batch = batch, []
+        await quiz_async.add_questions(quiz_id, questions, db)
+        imported += len(questions)
+
+    async for line_number, record in parse(_lines(chunks, max_line_bytes), max_line_bytes):
+        if isinstance(record, InvalidLineError):
+            failed_count += 1
+            if len(failed) < MAX_REPORTED_ERRORS:
+                failed.append(ContentImportError(line=line_number, error=str(record)))
+            continue
+        batch.append(record)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    return ContentImportResponse(
+        quiz_id=quiz_id, imported=imported, failed=failed_count, errors=failed
+    )
+
+
+async def _lines(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[NumberedLine]:
+    """
+    Split chunks into numbered lines with their line endings, scanning each
+    chunk once. Lines are decoded one by one, a line that is not UTF-8 or is
+    longer than max_bytes fails alone; the rest of a too long line is dropped
+    as it arrives instead of being buffered
+    """
+    parts: List[bytes] = []
+    size = 0
+    too_long = False
+    line_number = 0
+    async for chunk in chunks:
+        start = 0
+        end = chunk.find(b"\n")
+        while end != -1:
+            line_number += 1
+            if too_long or size + end + 1 - start > max_bytes:
+                yield line_number, _too_long(max_bytes)
+            else:
+                parts.append(chunk[start:end + 1])
+                yield line_number, _decode(b"".join(parts), line_number)
+            parts, size, too_long = [], 0, False
+            start = end + 1
+            end = chunk.find(b"\n", start)
+        if not too_long and start < len(chunk):
+            size += len(chunk) - start
+            if size > max_bytes:
+                parts, too_long = [], True
+            else:
+                parts.append(chunk[start:])
+    if too_long:
+        yield line_number + 1, _too_long(max_bytes)
+    elif size:
+        yield line_number + 1, _decode(b"".join(parts), line_number + 1)
+
+
+def _too_long(max_bytes: int) -> InvalidLineError:
+    return InvalidLineError(f"Line is longer than {max_bytes} bytes")
+
+
+def _decode(line: bytes, line_number: int) -> Union[str, InvalidLineError]:
+    if line_number == 1:
+        # Spreadsheet applications start UTF-8 files with a byte order mark
+        line = line.removeprefix(b"\xef\xbb\xbf")
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        return InvalidLineError("Line is not UTF-8")
+
+
+async def _parse_jsonl(
+    lines: AsyncIterator[NumberedLine], _max_bytes: int
+) -> AsyncIterator[ParsedLine]:
+    async for line_number, line in lines:
+        if isinstance(line, InvalidLineError):
+            yield line_number, line
+        elif line.strip():
+            try:
+                fields = _load_json(line)
+            except InvalidLineError as e:
+                yield line_number, e
+                continue
+            yield line_number, _validate(fields)
+
+
+async def _parse_csv(
+    lines: AsyncIterator[NumberedLine], max_bytes: int
+) -> AsyncIterator[ParsedLine]:
+    header_read = False
+    record: List[str] = []
+    record_size = 0
+    record_start = 0
+    # Whether a quoted field is open at the end of the record so far
+    in_quotes = False
+    async for line_number, line in lines:
+        if isinstance(line, InvalidLineError):
+            yield line_number, line
+            record, record_size, in_quotes = [], 0, False
+            continue
+        if not record:
+            record_start = line_number
+        record.append(line)
+        record_size += len(line.encode("utf-8"))
+        # A quoted field may span lines, the row ends where the quotes balance.
+        # Only the new line is counted, doubled quotes inside a field cancel out
+        in_quotes ^= line.count('"') % 2 == 1
+        if in_quotes:
+            if record_size > max_bytes:
+                # Likely an unbalanced quote, parsing restarts on the next line
+                yield record_start, InvalidLineError(
+                    f"Record is longer than {max_bytes} bytes, is a quote unbalanced?"
+                )
+                record, record_size, in_quotes = [], 0, False
+            continue
+        row = next(csv.reader(["".join(record)]), [])
+        record, record_size = [], 0
+        if not row:
+            continue
+        if not header_read:
+            if row != CSV_HEADER:
+                raise errors.InvalidContentError(f"CSV header must be {','.join(CSV_HEADER)}")
+            header_read = True
+            continue
+        if len(row) != len(CSV_HEADER):
+            yield record_start, InvalidLineError(f"Expected {len(CSV_HEADER)} fields")
+            continue
+        text, options, correct_options = row
+        try:
+            fields = {
+                "text": text,
+                "options": _load_json(options),
+                "correct_options": _load_json(correct_options),
+            }
+        except InvalidLineError as e:
+            yield record_start, e
+            continue
+        yield record_start, _validate(fields)
+    if record:
+        yield record_start, InvalidLineError("Unterminated quoted field")
+
+
+def _load_json(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError as e:
+        raise InvalidLineError(f"Invalid JSON: {e.msg}") from None
+
+
+def _validate(fields: Any) -> Union[QuestionRequest, InvalidLineError]:
+    try:
+        question = QuestionRequest.model_validate(fields)
+    except ValidationError as e:
+        return InvalidLineError(
+            "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'question'}: {error['msg']}"
+                for error in e.errors()
+            )
+        )
+    if not all(0 <= i < len(question.options) for i in question.correct_options):
+        return InvalidLineError("correct_options must be indexes of options")
+    return question
+
+
+def _encode_jsonl(question: QuestionRequest) -> str:
+    return json.dumps(question.model_dump(), ensure_ascii=False) + "\n"
+
+
+def _encode_csv(question: QuestionRequest) -> str:
+    return csv_row(
+        [
+            question.text,
+            json.dumps(question.options, ensure_ascii=False),
+            json.dumps(question.correct_options),
+        ]
+    )
+
+
+def csv_row(fields: List[Any]) -> str:
+    """
+    One CSV row with its line ending, as written by every CSV export
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(fields)
+    return buffer.getvalue()
@@ -0,0 +1,382 @@
+"""
+Service responses cached in process memory and optionally in a shared cache
+"""
+
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock
+from typing import (
+    Awaitable, Callable, Dict, Hashable, List, NamedTuple, Optional, Set, Tuple, Type, TypeVar
+)
+
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from backend.config import settings
+
+from .cache_backend import CacheBackend, CacheBackendError, create_cache_backend
+from .pending_loads import PendingLoads
+
+logger = logging.getLogger(__name__)
+
+ResponseType = TypeVar("ResponseType", bound=BaseModel)  # pylint: disable=invalid-name
+
+# (quiz id, kind of response, *arguments the response depends on)
+CacheKey = Tuple[Hashable, ...]
+
+# Called with the quiz id and kinds of an invalidation made by another worker
+InvalidationListener = Callable[[str, Tuple[str, ...]], None]
+
+INVALIDATION_CHANNEL = "response-invalidations"
+
+
+class CacheEntry(NamedTuple):
+    value: BaseModel
+    expires_at: float
+    size: int
+
+
+class ResponseCache:
+    """
+    LRU cache of service responses with a TTL per entry.
+
+    The cache is bounded both by the number of entries and by their total
+    size, measured as the length of their JSON. Keys start with the quiz id
+    and the kind of response, so the write paths can drop everything cached
+    for a quiz, or only some kinds of responses.
+
+    Like `AnswerKeyCache`, a response loaded concurrently with a write to
+    its quiz is returned but never stored, see `PendingLoads`.
+
+    With a shared backend the in-process entries are a first level in front
+    of it. Responses stored there carry the generations of their quiz and
+    kind read before loading; invalidations increment those counters, so
+    responses loaded before a write stop matching, and notify the other
+    workers to drop their local entries and notify their invalidation listeners.
+    The singleton connects to the backend configured by CACHE_BACKEND on
+    startup. Shared reads and writes block on the backend: `get` and `invalidate`
+    run off the event loop, `get_async` and `invalidate_async` hand only
+    those calls to the threadpool.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        shared: Optional[CacheBackend] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared: Optional[CacheBackend] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes = 0
+        self.shared_hits = 0
+        self.shared_errors = 0
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._keys_by_quiz: Dict[str, Set[CacheKey]] = {}
+        self._loads = PendingLoads()
+        self._lock = Lock()
+        # Tells this worker's invalidation messages apart from the others'
+        self._origin = uuid.uuid4().hex
+        self._listeners: List[InvalidationListener] = []
+        self.connect(shared)
+
+    def connect(self, shared: Optional[CacheBackend]) -> None:
+        """
+        Share responses through a backend and subscribe
+        to the invalidations other workers publish on it
+        """
+        self.shared = shared
+        if shared is not None:
+            shared.subscribe(
+                INVALIDATION_CHANNEL, self._on_invalidation, on_subscribe=self._drop_local
+            )
+
+    def start(self) -> None:
+        """
+        Connect to the shared cache configured by CACHE_BACKEND, if any
+        """
+        self.connect(create_cache_backend())
+
+    def close(self) -> None:
+        """
+        Stop sharing responses and release the backend
+        """
+        shared, self.shared = self.shared, None
+        if shared is not None:
+            shared.close()
+
+    def get(
+        self,
+        key: CacheKey,
+        loader: Callable[[], ResponseType],
+        ttl: float,
+        model: Optional[Type[ResponseType]] = None,
+    ) -> ResponseType:
+        """
+        Get a cached response, calling loader on a miss and keeping
+        its result for ttl seconds.
+        Responses are shared with other workers when model is given
+        to read them back
+        """
+        value, generation = self._lookup(key)
+        if value is not None:
+            return value
+
+        try:
+            shared = self.shared if model is not None else None
+            shared_generations = None
+            if shared is not None:
+                value, shared_generations = self._get_shared(shared, key, model)
+            if value is None:
+                value = loader()
+            data = value.model_dump_json()
+
+            if shared is not None and shared_generations is not None:
+                self._set_shared(shared, key, data, shared_generations, ttl)
+        except BaseException:
+            self._abandon(key, generation)
+            raise
+
+        self._store(key, value, data, ttl, generation)
+        return value
+
+    async def get_async(
+        self,
+        key: CacheKey,
+        loader: Callable[[], Awaitable[ResponseType]],
+        ttl: float,
+        model: Optional[Type[ResponseType]] = None,
+    ) -> ResponseType:
+        """
+        Variant of `get` awaiting loader on the event loop.
+        Only the blocking calls to the shared backend run on the threadpool
+        """
+        value, generation = self._lookup(key)
+        if value is not None:
+            return value
+
+        try:
+            shared = self.shared if model is not None else None
+            shared_generations = None
+            if shared is not None:
+                value, shared_generations = await run_in_threadpool(
+                    self._get_shared, shared, key, model
+                )
+            if value is None:
+                value = await loader()
+            data = value.model_dump_json()
+
+            if shared is not None and shared_generations is not None:
+                await run_in_threadpool(
+                    self._set_shared, shared, key, data, shared_generations, ttl
+                )
+        except BaseException:
+            self._abandon(key, generation)
+            raise
+
+        self._store(key, value, data, ttl, generation)
+        return value
+
+    def invalidate(self, quiz_id: Hashable, *kinds: str) -> None:
+        """
+        Drop responses cached for a quiz that changed,
+        only those of the given kinds if any are given
+        """
+        self._invalidate_local(str(quiz_id), kinds)
+        if self.shared is not None:
+            self._invalidate_shared(self.shared, str(quiz_id), kinds)
+
+    async def invalidate_async(self, quiz_id: Hashable, *kinds: str) -> None:
+        """
+        Variant of `invalidate` notifying the shared backend from the threadpool
+        """
+        self._invalidate_local(str(quiz_id), kinds)
+        if self.shared is not None:
+            await run_in_threadpool(self._invalidate_shared, self.shared, str(quiz_id), kinds)
+
+    def add_invalidation_listener(self, listener: InvalidationListener) -> None:
+        """
+        Call listener with the invalidations other workers publish,
+        so caches kept next to this one drop what changed there too
+        """
+        self._listeners.append(listener)
+
+    def clear(self) -> None:
+        """
+        Drop all responses and reset counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_quiz.clear()
+            self._loads.invalidate_all()
+            self.hits = self.misses = self.evictions = self.expirations = self.bytes = 0
+            self.shared_hits = self.shared_errors = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit, miss and eviction counters with the current number and size of entries
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+                "bytes": self.bytes,
+                "shared_hits": self.shared_hits,
+                "shared_errors": self.shared_errors,
+            }
+
+    def _lookup(self, key: CacheKey) -> Tuple[Optional[BaseModel], int]:
+        """
+        Get an unexpired response, or start loading it and get
+        the generation of its quiz
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value, 0
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return None, self._loads.start(str(key[0]))
+
+    def _store(
+        self, key: CacheKey, value: BaseModel, data: str, ttl: float, generation: int
+    ) -> None:
+        quiz_id = str(key[0])
+        with self._lock:
+            unchanged = self._loads.finish(quiz_id, generation)
+            if unchanged and len(data) <= self.max_bytes:
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = CacheEntry(value, time.monotonic() + ttl, len(data))
+                self._keys_by_quiz.setdefault(quiz_id, set()).add(key)
+                self.bytes += len(data)
+                while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+
+    def _abandon(self, key: CacheKey, generation: int) -> None:
+        with self._lock:
+            self._loads.finish(str(key[0]), generation)
+
+    def _invalidate_shared(
+        self, shared: CacheBackend, quiz_id: str, kinds: Tuple[str, ...]
+    ) -> None:
+        message = {"origin": self._origin, "quiz_id": quiz_id, "kinds": list(kinds)}
+        try:
+            for generation_key in self._generation_keys(quiz_id, kinds):
+                shared.incr(generation_key)
+            shared.publish(INVALIDATION_CHANNEL, json.dumps(message).encode())
+        except CacheBackendError as e:
+            self._shared_failed(e)
+
+    def _invalidate_local(self, quiz_id: str, kinds: Tuple[str, ...]) -> None:
+        with self._lock:
+            for key in list(self._keys_by_quiz.get(quiz_id, ())):
+                if not kinds or key[1] in kinds:
+                    self._remove(key)
+            self._loads.invalidate(quiz_id)
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        quiz_id = str(key[0])
+        quiz_keys = self._keys_by_quiz[quiz_id]
+        quiz_keys.discard(key)
+        if not quiz_keys:
+            del self._keys_by_quiz[quiz_id]
+
+    @staticmethod
+    def _generation_keys(quiz_id: str, kinds: Tuple[str, ...]) -> List[str]:
+        if not kinds:
+            return [f"generation:{quiz_id}"]
+        return [f"generation:{quiz_id}:{kind}" for kind in kinds]
+
+    @staticmethod
+    def _shared_key(key: CacheKey) -> str:
+        return f"response:{key[0]}:{key[1]}:{json.dumps(list(key[2:]), default=str)}"
+
+    def _get_shared(
+        self, shared: CacheBackend, key: CacheKey, model: Type[ResponseType]
+    ) -> Tuple[Optional[ResponseType], Optional[bytes]]:
+        """
+        Read a response with the current generations of its quiz and kind,
+        the response is None when missing or stored under other generations
+        """
+        quiz_id, kind = str(key[0]), str(key[1])
+        keys = [self._shared_key(key)]
+        keys += self._generation_keys(quiz_id, ())
+        keys += self._generation_keys(quiz_id, (kind,))
+        try:
+            stored, *counters = shared.get_many(keys)
+        except CacheBackendError as e:
+            self._shared_failed(e)
+            return None, None
+        generations = b".".join(counter or b"0" for counter in counters)
+        if stored is None:
+            return None, generations
+        stored_generations, _, data = stored.partition(b"\n")
+        if stored_generations != generations:
+            return None, generations
+        try:
+            value = model.model_validate_json(data)
+        except ValidationError:
+            logger.warning("Dropping unreadable shared cache entry %s", keys[0])
+            return None, generations
+        with self._lock:
+            self.shared_hits += 1
+        # A hit is not stored again
+        return value, None
+
+    def _set_shared(
+        self, shared: CacheBackend, key: CacheKey, data: str, generations: bytes, ttl: float
+    ) -> None:
+        try:
+            shared.set(self._shared_key(key), generations + b"\n" + data.encode(), ttl)
+        except CacheBackendError as e:
+            self._shared_failed(e)
+
+    def _shared_failed(self, error: CacheBackendError) -> None:
+        logger.warning("Shared response cache unavailable: %s", error)
+        with self._lock:
+            self.shared_errors += 1
+
+    def _on_invalidation(self, message: bytes) -> None:
+        payload = json.loads(message)
+        if payload["origin"] == self._origin:
+            return
+        kinds = tuple(payload["kinds"])
+        self._invalidate_local(payload["quiz_id"], kinds)
+        for listener in self._listeners:
+            listener(payload["quiz_id"], kinds)
+
+    def _drop_local(self) -> None:
+        """
+        Drop local entries that may have missed invalidations
+        while the subscription was down
+        """
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_quiz.clear()
+            self._loads.invalidate_all()
+            self.bytes = 0
+
+
+# Create a singleton instance
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+)
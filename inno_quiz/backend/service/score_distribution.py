@@ -0,0 +1,180 @@
+"""
+Per-quiz score histograms kept in process memory
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .pending_loads import PendingLoads
+
+
+class ScoreHistogram:
+    """
+    Number of attempts per score for a single quiz.
+    Scores are bounded by the quiz question count, so lookups
+    do not depend on how many attempts were made
+    """
+
+    def __init__(self, counts: Dict[int, int], last_attempt_id: int = 0):
+        self._counts: List[int] = []
+        self.total = 0
+        for score, count in counts.items():
+            self.add(score, count)
+        # Attempts up to this id were counted when the histogram was built
+        self.last_attempt_id = last_attempt_id
+        self.built_at = time.monotonic()
+
+    def add(self, score: int, count: int = 1) -> None:
+        """
+        Record attempts with the given score
+        """
+        if score >= len(self._counts):
+            self._counts.extend([0] * (score + 1 - len(self._counts)))
+        self._counts[score] += count
+        self.total += count
+
+    def count_below(self, score: int) -> int:
+        """
+        Number of attempts with a strictly lower score
+        """
+        return sum(self._counts[:max(score, 0)])
+
+    def percentile(self, score: int) -> float:
+        """
+        Share of attempts (in percent) beaten by the given score
+        """
+        if self.total == 0:
+            return 0.0
+        return round(100 * self.count_below(score) / self.total, 1)
+
+    def buckets(self) -> List[Tuple[int, int]]:
+        """
+        Non-empty (score, count) pairs in ascending score order
+        """
+        return [(score, count) for score, count in enumerate(self._counts) if count]
+
+
+# Returns the attempt count per score and the id of the last attempt counted
+HistogramLoader = Callable[[], Tuple[Dict[int, int], int]]
+AsyncHistogramLoader = Callable[[], Awaitable[Tuple[Dict[int, int], int]]]
+
+
+class ScoreDistributions:
+    """
+    Registry of score histograms keyed by quiz id.
+
+    A histogram is built once from the attempts table and then updated
+    incrementally; it is rebuilt after max_age seconds so attempts recorded
+    by other workers are eventually picked up. Histograms of the least
+    recently used quizzes are dropped over max_entries.
+    """
+
+    def __init__(self, max_age: float = 60.0, max_entries: int = 10_000):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._histograms: "OrderedDict[Any, ScoreHistogram]" = OrderedDict()
+        self._loads = PendingLoads()
+        self._lock = Lock()
+
+    def _fresh(self, quiz_id: Any) -> Optional[ScoreHistogram]:
+        histogram = self._histograms.get(quiz_id)
+        if histogram is None:
+            return None
+        if time.monotonic() - histogram.built_at >= self.max_age:
+            del self._histograms[quiz_id]
+            return None
+        self._histograms.move_to_end(quiz_id)
+        return histogram
+
+    def get(self, quiz_id: Any, loader: HistogramLoader) -> ScoreHistogram:
+        """
+        Get the histogram of a quiz, building it with loader when missing or stale.
+        The loader queries the database and runs without holding the lock;
+        when another caller stored a fresh histogram meanwhile, that one is kept
+        """
+        histogram, generation = self._lookup(quiz_id)
+        if histogram is not None:
+            return histogram
+        try:
+            built = ScoreHistogram(*loader())
+        except BaseException:
+            self._abandon(quiz_id, generation)
+            raise
+        return self._store(quiz_id, built, generation)
+
+    async def get_async(self, quiz_id: Any, loader: AsyncHistogramLoader) -> ScoreHistogram:
+        """
+        Variant of `get` awaiting loader
+        """
+        histogram, generation = self._lookup(quiz_id)
+        if histogram is not None:
+            return histogram
+        try:
+            built = ScoreHistogram(*await loader())
+        except BaseException:
+            self._abandon(quiz_id, generation)
+            raise
+        return self._store(quiz_id, built, generation)
+
+    def record(
+        self, quiz_id: Any, attempt_id: int, score: int, loader: HistogramLoader
+    ) -> ScoreHistogram:
+        """
+        Record an already stored attempt and return the updated histogram.
+        An attempt the histogram counted when it was built is not added again
+        """
+        return self._add(self.get(quiz_id, loader), attempt_id, score)
+
+    async def record_async(
+        self, quiz_id: Any, attempt_id: int, score: int, loader: AsyncHistogramLoader
+    ) -> ScoreHistogram:
+        """
+        Variant of `record` awaiting loader
+        """
+        return self._add(await self.get_async(quiz_id, loader), attempt_id, score)
+
+    def invalidate(self, quiz_id: Any) -> None:
+        """
+        Drop the histogram of a quiz so it is rebuilt on next use
+        """
+        with self._lock:
+            self._histograms.pop(quiz_id, None)
+            self._loads.invalidate(quiz_id)
+
+    def _lookup(self, quiz_id: Any) -> Tuple[Optional[ScoreHistogram], int]:
+        """
+        Get the fresh histogram of a quiz, or start building it and get its generation
+        """
+        with self._lock:
+            histogram = self._fresh(quiz_id)
+            if histogram is not None:
+                return histogram, 0
+            return None, self._loads.start(quiz_id)
+
+    def _store(self, quiz_id: Any, built: ScoreHistogram, generation: int) -> ScoreHistogram:
+        with self._lock:
+            unchanged = self._loads.finish(quiz_id, generation)
+            histogram = self._fresh(quiz_id)
+            if histogram is not None:
+                return histogram
+            if unchanged:
+                self._histograms[quiz_id] = built
+                if len(self._histograms) > self.max_entries:
+                    self._histograms.popitem(last=False)
+        return built
+
+    def _abandon(self, quiz_id: Any, generation: int) -> None:
+        with self._lock:
+            self._loads.finish(quiz_id, generation)
+
+    def _add(self, histogram: ScoreHistogram, attempt_id: int, score: int) -> ScoreHistogram:
+        with self._lock:
+            if attempt_id > histogram.last_attempt_id:
+                histogram.add(score)
+        return histogram
+
+
+# Create a singleton instance
+score_distributions = ScoreDistributions()
@@ -0,0 +1,46 @@
+from typing import Dict, List
+
+from backend.domain.quiz_request import QuizAnswerRequest
+from . import errors
+from .answer_key import AnswerKey
+
+
+def parse_question_id(raw_id: str, answer_key: AnswerKey) -> int:
+    """
+    Resolve a submitted question id against the quiz answer key
+    """
+    try:
+        question_id = int(raw_id)
+    except ValueError:
+        raise errors.QuestionNotInQuizError(
+            f"Question {raw_id} does not belong to this quiz"
+        ) from None
+    if question_id not in answer_key:
+        raise errors.QuestionNotInQuizError(
+            f"Question {raw_id} does not belong to this quiz"
+        )
+    return question_id
+
+
+def score_answers(
+    answer_key: AnswerKey, answers: List[QuizAnswerRequest]
+) -> Dict[int, bool]:
+    """
+    Score submitted answers in memory against the quiz answer key.
+    Returns question id -> whether it was answered correctly.
+    The whole submission is rejected if any answer targets a question
+    outside of the quiz or a question is answered twice
+    """
+    results: Dict[int, bool] = {}
+    for answer in answers:
+        question_id = parse_question_id(answer.question_id, answer_key)
+        if question_id in results:
+            raise errors.DuplicateAnswerError(
+                f"Question {answer.question_id} is answered more than once"
+            )
+        # Answered correctly only if selected options match correct options exactly,
+        # the length check rejects repeated selections of a correct option
+        correct = answer_key[question_id]
+        selected = answer.selected_options
+        results[question_id] = len(selected) == len(correct) and correct == frozenset(selected)
+    return results
@@ -0,0 +1,210 @@
+"""
+Imports of Open Trivia DB questions split into chunks the API accepts
+"""
+
+import base64
+import itertools
+import logging
+import time
+from typing import List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.config import settings
+from backend.domain.quiz_request import ExternalImportResponse, QuizQuestionsResponse
+from backend.gateways.trivia import (
+    NotEnoughQuestionsError,
+    TokenNotFoundError,
+    TriviaQuery,
+    TriviaQuestion,
+    async_trivia_gateway,
+)
+
+from . import errors, quiz, quiz_async
+from .question_bank import MAX_BATCH, question_bank
+
+logger = logging.getLogger(__name__)
+
+
+class ImportPlan(BaseModel):
+    """
+    Questions still to import: (category, difficulty, count) per combination,
+    and the session token keeping the upstream from repeating questions
+    """
+
+    remaining: List[Tuple[Optional[int], Optional[str], int]]
+    token: Optional[str] = None
+
+
+def encode_continuation(plan: ImportPlan) -> str:
+    return base64.urlsafe_b64encode(plan.model_dump_json().encode()).decode()
+
+
+def decode_continuation(continuation: str) -> ImportPlan:
+    try:
+        return ImportPlan.model_validate_json(base64.urlsafe_b64decode(continuation))
+    except (ValueError, ValidationError):
+        raise errors.InvalidContinuationError("Invalid import continuation") from None
+
+
+async def plan_import(
+    count: int,
+    categories: Sequence[Optional[int]],
+    difficulties: Sequence[Optional[str]],
+) -> Tuple[ImportPlan, int]:
+    """
+    Plan count questions per combination of category and difficulty.
+    Imports needing several chunks are capped to the category counts of
+    the upstream and get a session token. Returns the plan and the number
+    of requested questions the upstream does not have
+    """
+    remaining = [
+        (category, difficulty, count)
+        for category, difficulty in itertools.product(categories, difficulties)
+    ]
+    if count <= MAX_BATCH:
+        # A single request per combination, no need to spend requests on checks
+        return ImportPlan(remaining=remaining), 0
+
+    unavailable = 0
+    capped = []
+    for category, difficulty, wanted in remaining:
+        if category is not None:
+            try:
+                counts = await async_trivia_gateway.get_category_count(category)
+            except (ConnectionError, ValueError) as e:
+                logger.warning("Counting questions of category %s failed: %s", category, e)
+            else:
+                available = counts.available(difficulty)
+                unavailable += max(wanted - available, 0)
+                wanted = min(wanted, available)
+        if wanted > 0:
+            capped.append((category, difficulty, wanted))
+    return ImportPlan(remaining=capped, token=await _request_token()), unavailable
+
+
+async def load_external_questions(
+    quiz_id: str,
+    count: Optional[int],
+    categories: Sequence[str],
+    db: AsyncSession,
+    difficulties: Sequence[Optional[str]] = (None,),
+    continuation: Optional[str] = None,
+) -> ExternalImportResponse:
+    """
+    Load count questions per category and difficulty from the question bank,
+    or from external API when the bank cannot serve them, fetched concurrently
+    in chunks and merged. Pass the continuation of a partial import instead
+    of count, categories and difficulties to import the rest
+    """
+    await quiz_async.prepare_external_import(quiz_id, db)
+    if continuation is not None:
+        plan, unavailable = decode_continuation(continuation), 0
+    else:
+        plan, unavailable = await plan_import(
+            count,
+            [quiz.parse_category(category) for category in categories],
+            difficulties,
+        )
+    return await import_questions(quiz_id, plan, db, unavailable)
+
+
+async def import_questions(
+    quiz_id: str,
+    plan: ImportPlan,
+    db: AsyncSession,
+    unavailable: int = 0,
+    budget: float = settings.TRIVIA_IMPORT_BUDGET_SECONDS,
+) -> ExternalImportResponse:
+    """
+    Import the planned questions into a quiz checked with
+    `quiz_async.prepare_external_import`, in rounds of at most one chunk per
+    combination, saving every round. Requests are paced by the gateway's
+    rate limiter. Exhausted combinations are counted as unavailable.
+    When the budget runs out or the upstream fails, the questions imported
+    so far are returned with a continuation for the rest
+    """
+    deadline = time.monotonic() + budget
+    response: Optional[ExternalImportResponse] = None
+    seen: Set[str] = set()
+    remaining = plan.remaining
+    token = plan.token
+
+    while remaining:
+        queries = [
+            TriviaQuery(min(wanted, MAX_BATCH), category, difficulty)
+            for category, difficulty, wanted in remaining
+        ]
+        batches = await question_bank.get_each(
+            db, UUID(quiz_id), queries, token=token, return_exceptions=True
+        )
+
+        fresh: List[TriviaQuestion] = []
+        still_remaining = []
+        renew_token = False
+        failure: Optional[BaseException] = None
+        for (category, difficulty, wanted), batch in zip(remaining, batches):
+            if isinstance(batch, NotEnoughQuestionsError):
+                unavailable += wanted
+                continue
+            if isinstance(batch, TokenNotFoundError):
+                renew_token = True
+                still_remaining.append((category, difficulty, wanted))
+                continue
+            if isinstance(batch, BaseException):
+                failure = batch
+                still_remaining.append((category, difficulty, wanted))
+                continue
+            new = [q for q in batch if q.question not in seen]
+            seen.update(q.question for q in new)
+            fresh.extend(new)
+            if not new:
+                # Only questions the quiz already has, the combination is used up
+                unavailable += wanted
+            elif wanted > len(new):
+                still_remaining.append((category, difficulty, wanted - len(new)))
+
+        if fresh:
+            saved = await quiz_async.save_external_questions(quiz_id, fresh, db)
+            response = _merge(response, saved)
+        remaining = still_remaining
+        if renew_token:
+            token = await _request_token()
+
+        if failure is not None:
+            if response is None:
+                raise failure
+            logger.warning("Importing questions stopped early: %s", failure)
+            break
+        if time.monotonic() >= deadline:
+            break
+
+    if response is None:
+        saved = await quiz_async.save_external_questions(quiz_id, [], db)
+        response = _merge(None, saved)
+    response.unavailable = unavailable
+    if remaining:
+        response.continuation = encode_continuation(
+            ImportPlan(remaining=remaining, token=token)
+        )
+    return response
+
+
+async def _request_token() -> Optional[str]:
+    try:
+        return await async_trivia_gateway.request_token()
+    except (ConnectionError, ValueError) as e:
+        # Without a token chunks may repeat questions, repeats are skipped
+        logger.warning("Requesting a session token failed: %s", e)
+        return None
+
+
+def _merge(
+    response: Optional[ExternalImportResponse], saved: QuizQuestionsResponse
+) -> ExternalImportResponse:
+    if response is None:
+        return ExternalImportResponse(**saved.model_dump())
+    response.questions.extend(saved.questions)
+    return response
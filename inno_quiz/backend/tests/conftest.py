@@ -1,28 +1,70 @@
 """Common test fixtures."""
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from uuid import uuid4
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
-from backend.db import get_db
+from backend.db import get_async_db, get_db, get_async_url, get_read_db
 from backend.main import app
+from backend.gateways.trivia import AsyncTriviaGateway
+from backend.models import BankQuestion, Quiz, User
 from backend.models.base import Base
+from backend.service import trivia_import
+from backend.service.import_jobs import import_job_runner
+from backend.service.question_bank import QuestionBank
+from backend.tests.fake_redis import FakeRedisServer
+from backend.tests.trivia_stub import StubTriviaServer
 
 
-# Use in-memory SQLite database for testing
-TEST_DATABASE_URL = "sqlite:///:memory:"
+@pytest.fixture
+def anyio_backend() -> str:
+    """Run async tests on asyncio only, the drivers do not support trio."""
+    return "asyncio"
+
+
+@pytest.fixture
+def fake_redis() -> Generator[FakeRedisServer, None, None]:
+    """Start a local server speaking the Redis protocol."""
+    server = FakeRedisServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def trivia_stub() -> Generator[StubTriviaServer, None, None]:
+    """Start a local stand-in for Open Trivia DB."""
+    server = StubTriviaServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def trivia_import_stub(monkeypatch, trivia_stub) -> StubTriviaServer:
+    """Point imports at the stub server, with an empty bank and no rate limit."""
+    gateway = AsyncTriviaGateway(base_url=trivia_stub.url, retries=0)
+    bank = QuestionBank(gateway)
+    monkeypatch.setattr(trivia_import, "async_trivia_gateway", gateway)
+    monkeypatch.setattr(trivia_import, "question_bank", bank)
+    return trivia_stub
+
+
+@pytest.fixture(scope="session")
+def test_database_url(tmp_path_factory) -> str:
+    """SQLite file shared by the sync and asyncio test engines."""
+    return f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}"
 
 
 @pytest.fixture(scope="session")
-def db_engine():
+def db_engine(test_database_url):
     """Create a test engine for the database."""
     engine = create_engine(
-        TEST_DATABASE_URL,
+        test_database_url,
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
     )
 
     # Create all tables
@@ -32,6 +74,21 @@ def db_engine():
 
     # Drop all tables
     Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def async_session_factory(db_engine, test_database_url):
+    """Create an asyncio session factory on the test database."""
+    # Every test client runs its own event loop, so connections are not pooled
+    engine = create_async_engine(get_async_url(test_database_url), poolclass=NullPool)
+    return async_sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def import_jobs_on_test_database(monkeypatch, async_session_factory):
+    """Run background import jobs on the test database."""
+    monkeypatch.setattr(import_job_runner, "session_factory", async_session_factory)
 
 
 @pytest.fixture
@@ -48,7 +105,21 @@ def db_session(db_engine) -> Generator[Session, None, None]:
 
 
 @pytest.fixture
-def client(db_session) -> Generator[TestClient, None, None]:
+def empty_quiz(db_session) -> str:
+    """Create a quiz without questions and empty the question bank, return the quiz id."""
+    db_session.query(BankQuestion).delete()
+    author = db_session.get(User, "import_author")
+    if author is None:
+        author = User(username="import_author", password="hashed")
+        db_session.add(author)
+    quiz = Quiz(id=uuid4(), name="Import Quiz", category="9", author=author)
+    db_session.add(quiz)
+    db_session.commit()
+    return str(quiz.id)
+
+
+@pytest.fixture
+def client(db_session, async_session_factory) -> Generator[TestClient, None, None]:
     """Create a test client with the application."""
 
     # Override the get_db dependency to use the test database
@@ -58,7 +129,13 @@ def client(db_session) -> Generator[TestClient, None, None]:
         finally:
             pass
 
+    async def override_get_async_db() -> AsyncGenerator[AsyncSession, None]:
+        async with async_session_factory() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_async_db
 
     with TestClient(app=app) as test_client:
         yield test_client
@@ -0,0 +1,149 @@
+"""In-process server speaking enough of the Redis protocol for the tests."""
+
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Serve one client connection."""
+
+    server: "FakeRedisServer"
+
+    def handle(self):
+        while True:
+            command = self.read_command()
+            if command is None:
+                break
+            name, args = command[0].upper().decode(), command[1:]
+            self.server.commands.append(name)
+            handler = getattr(self, f"cmd_{name.lower()}", None)
+            if handler is None:
+                self.write(b"-ERR unknown command '%s'\r\n" % name.encode())
+            else:
+                handler(*args)
+        self.server.unsubscribe(self)
+
+    def read_command(self) -> Optional[List[bytes]]:
+        """Read a command sent as an array of bulk strings."""
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def write(self, data: bytes) -> None:
+        """Send raw RESP data, serialized with other writers to this client."""
+        with self.server.lock:
+            self.wfile.write(data)
+
+    def write_bulk(self, value: Optional[bytes]) -> None:
+        """Send a bulk string reply."""
+        if value is None:
+            self.write(b"$-1\r\n")
+        else:
+            self.write(b"$%d\r\n%s\r\n" % (len(value), value))
+
+    def cmd_ping(self):
+        self.write(b"+PONG\r\n")
+
+    def cmd_auth(self, password):
+        if password == self.server.password:
+            self.write(b"+OK\r\n")
+        else:
+            self.write(b"-WRONGPASS invalid password\r\n")
+
+    def cmd_select(self, db):
+        self.write(b"+OK\r\n")
+
+    def cmd_get(self, key):
+        self.write_bulk(self.server.get(key))
+
+    def cmd_mget(self, *keys):
+        self.write(b"*%d\r\n" % len(keys))
+        for key in keys:
+            self.write_bulk(self.server.get(key))
+
+    def cmd_set(self, key, value, *options):
+        expires_at = None
+        if options and options[0].upper() == b"PX":
+            expires_at = time.monotonic() + int(options[1]) / 1000
+        self.server.data[key] = (value, expires_at)
+        self.write(b"+OK\r\n")
+
+    def cmd_del(self, *keys):
+        deleted = sum(self.server.data.pop(key, None) is not None for key in keys)
+        self.write(b":%d\r\n" % deleted)
+
+    def cmd_incr(self, key):
+        value = int(self.server.get(key) or 0) + 1
+        self.server.data[key] = (str(value).encode(), None)
+        self.write(b":%d\r\n" % value)
+
+    def cmd_publish(self, channel, message):
+        receivers = self.server.subscribers(channel)
+        payload = b"*3\r\n$7\r\nmessage\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n" % (
+            len(channel), channel, len(message), message
+        )
+        for receiver in receivers:
+            receiver.write(payload)
+        self.write(b":%d\r\n" % len(receivers))
+
+    def cmd_subscribe(self, channel):
+        self.server.subscribe(self, channel)
+        self.write(b"*3\r\n$9\r\nsubscribe\r\n$%d\r\n%s\r\n:1\r\n" % (len(channel), channel))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """Redis-protocol server on a free local port, run in a daemon thread."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password: Optional[bytes] = None):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.password = password
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands: List[str] = []
+        self.lock = threading.Lock()
+        self._channels: Dict[bytes, Set[FakeRedisHandler]] = {}
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "FakeRedisServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def subscribe(self, handler: FakeRedisHandler, channel: bytes) -> None:
+        with self.lock:
+            self._channels.setdefault(channel, set()).add(handler)
+
+    def unsubscribe(self, handler: FakeRedisHandler) -> None:
+        with self.lock:
+            for handlers in self._channels.values():
+                handlers.discard(handler)
+
+    def subscribers(self, channel: bytes) -> List[FakeRedisHandler]:
+        with self.lock:
+            return list(self._channels.get(channel, ()))
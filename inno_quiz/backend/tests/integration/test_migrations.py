@@ -0,0 +1,110 @@
+"""Integration tests for the database migrations."""
+
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from backend.init_db import ALEMBIC_INI, migrate
+from backend.models.base import Base
+
+HEAD_REVISION = ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_current_head()
+
+# Indexes with descending columns: SQLite does not reflect the order of index
+# columns, so autogenerate reports them as removed and added again
+DESCENDING_INDEXES = {"ix_user_attempts_leaderboard"}
+
+
+def get_index_names(engine, table: str) -> set:
+    """Names of the indexes of a table."""
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def get_revision(engine) -> str:
+    """Revision the database is stamped with."""
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def test_migrations_match_models(tmp_path):
+    """Test a migrated empty database has exactly the schema of the models."""
+    # Given
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    # When
+    migrate(engine)
+
+    # Then
+    with engine.connect() as connection:
+        # SQLite reflects UUID columns as NUMERIC, so only types are not compared
+        context = MigrationContext.configure(connection, opts={"compare_type": False})
+        diff = compare_metadata(context, Base.metadata)
+    diff = [change for change in diff if change[1].name not in DESCENDING_INDEXES]
+    assert diff == []
+    assert get_revision(engine) == HEAD_REVISION
+
+
+def test_migrate_existing_database(tmp_path):
+    """Test a database created before migrations gets the indexes and keeps its data."""
+    # Given
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    migrate(engine, "0001")
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(
+            text("INSERT INTO users (username, password) VALUES ('legacy', 'hashed')")
+        )
+
+    # When
+    migrate(engine)
+
+    # Then
+    assert get_revision(engine) == HEAD_REVISION
+    assert "ix_questions_quiz_id" in get_index_names(engine, "questions")
+    assert get_index_names(engine, "user_attempts") == {
+        "ix_user_attempts_username",
+        "ix_user_attempts_leaderboard",
+        "ix_user_attempts_quiz_started",
+    }
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT username FROM users")).scalars().all() == [
+            "legacy"
+        ]
+
+
+def test_migrate_database_with_leaderboard_index(tmp_path):
+    """Test databases already holding an index from `create_all` still migrate."""
+    # Given
+    engine = create_engine(f"sqlite:///{tmp_path / 'create_all.db'}")
+    migrate(engine, "0001")
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(
+            text(
+                "CREATE INDEX ix_user_attempts_quiz_score_time "
+                "ON user_attempts (quiz_id, score, completion_time)"
+            )
+        )
+
+    # When
+    migrate(engine)
+
+    # Then
+    assert get_revision(engine) == HEAD_REVISION
+
+
+def test_leaderboard_index_orders_scores_descending(tmp_path):
+    """Test the migrated leaderboard index holds scores in descending order."""
+    # Given
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    # When
+    migrate(engine)
+
+    # Then
+    with engine.connect() as connection:
+        sql = connection.execute(
+            text("SELECT sql FROM sqlite_master WHERE name = 'ix_user_attempts_leaderboard'")
+        ).scalar_one()
+    assert "score DESC" in sql
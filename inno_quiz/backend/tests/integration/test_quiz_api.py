@@ -1,16 +1,23 @@
 """Integration tests for quiz API endpoints."""
 
+import json
+import time
+from unittest.mock import AsyncMock
 from uuid import UUID, uuid4
 import pytest
 
 from fastapi.testclient import TestClient
+from sqlalchemy import Engine, event
 
 from inno_quiz.backend.models.question import Question
 from inno_quiz.backend.models.quiz import Quiz
 from inno_quiz.backend.models.answer_option import AnswerOption
 from inno_quiz.backend.models.user import User
+from backend.models.bank_question import BankQuestion
 from inno_quiz.backend.main import app
 from inno_quiz.backend.db import get_db
+from backend import repo
+from backend.gateways.trivia import async_trivia_gateway
 from inno_quiz.backend.gateways.trivia import TriviaQuestion
 
 
@@ -86,6 +93,13 @@ def unauthenticated_test_quiz(db_session):
     return str(uuid4())
 
 
+@pytest.fixture
+def empty_question_bank(db_session):
+    """Start with no questions banked by earlier imports."""
+    db_session.query(BankQuestion).delete()
+    db_session.commit()
+
+
 def test_create_quiz(authenticated_client, db_session):
     """Test creating a new quiz."""
     # Given
@@ -201,7 +215,9 @@ def test_add_question(authenticated_client, test_quiz, db_session):
     assert correct_options[0].text == "Paris"
 
 
-def test_load_external_questions(authenticated_client, test_quiz, db_session, mocker):
+def test_load_external_questions(
+    authenticated_client, test_quiz, db_session, empty_question_bank, mocker
+):
     """Test loading questions from external API."""
     # Create questions using the actual TriviaQuestion model
     mock_questions = [
@@ -224,9 +240,8 @@ def test_load_external_questions(authenticated_client, test_quiz, db_session, mo
     ]
 
     # Better mock that ensures our mock gets used
-    mocker.patch(
-        "inno_quiz.backend.service.quiz.trivia_gateway.get_questions",
-        return_value=mock_questions,
+    get_each = mocker.patch.object(
+        async_trivia_gateway, "get_each", AsyncMock(return_value=[mock_questions])
     )
 
     # When
@@ -236,6 +251,9 @@ def test_load_external_questions(authenticated_client, test_quiz, db_session, mo
 
     # Then
     assert response.status_code == 200
+    get_each.assert_awaited_once_with(
+        [(2, 9, None)], token=None, return_exceptions=True
+    )
     data = response.json()
     assert data["quiz_id"] == test_quiz
     assert len(data["questions"]) == 2
@@ -262,6 +280,138 @@ def test_load_external_questions(authenticated_client, test_quiz, db_session, mo
     assert question_count >= 2  # At least the 2 we just added
 
 
+def test_load_external_questions_of_several_categories(
+    authenticated_client, test_quiz, empty_question_bank, mocker
+):
+    """Test repeated category and difficulty parameters are fetched together and merged."""
+    # Given
+    fetched = [
+        [
+            TriviaQuestion(
+                question=f"Question {category}-{i}?",
+                correct_answer="Yes",
+                incorrect_answers=["No"],
+                category="Mixed",
+                type="boolean",
+                difficulty="easy",
+            )
+            for i in range(2)
+        ]
+        for category in (9, 18)
+    ]
+    get_each = mocker.patch.object(
+        async_trivia_gateway, "get_each", AsyncMock(return_value=fetched)
+    )
+
+    # When
+    response = authenticated_client.get(
+        f"/v1/quiz/{test_quiz}/load_questions"
+        "?count=2&category=9&category=18&difficulty=easy"
+    )
+
+    # Then
+    assert response.status_code == 200
+    get_each.assert_awaited_once_with(
+        [(2, 9, "easy"), (2, 18, "easy")], token=None, return_exceptions=True
+    )
+    assert [q["text"] for q in response.json()["questions"]] == [
+        q.question for batch in fetched for q in batch
+    ]
+
+
+def test_load_external_questions_from_question_bank(
+    authenticated_client, test_quiz, empty_question_bank, mocker
+):
+    """Test questions fetched once serve later imports without the upstream."""
+    # Given
+    fetched = [
+        TriviaQuestion(
+            question=f"Banked question {i}?",
+            correct_answer="Yes",
+            incorrect_answers=["No"],
+            category="General Knowledge",
+            type="boolean",
+            difficulty="easy",
+        )
+        for i in range(3)
+    ]
+    get_each = mocker.patch.object(
+        async_trivia_gateway, "get_each", AsyncMock(return_value=[fetched])
+    )
+    authenticated_client.get(f"/v1/quiz/{test_quiz}/load_questions?count=3&category=9")
+    other_quiz = authenticated_client.post(
+        "/v1/quiz/", json={"name": "Other Quiz", "category": 9, "is_submitted": False}
+    ).json()["id"]
+
+    # When
+    response = authenticated_client.get(
+        f"/v1/quiz/{other_quiz}/load_questions?count=2&category=9"
+    )
+    repeated = authenticated_client.get(
+        f"/v1/quiz/{test_quiz}/load_questions?count=2&category=9"
+    )
+
+    # Then
+    assert response.status_code == 200
+    texts = [q["text"] for q in response.json()["questions"]]
+    assert len(texts) == 2
+    assert set(texts) <= {q.question for q in fetched}
+    # The first quiz already has every banked question, so they come from upstream
+    assert repeated.status_code == 200
+    assert get_each.await_count == 2
+
+
+def test_load_external_questions_rejects_bad_continuation(authenticated_client, test_quiz):
+    """Test an import needs count and category or a valid continuation."""
+    # When
+    missing = authenticated_client.get(f"/v1/quiz/{test_quiz}/load_questions")
+    invalid = authenticated_client.get(
+        f"/v1/quiz/{test_quiz}/load_questions?continuation=not-a-continuation"
+    )
+
+    # Then
+    assert missing.status_code == 422
+    assert invalid.status_code == 400
+
+
+def test_load_external_questions_in_background(authenticated_client, test_quiz, mocker):
+    """Test an import job answers 202 at once and reports its progress until done."""
+    # Given
+    fetched = [
+        TriviaQuestion(
+            question=f"Background question {i}?",
+            correct_answer="Yes",
+            incorrect_answers=["No"],
+            category="General Knowledge",
+            type="boolean",
+            difficulty="easy",
+        )
+        for i in range(3)
+    ]
+    mocker.patch.object(async_trivia_gateway, "get_each", AsyncMock(return_value=[fetched]))
+
+    # When
+    response = authenticated_client.post(
+        f"/v1/quiz/{test_quiz}/load_questions/jobs?count=3&category=9"
+    )
+    job_url = response.headers["Location"]
+    deadline = time.monotonic() + 5
+    job = authenticated_client.get(job_url).json()
+    while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.01)
+        job = authenticated_client.get(job_url).json()
+
+    # Then
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+    assert (job["status"], job["requested"], job["imported"]) == ("succeeded", 3, 3)
+    questions = authenticated_client.get(f"/v1/quiz/{test_quiz}/questions").json()["questions"]
+    assert len(questions) == 3
+    assert authenticated_client.get(
+        f"/v1/quiz/{test_quiz}/load_questions/jobs/{uuid4()}"
+    ).status_code == 404
+
+
 def test_get_quiz_info(authenticated_client, test_quiz, db_session):
     """Test getting quiz information."""
     # Given
@@ -422,3 +572,355 @@ def test_unauthorized_access(unauthenticated_client, unauthenticated_test_quiz):
     assert (
         response.status_code == 401
     ), "Submission endpoint should require authentication"
+
+
+def test_submit_quiz_answers_after_adding_question(authenticated_client, test_quiz):
+    """Test the cached answer key picks up questions added after a submission."""
+    # Given
+    question = {"text": "1+1?", "options": ["1", "2"], "correct_options": [1]}
+    first_id = authenticated_client.post(
+        f"/v1/quiz/{test_quiz}/questions", json=question
+    ).json()["id"]
+    submission = {
+        "quiz_id": test_quiz,
+        "user_id": "ignored",
+        "answers": [{"question_id": first_id, "selected_options": [1]}],
+        "completion_time": 5.0,
+    }
+    assert authenticated_client.post(
+        f"/v1/quiz/{test_quiz}/answers", json=submission
+    ).json()["total"] == 1
+
+    # When
+    second_id = authenticated_client.post(
+        f"/v1/quiz/{test_quiz}/questions", json=question
+    ).json()["id"]
+    submission["answers"].append({"question_id": second_id, "selected_options": [1]})
+    response = authenticated_client.post(f"/v1/quiz/{test_quiz}/answers", json=submission)
+
+    # Then
+    assert response.status_code == 200
+    assert response.json()["score"] == 2
+    assert response.json()["total"] == 2
+
+
+def test_submit_quiz_answers_after_question_added_elsewhere(
+    authenticated_client, test_quiz, db_session
+):
+    """Test a question added by another worker is not rejected by the cached answer key."""
+    # Given
+    question = {"text": "2+1?", "options": ["3", "4"], "correct_options": [0]}
+    first_id = authenticated_client.post(
+        f"/v1/quiz/{test_quiz}/questions", json=question
+    ).json()["id"]
+    submission = {
+        "quiz_id": test_quiz,
+        "user_id": "ignored",
+        "answers": [{"question_id": first_id, "selected_options": [0]}],
+        "completion_time": 5.0,
+    }
+    authenticated_client.post(f"/v1/quiz/{test_quiz}/answers", json=submission)
+
+    # When
+    # Written without this process's cache invalidation, as another worker would
+    second = repo.question.create_with_options(
+        db_session, quiz_id=UUID(test_quiz), text="2+2?", options=["4"], correct_options=[0]
+    )
+    submission["answers"].append({"question_id": str(second.id), "selected_options": [0]})
+    response = authenticated_client.post(f"/v1/quiz/{test_quiz}/answers", json=submission)
+
+    # Then
+    assert response.status_code == 200
+    assert response.json()["score"] == 2
+
+
+def test_submit_quiz_answers_foreign_question(authenticated_client, test_quiz):
+    """Test answers to questions outside the quiz are rejected."""
+    # Given
+    submission = {
+        "quiz_id": test_quiz,
+        "user_id": "ignored",
+        "answers": [{"question_id": "999999", "selected_options": [0]}],
+        "completion_time": 5.0,
+    }
+
+    # When
+    response = authenticated_client.post(f"/v1/quiz/{test_quiz}/answers", json=submission)
+
+    # Then
+    assert response.status_code == 400
+    assert "does not belong" in response.json()["detail"]
+
+
+def test_get_score_distribution(authenticated_client, test_quiz):
+    """Test submissions show up in the score distribution and percentile."""
+    # Given
+    question = {"text": "2+3?", "options": ["5", "6"], "correct_options": [0]}
+    question_id = authenticated_client.post(
+        f"/v1/quiz/{test_quiz}/questions", json=question
+    ).json()["id"]
+    submission = {
+        "quiz_id": test_quiz,
+        "user_id": "ignored",
+        "answers": [{"question_id": question_id, "selected_options": [1]}],
+        "completion_time": 5.0,
+    }
+    authenticated_client.post(f"/v1/quiz/{test_quiz}/answers", json=submission)
+
+    # When
+    submission["answers"][0]["selected_options"] = [0]
+    result = authenticated_client.post(f"/v1/quiz/{test_quiz}/answers", json=submission)
+    response = authenticated_client.get(f"/v1/quiz/{test_quiz}/distribution")
+
+    # Then
+    assert result.json()["percentile"] == 50.0
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_attempts"] == 2
+    assert data["buckets"] == [{"score": 0, "count": 1}, {"score": 1, "count": 1}]
+
+
+def test_get_leaderboard_pagination(authenticated_client, test_quiz):
+    """Test the leaderboard is paged with a keyset cursor in ranking order."""
+    # Given
+    question = {"text": "3+3?", "options": ["6", "7"], "correct_options": [0]}
+    question_id = authenticated_client.post(
+        f"/v1/quiz/{test_quiz}/questions", json=question
+    ).json()["id"]
+    for selected, completion_time in [([0], 9.0), ([1], 1.0), ([0], 3.0), ([0], 3.0), ([1], 2.0)]:
+        submission = {
+            "quiz_id": test_quiz,
+            "user_id": "ignored",
+            "answers": [{"question_id": question_id, "selected_options": selected}],
+            "completion_time": completion_time,
+        }
+        authenticated_client.post(f"/v1/quiz/{test_quiz}/answers", json=submission)
+
+    # When
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        data = authenticated_client.get(
+            f"/v1/quiz/{test_quiz}/leaderboard", params=params
+        ).json()
+        pages.append(data)
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    # Then
+    assert [len(page["entries"]) for page in pages] == [2, 2, 1]
+    assert all(page["total_entries"] == 5 for page in pages)
+    ranking = [(e["score"], e["completion_time"]) for page in pages for e in page["entries"]]
+    assert ranking == [(1, 3.0), (1, 3.0), (1, 9.0), (0, 1.0), (0, 2.0)]
+
+
+def test_get_leaderboard_invalid_cursor(authenticated_client, test_quiz):
+    """Test a malformed cursor is rejected."""
+    # When
+    response = authenticated_client.get(
+        f"/v1/quiz/{test_quiz}/leaderboard", params={"cursor": "not-a-cursor"}
+    )
+
+    # Then
+    assert response.status_code == 400
+
+
+def test_get_quiz_questions_not_modified(authenticated_client, test_quiz):
+    """Test a matching ETag is answered with 304 without reading the questions."""
+    # Given
+    question = {"text": "4+4?", "options": ["8", "9"], "correct_options": [0]}
+    authenticated_client.post(f"/v1/quiz/{test_quiz}/questions", json=question)
+    first = authenticated_client.get(f"/v1/quiz/{test_quiz}/questions")
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # Listen on every engine, the test client binds its own asyncio engine
+    event.listen(Engine, "before_cursor_execute", on_execute)
+
+    # When
+    try:
+        response = authenticated_client.get(
+            f"/v1/quiz/{test_quiz}/questions",
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+    finally:
+        event.remove(Engine, "before_cursor_execute", on_execute)
+
+    # Then
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert response.status_code == 304
+    assert response.headers["ETag"] == first.headers["ETag"]
+    assert response.content == b""
+    assert statements
+    assert not [s for s in statements if "questions" in s or "answer_options" in s]
+
+
+def test_quiz_etag_changes_with_content(authenticated_client, test_quiz):
+    """Test adding a question and submitting the quiz change the ETags."""
+    # Given
+    info_etag = authenticated_client.get(f"/v1/quiz/{test_quiz}").headers["ETag"]
+    questions_etag = authenticated_client.get(
+        f"/v1/quiz/{test_quiz}/questions"
+    ).headers["ETag"]
+    question = {"text": "5+5?", "options": ["10", "11"], "correct_options": [0]}
+
+    # When
+    authenticated_client.post(f"/v1/quiz/{test_quiz}/questions", json=question)
+    after_add = authenticated_client.get(
+        f"/v1/quiz/{test_quiz}/questions", headers={"If-None-Match": questions_etag}
+    )
+    authenticated_client.put(f"/v1/quiz/{test_quiz}/submit")
+    after_submit = authenticated_client.get(
+        f"/v1/quiz/{test_quiz}", headers={"If-None-Match": info_etag}
+    )
+
+    # Then
+    assert after_add.status_code == 200
+    assert after_add.json()["questions"][-1]["text"] == "5+5?"
+    assert after_add.headers["ETag"] != questions_etag
+    assert after_submit.status_code == 200
+    assert after_submit.headers["ETag"] != info_etag
+
+
+def test_get_quiz_questions_served_from_cache(authenticated_client, test_quiz):
+    """Test repeated question reads are cached until a question is added."""
+    # Given
+    question = {"text": "6+6?", "options": ["12", "13"], "correct_options": [0]}
+    authenticated_client.post(f"/v1/quiz/{test_quiz}/questions", json=question)
+    authenticated_client.get(f"/v1/quiz/{test_quiz}/questions")
+    hits = authenticated_client.get("/stats/cache").json()["responses"]["hits"]
+
+    # When
+    cached = authenticated_client.get(f"/v1/quiz/{test_quiz}/questions")
+    authenticated_client.post(f"/v1/quiz/{test_quiz}/questions", json=question)
+    reloaded = authenticated_client.get(f"/v1/quiz/{test_quiz}/questions")
+
+    # Then
+    stats = authenticated_client.get("/stats/cache").json()["responses"]
+    assert stats["hits"] == hits + 1
+    assert len(cached.json()["questions"]) == 1
+    assert len(reloaded.json()["questions"]) == 2
+
+
+def test_import_and_export_quiz_content(authenticated_client, test_quiz):
+    """Test JSON Lines content is imported line by line and exported back."""
+    # Given
+    body = (
+        '{"text": "1+1?", "options": ["2", "3"], "correct_options": [0]}\n'
+        "not json\n"
+        "\n"
+        '{"text": "Primes?", "options": ["2", "4", "5"], "correct_options": [0, 2]}\n'
+        '{"text": "Out of range?", "options": ["a"], "correct_options": [1]}\n'
+    )
+
+    # When
+    imported = authenticated_client.post(f"/v1/quiz/{test_quiz}/content", content=body)
+    exported = authenticated_client.get(f"/v1/quiz/{test_quiz}/content")
+
+    # Then
+    assert imported.status_code == 200
+    data = imported.json()
+    assert data["imported"] == 2
+    assert data["failed"] == 2
+    assert [error["line"] for error in data["errors"]] == [2, 5]
+    assert exported.status_code == 200
+    assert exported.headers["content-type"].startswith("application/x-ndjson")
+    assert exported.text.splitlines() == [
+        '{"text": "1+1?", "options": ["2", "3"], "correct_options": [0]}',
+        '{"text": "Primes?", "options": ["2", "4", "5"], "correct_options": [0, 2]}',
+    ]
+
+
+def test_copy_quiz_content_as_csv(authenticated_client, test_quiz, empty_quiz):
+    """Test a CSV export imports into another quiz unchanged."""
+    # Given
+    questions = [
+        {"text": 'Say "hi",\nthen?', "options": ["bye", "ok"], "correct_options": [1]},
+        {"text": "Café?", "options": ["ja", "nein"], "correct_options": [0]},
+    ]
+    for question in questions:
+        authenticated_client.post(f"/v1/quiz/{test_quiz}/questions", json=question)
+
+    # When
+    exported = authenticated_client.get(f"/v1/quiz/{test_quiz}/content?format=csv")
+    imported = authenticated_client.post(
+        f"/v1/quiz/{empty_quiz}/content?format=csv", content=exported.content
+    )
+
+    # Then
+    assert exported.headers["content-type"].startswith("text/csv")
+    assert exported.text.startswith("text,options,correct_options\n")
+    assert imported.json()["imported"] == 2
+    copied = authenticated_client.get(f"/v1/quiz/{empty_quiz}/questions").json()
+    assert [
+        {key: q[key] for key in ("text", "options", "correct_options")}
+        for q in copied["questions"]
+    ] == questions
+
+
+def test_quiz_content_of_missing_quiz(authenticated_client):
+    """Test content import and export answer 404 for an unknown quiz."""
+    # When
+    exported = authenticated_client.get(f"/v1/quiz/{uuid4()}/content")
+    imported = authenticated_client.post(f"/v1/quiz/{uuid4()}/content", content=b"")
+
+    # Then
+    assert exported.status_code == 404
+    assert imported.status_code == 404
+
+
+def test_export_quiz_attempts(authenticated_client, test_quiz):
+    """Test the author exports attempts joined with their answers, filtered by start time."""
+    # Given
+    question = {"text": "7+7?", "options": ["14", "15"], "correct_options": [0]}
+    question_id = authenticated_client.post(
+        f"/v1/quiz/{test_quiz}/questions", json=question
+    ).json()["id"]
+    for selected in ([0], [1]):
+        authenticated_client.post(
+            f"/v1/quiz/{test_quiz}/answers",
+            json={
+                "quiz_id": test_quiz,
+                "user_id": "testuser",
+                "answers": [{"question_id": question_id, "selected_options": selected}],
+                "completion_time": 3.0,
+            },
+        )
+
+    # When
+    exported = authenticated_client.get(f"/v1/quiz/{test_quiz}/attempts/export")
+    as_csv = authenticated_client.get(f"/v1/quiz/{test_quiz}/attempts/export?format=csv")
+    before = authenticated_client.get(
+        f"/v1/quiz/{test_quiz}/attempts/export", params={"until": "2000-01-01T00:00:00Z"}
+    )
+
+    # Then
+    assert exported.status_code == 200
+    rows = [json.loads(line) for line in exported.text.splitlines()]
+    assert [(row["question_id"], row["selected_options"]) for row in rows] == [
+        (question_id, [0]),
+        (question_id, [1]),
+    ]
+    assert all(row["username"] == "testuser" for row in rows)
+    assert as_csv.text.splitlines()[0] == (
+        "attempt_id,username,started_at,score,completion_time,"
+        "question_id,submitted_at,selected_options"
+    )
+    assert len(as_csv.text.splitlines()) == 3
+    assert before.text == ""
+
+
+def test_export_quiz_attempts_of_other_author(authenticated_client, empty_quiz):
+    """Test only the author of a quiz may export its attempts."""
+    # When
+    response = authenticated_client.get(f"/v1/quiz/{empty_quiz}/attempts/export")
+
+    # Then
+    assert response.status_code == 403
@@ -0,0 +1,135 @@
+"""Integration tests for routing reads to a replica database."""
+
+from uuid import UUID
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from backend import db as db_module
+from backend.auth.jwt import create_access_token
+from backend.db import READ_PRIMARY_COOKIE, get_async_db, get_async_url, get_read_db
+from backend.main import app
+from backend.models.base import Base
+from backend.models.quiz import Quiz
+from backend.models.user import User
+
+
+@pytest.fixture
+def replica_url(tmp_path) -> str:
+    """Second SQLite file acting as a replica that never catches up."""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def replica_client(client, db_session, test_database_url, replica_url, monkeypatch):
+    """Client using the real session dependencies on a primary and a replica."""
+    del app.dependency_overrides[get_async_db]
+    del app.dependency_overrides[get_read_db]
+    primary = create_async_engine(get_async_url(test_database_url), poolclass=NullPool)
+    monkeypatch.setattr(db_module, "async_engine", primary)
+    monkeypatch.setattr(db_module, "async_write_engine", primary)
+    monkeypatch.setattr(
+        db_module,
+        "read_async_engine",
+        create_async_engine(get_async_url(replica_url), poolclass=NullPool),
+    )
+
+    # The user is already replicated
+    replica_engine = create_engine(replica_url)
+    with Session(replica_engine) as replica_session:
+        for session in (db_session, replica_session):
+            if session.get(User, "replica_user") is None:
+                session.add(User(username="replica_user", password="hashed"))
+                session.commit()
+    replica_engine.dispose()
+
+    token = create_access_token(data={"sub": "replica_user"})
+    client.cookies.set("access_token", f"Bearer {token}")
+    return client
+
+
+def test_reads_use_replica(replica_client):
+    """Test read-only routes are served from the replica."""
+    # Given
+    replica_client.post("/v1/quiz/", json={"name": "Replica Quiz", "category": 9})
+    replica_client.cookies.delete(READ_PRIMARY_COOKIE)
+
+    # When
+    response = replica_client.get("/v1/users/replica_user/quizzes")
+
+    # Then
+    assert response.status_code == 200
+    assert response.json() == []  # Not replicated yet
+
+
+def test_client_reads_own_writes(replica_client):
+    """Test a client that just wrote reads from the primary."""
+    # Given
+    created = replica_client.post(
+        "/v1/quiz/", json={"name": "Replica Quiz", "category": 9}
+    )
+    assert created.cookies.get(READ_PRIMARY_COOKIE) == "1"
+
+    # When
+    response = replica_client.get("/v1/users/replica_user/quizzes")
+
+    # Then
+    assert response.status_code == 200
+    assert created.json()["id"] in [quiz["id"] for quiz in response.json()]
+    assert READ_PRIMARY_COOKIE not in response.cookies
+
+
+def test_failed_write_does_not_pin_primary(replica_client):
+    """Test a rejected write does not send the client's reads to the primary."""
+    # When
+    response = replica_client.put(
+        "/v1/quiz/00000000-0000-0000-0000-000000000000/submit"
+    )
+
+    # Then
+    assert response.status_code == 404
+    assert READ_PRIMARY_COOKIE not in response.cookies
+
+
+def test_pinned_client_is_not_served_replica_leaderboard(
+    replica_client, db_session, replica_url
+):
+    """Test a leaderboard page cached from the replica is not served to a pinned client."""
+    # Given
+    # The quiz is replicated, the attempt submitted next is not
+    quiz_id = replica_client.post(
+        "/v1/quiz/", json={"name": "Replica Quiz", "category": 9}
+    ).json()["id"]
+    quizzes = Quiz.__table__
+    row = db_session.execute(
+        select(quizzes).where(quizzes.c.id == UUID(quiz_id))
+    ).mappings().one()
+    replica_engine = create_engine(replica_url)
+    with replica_engine.begin() as connection:
+        connection.execute(insert(quizzes).values(**row))
+    replica_engine.dispose()
+    submission = {
+        "quiz_id": quiz_id,
+        "user_id": "replica_user",
+        "answers": [],
+        "completion_time": 10.5,
+    }
+    assert replica_client.post(f"/v1/quiz/{quiz_id}/answers", json=submission).status_code == 200
+    replica_client.cookies.delete(READ_PRIMARY_COOKIE)
+    stale = replica_client.get(f"/v1/quiz/{quiz_id}/leaderboard")
+    assert stale.json()["entries"] == []
+
+    # When
+    replica_client.cookies.set(READ_PRIMARY_COOKIE, "1")
+    response = replica_client.get(f"/v1/quiz/{quiz_id}/leaderboard")
+
+    # Then
+    assert response.status_code == 200
+    assert [entry["username"] for entry in response.json()["entries"]] == ["replica_user"]
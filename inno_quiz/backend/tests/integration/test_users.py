@@ -1,8 +1,21 @@
 """Integration tests for user authentication endpoints."""
 
+import sqlite3
 import uuid
+
+import pytest
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import event, make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 
+from backend import db as db_module
+from backend.auth.hashing import password_hasher
+from backend.auth.password import MIN_ROUNDS, get_hash_rounds
+from backend.auth.token_cache import token_cache
+from backend.db import WRITER_OPTIONS, get_async_db, get_async_url, set_sqlite_profile
+from backend.main import app
 from inno_quiz.backend.models.user import User
 
 
@@ -92,3 +105,189 @@ def test_login_invalid_credentials(client: TestClient, db_session):
     # Then
     assert response.status_code == 401
     assert "Incorrect username or password" in response.json()["detail"]
+
+
+def login(client: TestClient, username: str) -> None:
+    """Register a user and keep its token cookie on the client."""
+    user_data = {"username": username, "password": "testpassword123"}
+    client.post("/v1/users/create", json=user_data)
+    response = client.post(
+        "/v1/users/login",
+        data=user_data,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    client.cookies.set("access_token", f"Bearer {response.json()['access_token']}")
+
+
+def test_me_does_not_query_the_database(client: TestClient, async_session_factory):
+    """Test the principal of a verified token is served without loading the user."""
+    # Given
+    login(client, f"meuser_{uuid.uuid4().hex[:8]}")
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = async_session_factory.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", on_execute)
+
+    # When
+    try:
+        first = client.get("/v1/users/me")
+        second = client.get("/v1/users/me")
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+    # Then
+    assert first.status_code == second.status_code == 200
+    assert statements == []
+    assert token_cache.stats()["hits"] >= 1
+
+
+def test_revoked_user_is_rejected(client: TestClient):
+    """Test tokens issued before a user was revoked are no longer accepted."""
+    # Given
+    username = f"revokeduser_{uuid.uuid4().hex[:8]}"
+    login(client, username)
+    assert client.get("/v1/users/me").status_code == 200
+
+    # When
+    token_cache.revoke_user(username)
+    response = client.get("/v1/users/me")
+
+    # Then
+    assert response.status_code == 401
+
+
+def test_register_when_hashing_is_saturated(client: TestClient, monkeypatch):
+    """Test registration is rejected with 503 while the hashing queue is full."""
+    # Given
+    monkeypatch.setattr(password_hasher, "pending", password_hasher.workers)
+    monkeypatch.setattr(password_hasher, "queue_limit", 0)
+
+    # When
+    response = client.post(
+        "/v1/users/create", json={"username": "busyuser", "password": "testpassword123"}
+    )
+
+    # Then
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_password_of_other_cost(client: TestClient, db_session):
+    """Test logging in replaces a hash made at another cost than the configured one."""
+    # Given
+    username = f"rehashuser_{uuid.uuid4().hex[:8]}"
+    low_cost = CryptContext(schemes=["bcrypt"], bcrypt__rounds=MIN_ROUNDS)
+    db_session.add(User(username=username, password=low_cost.hash("testpassword123")))
+    db_session.commit()
+
+    # When
+    response = client.post(
+        "/v1/users/login",
+        data={"username": username, "password": "testpassword123"},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+
+    # Then
+    assert response.status_code == 200
+    db_session.expire_all()
+    stored = db_session.query(User).filter(User.username == username).one().password
+    assert stored.startswith(f"$2b${get_hash_rounds()}$")
+
+
+@pytest.fixture
+def write_lock_probe(client, test_database_url, monkeypatch):
+    """Run writing requests on real writer sessions, return a write lock probe."""
+    del app.dependency_overrides[get_async_db]
+    engine = create_async_engine(get_async_url(test_database_url), poolclass=NullPool)
+    set_sqlite_profile(engine.sync_engine)
+    monkeypatch.setattr(db_module, "async_write_engine", engine.execution_options(**WRITER_OPTIONS))
+    database = make_url(test_database_url).database
+
+    def probe() -> bool:
+        """Check another writer may take the write lock at once."""
+        connection = sqlite3.connect(database, timeout=0)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.rollback()
+            return True
+        except sqlite3.OperationalError:
+            return False
+        finally:
+            connection.close()
+
+    return probe
+
+
+def test_register_hashes_without_write_lock(client: TestClient, write_lock_probe, monkeypatch):
+    """Test the database is not locked for writes while a new password is hashed."""
+    # Given
+    lock_free = []
+    hash_password = password_hasher.hash
+
+    async def hash_and_probe(password):
+        lock_free.append(write_lock_probe())
+        return await hash_password(password)
+
+    monkeypatch.setattr(password_hasher, "hash", hash_and_probe)
+
+    # When
+    response = client.post(
+        "/v1/users/create",
+        json={"username": f"lockuser_{uuid.uuid4().hex[:8]}", "password": "testpassword123"},
+    )
+
+    # Then
+    assert response.status_code == 201
+    assert lock_free == [True]
+
+
+def test_login_verifies_without_write_lock(client: TestClient, write_lock_probe, monkeypatch):
+    """Test the database is not locked for writes while a password is verified."""
+    # Given
+    username = f"lockuser_{uuid.uuid4().hex[:8]}"
+    client.post("/v1/users/create", json={"username": username, "password": "testpassword123"})
+    lock_free = []
+    verify_and_update = password_hasher.verify_and_update
+
+    async def verify_and_probe(password, hashed):
+        lock_free.append(write_lock_probe())
+        return await verify_and_update(password, hashed)
+
+    monkeypatch.setattr(password_hasher, "verify_and_update", verify_and_probe)
+
+    # When
+    response = client.post(
+        "/v1/users/login",
+        data={"username": username, "password": "testpassword123"},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+
+    # Then
+    assert response.status_code == 200
+    assert lock_free == [True]
+
+
+def test_register_name_taken_while_hashing(client: TestClient, db_session, monkeypatch):
+    """Test a name registered by another request during hashing is rejected with 400."""
+    # Given
+    username = f"raceuser_{uuid.uuid4().hex[:8]}"
+    hash_password = password_hasher.hash
+
+    async def hash_after_other_registration(password):
+        db_session.add(User(username=username, password="hashed"))
+        db_session.commit()
+        return await hash_password(password)
+
+    monkeypatch.setattr(password_hasher, "hash", hash_after_other_registration)
+
+    # When
+    response = client.post(
+        "/v1/users/create", json={"username": username, "password": "testpassword123"}
+    )
+
+    # Then
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Username already registered"
@@ -0,0 +1,131 @@
+"""Local stand-in for Open Trivia DB with injectable latency and failures."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+QUESTION = {
+    "category": "Science: Computers",
+    "type": "multiple",
+    "difficulty": "easy",
+    "question": "What does CPU stand for?",
+    "correct_answer": "Central Processing Unit",
+    "incorrect_answers": [
+        "Central Process Unit", "Computer Personal Unit", "Central Processor Unit"
+    ],
+}
+
+
+class StubTriviaHandler(BaseHTTPRequestHandler):
+    """Answer api.php requests, keeping connections alive."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StubTriviaServer"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.log.append((time.monotonic(), params))
+            status = self.server.statuses.pop(0) if self.server.statuses else 200
+            if url.path.endswith("/api_count.php"):
+                data = self.server.count_answer(int(params["category"][0]))
+            elif url.path.endswith("/api_token.php"):
+                data = {"response_code": 0, "token": f"token-{self.server.requests}"}
+            else:
+                data = self.server.questions_answer(int(params.get("amount", ["1"])[0]))
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class StubTriviaServer(ThreadingHTTPServer):
+    """Serve on a free local port from a daemon thread.
+
+    delay is added to every answer; statuses lists the HTTP statuses
+    of the next answers, later ones succeed. response_codes lists the
+    API response codes of the next question answers. Questions are
+    numbered, with pool set the numbers repeat after pool questions.
+    api_count.php reports counts per difficulty for every category.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0, statuses: Optional[List[int]] = None):
+        super().__init__(("127.0.0.1", 0), StubTriviaHandler)
+        self.delay = delay
+        self.statuses = list(statuses or [])
+        self.pool: Optional[int] = None
+        self.response_codes: List[int] = []
+        self.counts = {"easy": 100, "medium": 100, "hard": 100}
+        self.requests = 0
+        self.served = 0
+        # Arrival time and query parameters of every request
+        self.log: List[Tuple[float, Dict[str, List[str]]]] = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+
+    def number(self, n: int) -> int:
+        return n % self.pool if self.pool else n
+
+    def questions_answer(self, amount: int) -> Dict[str, Any]:
+        code = self.response_codes.pop(0) if self.response_codes else 0
+        if code:
+            return {"response_code": code, "results": []}
+        first = self.served
+        self.served += amount
+        results = [
+            {**QUESTION, "question": f"{QUESTION['question']} #{self.number(n)}"}
+            for n in range(first, first + amount)
+        ]
+        return {"response_code": 0, "results": results}
+
+    def count_answer(self, category: int) -> Dict[str, Any]:
+        return {
+            "category_id": category,
+            "category_question_count": {
+                "total_question_count": sum(self.counts.values()),
+                **{
+                    f"total_{difficulty}_question_count": count
+                    for difficulty, count in self.counts.items()
+                },
+            },
+        }
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"http://{host}:{port}/api.php"
+
+    def start(self) -> "StubTriviaServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on slow answers close their connection
+        pass
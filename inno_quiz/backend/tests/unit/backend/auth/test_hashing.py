@@ -0,0 +1,86 @@
+"""Test password hashing on the process pool."""
+
+import asyncio
+import threading
+
+import pytest
+
+from backend.auth.hashing import HasherBusyError, PasswordHasher
+from backend.auth.password import MIN_ROUNDS, get_hash_rounds
+
+
+@pytest.fixture
+def hasher():
+    """Hasher with a single worker process."""
+    hasher = PasswordHasher(workers=1, queue_limit=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.anyio
+async def test_hash_and_verify(hasher):
+    """Test hashes made in the pool verify in the pool."""
+    # When
+    hashed = await hasher.hash("secret")
+
+    # Then
+    assert await hasher.verify("secret", hashed)
+    assert not await hasher.verify("wrong", hashed)
+    stats = hasher.stats()
+    assert (stats["completed"], stats["pending"], stats["rejected"]) == (3, 0, 0)
+    assert stats["max_latency_ms"] >= stats["avg_latency_ms"] > 0
+
+
+@pytest.mark.anyio
+async def test_rejects_over_queue_limit(hasher):
+    """Test jobs beyond the workers and the queue limit are rejected."""
+    # When
+    results = await asyncio.gather(
+        *(hasher.hash("secret") for _ in range(3)), return_exceptions=True
+    )
+
+    # Then
+    assert [isinstance(result, HasherBusyError) for result in results] == [False, False, True]
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["max_pending"] == 2
+
+
+@pytest.mark.anyio
+async def test_workers_use_configured_rounds(hasher):
+    """Test hashes made in the pool use the cost set on the hasher."""
+    # Given
+    old_hash = await hasher.hash("secret")
+    rounds = get_hash_rounds()
+
+    # When
+    hasher.set_rounds(MIN_ROUNDS)
+    try:
+        new_hash = await hasher.hash("secret")
+        verified, upgraded = await hasher.verify_and_update("secret", old_hash)
+    finally:
+        hasher.set_rounds(rounds)
+
+    # Then
+    assert new_hash.startswith(f"$2b${MIN_ROUNDS}$")
+    assert verified
+    assert upgraded.startswith(f"$2b${MIN_ROUNDS}$")
+
+
+@pytest.mark.anyio
+async def test_workers_are_not_forked(hasher):
+    """Test workers start from a clean process rather than a fork of this threaded one."""
+    # Given
+    blocker = threading.Event()
+    thread = threading.Thread(target=blocker.wait)
+    thread.start()
+
+    # When
+    try:
+        hashed = await hasher.hash("secret")
+    finally:
+        blocker.set()
+        thread.join()
+
+    # Then
+    assert await hasher.verify("secret", hashed)
+    assert hasher._executor._mp_context.get_start_method() in ("forkserver", "spawn")
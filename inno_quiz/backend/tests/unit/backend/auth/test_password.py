@@ -1,6 +1,15 @@
 """Test password utilities."""
 
-from inno_quiz.backend.auth.password import get_password_hash, verify_password
+from passlib.context import CryptContext
+
+from inno_quiz.backend.auth.password import (
+    MIN_ROUNDS,
+    calibrate_rounds,
+    get_hash_rounds,
+    get_password_hash,
+    verify_and_update,
+    verify_password,
+)
 
 
 def test_password_hashing():
@@ -42,3 +51,30 @@ def test_password_hash_uniqueness():
     assert hash1 != hash2  # Each hash should be different due to salt
     assert verify_password(password, hash1)
     assert verify_password(password, hash2)
+
+
+def test_verify_and_update_rehashes_other_cost():
+    """Test hashes made at another cost are replaced after a successful check."""
+    # Given
+    low_cost = CryptContext(schemes=["bcrypt"], bcrypt__rounds=MIN_ROUNDS).hash("secret")
+    current = get_password_hash("secret")
+
+    # When
+    verified, new_hash = verify_and_update("secret", low_cost)
+
+    # Then
+    assert verified
+    assert new_hash.startswith(f"$2b${get_hash_rounds()}$")
+    assert verify_and_update("secret", current) == (True, None)
+    assert verify_and_update("wrong", low_cost) == (False, None)
+
+
+def test_calibrate_rounds_stays_within_bounds():
+    """Test calibration picks more rounds for longer targets, within the bounds."""
+    # When
+    lowest = calibrate_rounds(0)
+    highest = calibrate_rounds(float("inf"), max_rounds=MIN_ROUNDS + 1)
+
+    # Then
+    assert lowest == MIN_ROUNDS
+    assert highest == MIN_ROUNDS + 1
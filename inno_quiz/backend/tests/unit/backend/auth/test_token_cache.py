@@ -0,0 +1,165 @@
+"""Unit tests for the verified token cache."""
+
+from datetime import datetime, timedelta, UTC
+from unittest.mock import MagicMock
+
+import pytest
+from jose import JWTError
+
+from backend.auth.jwt import create_access_token, decode_principal
+from backend.auth.token_cache import TokenCache
+from backend.domain.auth import Principal
+from backend.service.cache_backend import MemoryCacheBackend
+
+
+def principal(username: str = "user", expires_in: float = 60, issued_ago: float = 0) -> Principal:
+    """Principal of a token issued issued_ago seconds ago."""
+    now = datetime.now(UTC)
+    return Principal(
+        username=username,
+        expires_at=now + timedelta(seconds=expires_in),
+        issued_at=now - timedelta(seconds=issued_ago),
+    )
+
+
+def test_decode_principal():
+    """Test the principal is built from the subject and time claims."""
+    # Given
+    token = create_access_token({"sub": "testuser"}, timedelta(minutes=5))
+
+    # When
+    result = decode_principal(token)
+
+    # Then
+    assert result.username == "testuser"
+    assert result.issued_at <= datetime.now(UTC) < result.expires_at
+
+
+def test_decode_principal_without_subject():
+    """Test tokens without a subject are rejected."""
+    # Given
+    token = create_access_token({}, timedelta(minutes=5))
+
+    # When / Then
+    with pytest.raises(JWTError):
+        decode_principal(token)
+
+
+def test_get_verifies_token_once():
+    """Test the loader runs on the first lookup of a token only."""
+    # Given
+    cache = TokenCache()
+    loader = MagicMock(return_value=principal())
+
+    # When
+    first = cache.get("token", loader)
+    second = cache.get("token", loader)
+
+    # Then
+    loader.assert_called_once()
+    assert first is second
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_entries_expire_with_token():
+    """Test a token is verified again once its exp has passed."""
+    # Given
+    cache = TokenCache()
+    cache.get("token", lambda: principal(expires_in=0))
+    loader = MagicMock(return_value=principal())
+
+    # When
+    cache.get("token", loader)
+
+    # Then
+    loader.assert_called_once()
+
+
+def test_invalid_tokens_are_not_cached():
+    """Test verification errors propagate and leave nothing cached."""
+    # Given
+    cache = TokenCache()
+
+    # When
+    with pytest.raises(JWTError):
+        cache.get("token", MagicMock(side_effect=JWTError("bad")))
+
+    # Then
+    assert cache.stats()["size"] == 0
+
+
+def test_revoke_user_rejects_earlier_tokens():
+    """Test revoking a user drops its tokens but accepts tokens issued later."""
+    # Given
+    cache = TokenCache()
+    cache.get("old", lambda: principal("deleted", issued_ago=10))
+    cache.get("other", lambda: principal("other", issued_ago=10))
+
+    # When
+    cache.revoke_user("deleted")
+
+    # Then
+    assert cache.get("old", lambda: principal("deleted", issued_ago=10)) is None
+    assert cache.get("new", lambda: principal("deleted", issued_ago=-2)) is not None
+    loader = MagicMock()
+    cache.get("other", loader)
+    loader.assert_not_called()
+
+
+def test_revocations_reach_other_workers():
+    """Test a revocation drops the tokens cached by other workers sharing the backend."""
+    # Given
+    backend = MemoryCacheBackend()
+    first, second = TokenCache(shared=backend), TokenCache(shared=backend)
+    second.get("old", lambda: principal("deleted", issued_ago=10))
+
+    # When
+    first.revoke_user("deleted")
+
+    # Then
+    assert second.stats()["size"] == 0
+    assert second.get("old", lambda: principal("deleted", issued_ago=10)) is None
+
+
+def test_stored_revocations_apply_to_workers_that_missed_them():
+    """Test a worker that was not subscribed still rejects tokens revoked before."""
+    # Given
+    backend = MemoryCacheBackend()
+    TokenCache(shared=backend).revoke_user("deleted")
+    late = TokenCache(shared=backend)
+
+    # When
+    result = late.get("old", lambda: principal("deleted", issued_ago=10))
+
+    # Then
+    assert result is None
+
+
+@pytest.mark.anyio
+async def test_get_async_reads_stored_revocations():
+    """Test the async lookup checks the shared revocations of a new token."""
+    # Given
+    backend = MemoryCacheBackend()
+    TokenCache(shared=backend).revoke_user("deleted")
+    cache = TokenCache(shared=backend)
+
+    # When
+    old = await cache.get_async("old", lambda: principal("deleted", issued_ago=10))
+    new = await cache.get_async("new", lambda: principal("deleted", issued_ago=-2))
+
+    # Then
+    assert old is None
+    assert new is not None
+
+
+def test_evicts_over_entry_limit():
+    """Test the cache holds at most max_entries tokens."""
+    # Given
+    cache = TokenCache(max_entries=2)
+
+    # When
+    for token in "abc":
+        cache.get(token, principal)
+
+    # Then
+    assert cache.stats()["size"] == 2
@@ -0,0 +1,117 @@
+"""Test the Redis protocol client against a local fake server."""
+import threading
+
+import pytest
+
+from backend.gateways.redis import RedisClient, RedisError
+from backend.tests.fake_redis import FakeRedisServer
+
+
+@pytest.fixture
+def redis_client(fake_redis):
+    """Client connected to the fake server."""
+    client = RedisClient(fake_redis.url)
+    yield client
+    client.close()
+
+
+def test_execute_commands(redis_client):
+    """Test replies of the supported reply types are decoded."""
+    # When
+    status = redis_client.execute("SET", "key", b"value")
+    values = redis_client.execute("MGET", "key", "missing")
+    counter = redis_client.execute("INCR", "counter")
+
+    # Then
+    assert status == "OK"
+    assert values == [b"value", None]
+    assert counter == 1
+
+
+def test_connections_are_reused(fake_redis, redis_client):
+    """Test sequential commands run on one pooled connection."""
+    # When
+    for _ in range(3):
+        redis_client.execute("PING")
+
+    # Then
+    assert redis_client._idle.qsize() == 1
+
+
+def test_error_reply_raises(redis_client):
+    """Test error replies raise RedisError and keep the connection usable."""
+    # When
+    with pytest.raises(RedisError, match="unknown command"):
+        redis_client.execute("FLUSHALL")
+
+    # Then
+    assert redis_client.execute("PING") == "PONG"
+
+
+def test_auth_with_password_from_url():
+    """Test the password of the URL is sent before the first command."""
+    # Given
+    server = FakeRedisServer(password=b"secret").start()
+    host, port = server.server_address
+    client = RedisClient(f"redis://:secret@{host}:{port}/1")
+
+    try:
+        # When
+        reply = client.execute("PING")
+    finally:
+        client.close()
+        server.stop()
+
+    # Then
+    assert reply == "PONG"
+    assert server.commands[:2] == ["AUTH", "SELECT"]
+
+
+def test_rejected_auth_is_not_pooled():
+    """Test a connection refused while authenticating is not put back in the pool."""
+    # Given
+    server = FakeRedisServer(password=b"secret").start()
+    host, port = server.server_address
+    client = RedisClient(f"redis://:wrong@{host}:{port}")
+
+    try:
+        # When
+        with pytest.raises(RedisError, match="WRONGPASS"):
+            client.execute("PING")
+    finally:
+        # Then
+        client.close()
+        server.stop()
+    assert client._idle.qsize() == 0
+
+
+def test_unreachable_server_raises(fake_redis):
+    """Test connection failures are raised as RedisError."""
+    # Given
+    client = RedisClient(fake_redis.url)
+    fake_redis.stop()
+
+    # When / Then
+    with pytest.raises(RedisError, match="connection error"):
+        client.execute("PING")
+
+
+def test_subscribe_receives_messages(redis_client):
+    """Test published messages reach the subscription callback."""
+    # Given
+    received = []
+    delivered = threading.Event()
+
+    def on_message(message):
+        received.append(message)
+        delivered.set()
+
+    redis_client.subscribe("events", on_message)
+
+    # When
+    receivers = redis_client.execute("PUBLISH", "events", b"hello")
+
+    # Then
+    assert delivered.wait(1)
+    assert receivers == 1
+    assert received == [b"hello"]
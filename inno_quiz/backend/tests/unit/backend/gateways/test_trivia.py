@@ -1,10 +1,12 @@
 """Test trivia gateway functionality."""
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
 
-from backend.gateways.trivia import TriviaGateway, TriviaQuestion
+from backend.gateways.trivia import CircuitBreaker, CircuitOpenError, TriviaGateway, TriviaQuestion
+from backend.gateways.trivia.resilience import backoff_delays
 
 
 @pytest.fixture
@@ -72,7 +74,7 @@ def test_get_questions_success(mock_response_success):
     trivia_gateway = TriviaGateway()
 
     # When
-    with patch("requests.get", return_value=mock_response_success):
+    with patch("requests.Session.get", return_value=mock_response_success):
         questions = trivia_gateway.get_questions(amount=2)
 
     # Then
@@ -93,7 +95,7 @@ def test_get_questions_with_parameters(mock_response_success):
     trivia_gateway = TriviaGateway()
 
     # When
-    with patch("requests.get", return_value=mock_response_success) as mock_get:
+    with patch("requests.Session.get", return_value=mock_response_success) as mock_get:
         trivia_gateway.get_questions(
             amount=5,
             category=9,
@@ -119,7 +121,7 @@ def test_get_questions_api_error(mock_response_error):
     trivia_gateway = TriviaGateway()
 
     # When/Then
-    with patch("requests.get", return_value=mock_response_error):
+    with patch("requests.Session.get", return_value=mock_response_error):
         with pytest.raises(ValueError) as excinfo:
             trivia_gateway.get_questions()
 
@@ -132,7 +134,7 @@ def test_get_questions_http_error(mock_response_http_error):
     trivia_gateway = TriviaGateway()
 
     # When/Then
-    with patch("requests.get", return_value=mock_response_http_error):
+    with patch("requests.Session.get", return_value=mock_response_http_error):
         with pytest.raises(ValueError) as excinfo:
             trivia_gateway.get_questions()
 
@@ -145,8 +147,107 @@ def test_get_questions_connection_error():
     trivia_gateway = TriviaGateway()
 
     # When/Then
-    with patch("requests.get", side_effect=requests.RequestException("Connection error")):
+    with patch("requests.Session.get", side_effect=requests.RequestException("Connection error")):
         with pytest.raises(ConnectionError) as excinfo:
             trivia_gateway.get_questions()
 
     assert "Error connecting to Trivia API" in str(excinfo.value)
+
+
+def stub_gateway(trivia_stub, **kwargs) -> TriviaGateway:
+    """Gateway pointed at the stub server with fast retries."""
+    options = {"backoff": 0.001, "read_timeout": 1.0}
+    options.update(kwargs)
+    return TriviaGateway(base_url=trivia_stub.url, **options)
+
+
+def test_connections_are_reused(trivia_stub):
+    """Test consecutive requests share one keep-alive connection."""
+    # Given
+    gateway = stub_gateway(trivia_stub)
+
+    # When
+    for _ in range(3):
+        gateway.get_questions(amount=1)
+
+    # Then
+    assert trivia_stub.requests == 3
+    assert trivia_stub.connections == 1
+
+
+def test_retries_transient_errors(trivia_stub):
+    """Test overload answers are retried until the upstream recovers."""
+    # Given
+    trivia_stub.statuses = [503, 429]
+    gateway = stub_gateway(trivia_stub, retries=2)
+
+    # When
+    questions = gateway.get_questions(amount=2)
+
+    # Then
+    assert len(questions) == 2
+    assert trivia_stub.requests == 3
+    assert gateway.breaker.failures == 0
+
+
+def test_slow_upstream_times_out(trivia_stub):
+    """Test a hanging upstream fails after the read timeout instead of blocking."""
+    # Given
+    trivia_stub.delay = 1.0
+    gateway = stub_gateway(trivia_stub, read_timeout=0.1, retries=1)
+
+    # When
+    started = time.perf_counter()
+    with pytest.raises(ConnectionError, match="Error connecting to Trivia API"):
+        gateway.get_questions()
+
+    # Then
+    assert time.perf_counter() - started < 0.5
+    assert trivia_stub.requests == 2
+
+
+def test_circuit_breaker_fails_fast(trivia_stub):
+    """Test an open breaker rejects calls without contacting the upstream."""
+    # Given
+    trivia_stub.statuses = [500, 500]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    gateway = stub_gateway(trivia_stub, retries=1, breaker=breaker)
+    with pytest.raises(ValueError, match="HTTP error"):
+        gateway.get_questions()
+
+    # When
+    with pytest.raises(CircuitOpenError):
+        gateway.get_questions()
+
+    # Then
+    assert breaker.state == CircuitBreaker.OPEN
+    assert trivia_stub.requests == 2
+
+
+def test_circuit_breaker_closes_after_successful_trial(trivia_stub):
+    """Test a successful call after the reset timeout closes the breaker."""
+    # Given
+    trivia_stub.statuses = [500]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    gateway = stub_gateway(trivia_stub, retries=0, breaker=breaker)
+    with pytest.raises(ValueError):
+        gateway.get_questions()
+    time.sleep(0.05)
+
+    # When
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    questions = gateway.get_questions(amount=1)
+
+    # Then
+    assert len(questions) == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_backoff_delays_are_jittered_and_capped():
+    """Test retry delays stay below the exponential bound and its cap."""
+    # When
+    delays = list(backoff_delays(5, base=0.1, cap=0.5))
+
+    # Then
+    assert len(delays) == 5
+    assert all(0 <= delay <= min(0.5, 0.1 * 2 ** i) for i, delay in enumerate(delays))
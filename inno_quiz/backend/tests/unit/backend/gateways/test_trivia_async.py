@@ -0,0 +1,144 @@
+"""Test the async trivia gateway against the stub server."""
+import asyncio
+import time
+
+import pytest
+
+from backend.gateways.trivia import (
+    AsyncTriviaGateway,
+    CircuitBreaker,
+    RateLimitedError,
+    RateLimiter,
+)
+
+
+def stub_gateway(trivia_stub, **kwargs) -> AsyncTriviaGateway:
+    """Async gateway pointed at the stub server with fast retries."""
+    options = {"backoff": 0.001, "read_timeout": 1.0}
+    options.update(kwargs)
+    return AsyncTriviaGateway(base_url=trivia_stub.url, **options)
+
+
+@pytest.mark.anyio
+async def test_get_questions(trivia_stub):
+    """Test questions are fetched with the request parameters."""
+    # Given
+    gateway = stub_gateway(trivia_stub)
+
+    # When
+    try:
+        questions = await gateway.get_questions(amount=3, category=9, difficulty="easy")
+    finally:
+        await gateway.aclose()
+
+    # Then
+    assert len(questions) == 3
+    assert trivia_stub.log[0][1] == {"amount": ["3"], "category": ["9"], "difficulty": ["easy"]}
+
+
+@pytest.mark.anyio
+async def test_get_many_fetches_concurrently_within_rate_limit(trivia_stub):
+    """Test combinations overlap while their starts stay one interval apart."""
+    # Given
+    trivia_stub.delay = 0.3
+    gateway = stub_gateway(trivia_stub, rate_limiter=RateLimiter(0.1))
+
+    # When
+    started = time.monotonic()
+    try:
+        questions = await gateway.get_many(2, categories=[9, 18], difficulties=["easy", "hard"])
+    finally:
+        await gateway.aclose()
+    elapsed = time.monotonic() - started
+
+    # Then
+    assert len(questions) == 8
+    # The fourth request may not start before three intervals passed
+    assert max(arrival for arrival, _ in trivia_stub.log) - started >= 0.3
+    # Sequential fetches would take 4 * 0.3 s
+    assert elapsed < 0.9
+    requested = {(p["category"][0], p["difficulty"][0]) for _, p in trivia_stub.log}
+    assert requested == {("9", "easy"), ("9", "hard"), ("18", "easy"), ("18", "hard")}
+
+
+@pytest.mark.anyio
+async def test_get_many_raises_first_failure(trivia_stub):
+    """Test a failing fetch fails the batch with its own error."""
+    # Given
+    trivia_stub.statuses = [404]
+    gateway = stub_gateway(trivia_stub, retries=0, rate_limiter=RateLimiter(0.05))
+
+    # When / Then
+    try:
+        with pytest.raises(ValueError, match="HTTP error from Trivia API"):
+            await gateway.get_many(1, categories=[9, 18, 27])
+    finally:
+        await gateway.aclose()
+
+
+@pytest.mark.anyio
+async def test_open_breaker_fails_fast(trivia_stub):
+    """Test an open breaker rejects calls without waiting for the rate limiter."""
+    # Given
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    gateway = stub_gateway(trivia_stub, breaker=breaker, rate_limiter=RateLimiter(60))
+
+    # When
+    started = time.monotonic()
+    with pytest.raises(ConnectionError):
+        await asyncio.wait_for(gateway.get_questions(), timeout=1)
+
+    # Then
+    assert time.monotonic() - started < 0.5
+    assert trivia_stub.requests == 0
+
+
+def test_rate_limiter_spaces_calls():
+    """Test reserved slots are one interval apart, also across threads and loops."""
+    # Given
+    limiter = RateLimiter(0.05)
+
+    # When
+    started = time.monotonic()
+    limiter.wait()
+    limiter.wait()
+    asyncio.run(limiter.wait_async())
+
+    # Then
+    assert time.monotonic() - started >= 0.1
+
+
+@pytest.mark.anyio
+async def test_get_category_count_is_cached(trivia_stub):
+    """Test category counts are read from api_count.php once."""
+    # Given
+    trivia_stub.counts = {"easy": 10, "medium": 20, "hard": 5}
+    gateway = stub_gateway(trivia_stub)
+
+    # When
+    try:
+        first = await gateway.get_category_count(9)
+        second = await gateway.get_category_count(9)
+    finally:
+        await gateway.aclose()
+
+    # Then
+    assert first == second
+    assert (first.total, first.available("medium")) == (35, 20)
+    assert trivia_stub.requests == 1
+
+
+@pytest.mark.anyio
+async def test_response_code_5_is_rate_limited(trivia_stub):
+    """Test the API throttling us is a connection error, not a bad request."""
+    # Given
+    trivia_stub.response_codes = [5]
+    gateway = stub_gateway(trivia_stub)
+
+    # When / Then
+    try:
+        with pytest.raises(RateLimitedError):
+            await gateway.get_questions(amount=1)
+    finally:
+        await gateway.aclose()
@@ -0,0 +1,37 @@
+"""Test async variants of the repositories."""
+
+import pytest
+
+from backend import repo
+from backend.db import get_async_url
+from backend.models.user import User
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite:///./inno_quiz.db", "sqlite+aiosqlite:///./inno_quiz.db"),
+        ("postgresql://u:p@db/quiz", "postgresql+asyncpg://u:***@db/quiz"),
+        ("postgresql+psycopg2://u:p@db/quiz", "postgresql+asyncpg://u:***@db/quiz"),
+    ],
+)
+def test_get_async_url(url, expected):
+    """Test sync URLs switch to the asyncio driver of their backend."""
+    assert str(get_async_url(url)) == expected
+
+
+@pytest.mark.anyio
+async def test_async_repo_runs_sync_query(db_session, async_session_factory):
+    """Test a sync repo method is awaitable on an AsyncSession."""
+    # Given
+    db_session.add(User(username="aio_repo_user", password="hashed"))
+    db_session.commit()
+
+    # When
+    async with async_session_factory() as db:
+        found = await repo.aio.user.get_by_username(db, "aio_repo_user")
+        missing = await repo.aio.user.get_by_username(db, "aio_missing_user")
+
+    # Then
+    assert found.username == "aio_repo_user"
+    assert missing is None
@@ -0,0 +1,67 @@
+"""Test question bank repository functions."""
+
+from uuid import uuid4
+
+import pytest
+
+from backend.gateways.trivia import TriviaQuestion
+from backend.models.bank_question import BankQuestion
+from backend.models.question import Question
+from backend.repo.bank_question import bank_question as bank_repo
+
+
+def trivia_question(text: str, difficulty: str = "easy") -> TriviaQuestion:
+    """Build a true/false trivia question."""
+    return TriviaQuestion(
+        category="General Knowledge",
+        type="boolean",
+        difficulty=difficulty,
+        question=text,
+        correct_answer="True",
+        incorrect_answers=["False"],
+    )
+
+
+@pytest.fixture(autouse=True)
+def empty_bank(db_session):
+    """Start every test with an empty bank."""
+    db_session.query(BankQuestion).delete()
+    db_session.commit()
+
+
+def test_add_many_skips_banked_questions(db_session):
+    """Test questions already in the bank or repeated in the batch are stored once."""
+    # Given
+    bank_repo.add_many(db_session, 9, [trivia_question("A?"), trivia_question("B?")])
+
+    # When
+    added = bank_repo.add_many(
+        db_session, 9, [trivia_question("B?"), trivia_question("C?"), trivia_question("C?")]
+    )
+
+    # Then
+    assert added == 1
+    assert bank_repo.count_by_category(db_session) == {9: 3}
+
+
+def test_sample_filters_and_leaves_out_questions_of_the_quiz(db_session):
+    """Test only unused questions of the category and difficulty are picked."""
+    # Given
+    bank_repo.add_many(
+        db_session,
+        9,
+        [trivia_question("A?"), trivia_question("B?"), trivia_question("Hard?", "hard")],
+    )
+    bank_repo.add_many(db_session, 18, [trivia_question("Other category?")])
+    quiz_id = uuid4()
+    db_session.add(Question(quiz_id=quiz_id, text="A?"))
+    db_session.flush()
+
+    # When
+    sampled = bank_repo.sample(
+        db_session, amount=10, category_id=9, difficulty="easy", exclude_quiz_id=quiz_id
+    )
+
+    # Then
+    assert [q.question for q in sampled] == ["B?"]
+    assert sampled[0].incorrect_answers == ["False"]
@@ -0,0 +1,161 @@
+"""Test question repository functions."""
+
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy import event
+
+from backend.domain.question_request import QuestionRequest
+from backend.models.quiz import Quiz
+from backend.models.user import User
+from backend.repo.question import question as question_repo
+
+
+@contextmanager
+def count_statements(engine):
+    """Count SQL statements executed on the engine inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def create_quiz_with_questions(db_session, question_count: int) -> Quiz:
+    """Create a quiz with the given number of four-option questions."""
+    author = db_session.get(User, "question_repo_author")
+    if author is None:
+        author = User(username="question_repo_author", password="hashed")
+        db_session.add(author)
+    quiz = Quiz(id=uuid4(), name="Repo Quiz", category="9", author=author)
+    db_session.add(quiz)
+    db_session.commit()
+
+    for i in range(question_count):
+        question_repo.create_with_options(
+            db_session,
+            quiz_id=quiz.id,
+            text=f"Question {i}?",
+            options=["A", "B", "C", "D"],
+            correct_options=[i % 4],
+        )
+    db_session.expire_all()
+    return quiz
+
+
+def test_get_with_options_by_quiz_id(db_session):
+    """Test questions come back with their options in insertion order."""
+    # Given
+    quiz = create_quiz_with_questions(db_session, 3)
+
+    # When
+    questions = question_repo.get_with_options_by_quiz_id(db_session, quiz.id)
+
+    # Then
+    assert [q.text for q in questions] == ["Question 0?", "Question 1?", "Question 2?"]
+    for i, q in enumerate(questions):
+        assert [opt.text for opt in q.answer_options] == ["A", "B", "C", "D"]
+        assert [opt.is_correct for opt in q.answer_options].index(True) == i % 4
+
+
+def test_get_with_options_by_quiz_id_statement_count(db_session, db_engine):
+    """Test the statement count does not grow with the number of questions."""
+    # Given
+    small_quiz_id = create_quiz_with_questions(db_session, 1).id
+    large_quiz_id = create_quiz_with_questions(db_session, 20).id
+    db_session.expire_all()
+
+    # When
+    with count_statements(db_engine) as small_statements:
+        small = question_repo.get_with_options_by_quiz_id(db_session, small_quiz_id)
+        [opt.text for q in small for opt in q.answer_options]
+    db_session.expire_all()
+    with count_statements(db_engine) as large_statements:
+        large = question_repo.get_with_options_by_quiz_id(db_session, large_quiz_id)
+        [opt.text for q in large for opt in q.answer_options]
+
+    # Then
+    assert len(large) == 20
+    assert len(small_statements) == len(large_statements) <= 2
+
+
+def test_get_with_options_by_ids_empty(db_session):
+    """Test no query is made for an empty id list."""
+    # When
+    result = question_repo.get_with_options_by_ids(db_session, [])
+
+    # Then
+    assert result == []
+
+
+def test_get_answer_key(db_session, db_engine):
+    """Test the answer key holds correct option indices for every question."""
+    # Given
+    quiz = create_quiz_with_questions(db_session, 5)
+    quiz_id = quiz.id
+
+    # When
+    with count_statements(db_engine) as statements:
+        answer_key = question_repo.get_answer_key(db_session, quiz_id)
+
+    # Then
+    assert len(statements) == 1
+    assert list(answer_key.values()) == [[0], [1], [2], [3], [0]]
+
+
+def test_bulk_create_with_options(db_session, db_engine):
+    """Test bulk creation stores every question and option in constant statements."""
+    # Given
+    quiz_id = create_quiz_with_questions(db_session, 0).id
+    few = [
+        QuestionRequest(text=f"Few {i}?", options=["A", "B"], correct_options=[1])
+        for i in range(2)
+    ]
+    many = [
+        QuestionRequest(text=f"Many {i}?", options=["A", "B", "C"], correct_options=[i % 3])
+        for i in range(30)
+    ]
+
+    # When
+    with count_statements(db_engine) as few_statements:
+        few_ids = question_repo.bulk_create_with_options(db_session, quiz_id, few)
+    with count_statements(db_engine) as many_statements:
+        many_ids = question_repo.bulk_create_with_options(db_session, quiz_id, many)
+
+    # Then
+    assert len(few_statements) == len(many_statements)
+    questions = question_repo.get_with_options_by_quiz_id(db_session, quiz_id)
+    assert [q.id for q in questions] == few_ids + many_ids
+    assert [q.text for q in questions] == [q.text for q in few + many]
+    for stored, requested in zip(questions, few + many):
+        assert [opt.text for opt in stored.answer_options] == requested.options
+        correct = [i for i, opt in enumerate(stored.answer_options) if opt.is_correct]
+        assert correct == requested.correct_options
+
+
+def test_bulk_create_keeps_parameter_order_off_sqlite():
+    """Test ids are returned in the order of the questions on other databases."""
+    # Given
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    db.scalars.return_value.all.return_value = [12, 10, 11]
+    questions = [
+        QuestionRequest(text=f"Q{i}?", options=["A"], correct_options=[0]) for i in range(3)
+    ]
+
+    # When
+    with patch("backend.repo.question.quiz_repo"):
+        ids = question_repo.bulk_create_with_options(db, uuid4(), questions)
+
+    # Then
+    statement = db.scalars.call_args.args[0]
+    assert statement._sort_by_parameter_order
+    assert ids == [12, 10, 11]
+    option_rows = db.execute.call_args.args[1]
+    assert [row["question_id"] for row in option_rows] == [12, 10, 11]
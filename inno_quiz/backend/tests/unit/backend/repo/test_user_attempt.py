@@ -0,0 +1,180 @@
+"""Test user attempt repository functions."""
+
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+
+from backend.models.quiz import Quiz
+from backend.models.user_answer import UserAnswer
+from backend.models.user_attempt import UserAttempt
+from backend.models.user import User
+from backend.repo.user_attempt import user_attempt as user_attempt_repo
+
+
+def create_quiz(db_session) -> Quiz:
+    """Create an empty quiz owned by a test user."""
+    author = db_session.get(User, "attempt_repo_author")
+    if author is None:
+        author = User(username="attempt_repo_author", password="hashed")
+        db_session.add(author)
+    quiz = Quiz(id=uuid4(), name="Attempt Quiz", category="9", author=author)
+    db_session.add(quiz)
+    db_session.commit()
+    return quiz
+
+
+def test_get_rank_matches_sorted_leaderboard(db_session):
+    """Test the counted rank equals the position in the sorted attempt list."""
+    # Given
+    quiz = create_quiz(db_session)
+    other_quiz = create_quiz(db_session)
+    results = [(3, 20.0), (5, 30.0), (3, 10.0), (5, 30.0), (1, 5.0), (3, 20.0)]
+    attempts = [
+        user_attempt_repo.create(
+            db_session,
+            username="attempt_repo_author",
+            quiz_id=quiz.id,
+            score=score,
+            completion_time=completion_time,
+        )
+        for score, completion_time in results
+    ]
+    user_attempt_repo.create(
+        db_session,
+        username="attempt_repo_author",
+        quiz_id=other_quiz.id,
+        score=10,
+        completion_time=1.0,
+    )
+
+    # When
+    ranks = {a.id: user_attempt_repo.get_rank(db_session, a) for a in attempts}
+
+    # Then
+    expected = sorted(attempts, key=lambda a: (-a.score, a.completion_time, a.id))
+    assert [ranks[a.id] for a in expected] == list(range(1, len(attempts) + 1))
+
+
+def test_leaderboard_page_is_read_in_index_order(db_session, db_engine):
+    """Test leaderboard pages are walked from the index without sorting."""
+    # Given
+    quiz = create_quiz(db_session)
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db_engine, "before_cursor_execute", on_execute)
+    try:
+        user_attempt_repo.get_leaderboard_page(
+            db_session, quiz.id, limit=10, after=(3, 20.0, 1)
+        )
+    finally:
+        event.remove(db_engine, "before_cursor_execute", on_execute)
+
+    # When
+    statement, parameters = statements[-1]
+    plan = db_session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement}", parameters
+    ).all()
+
+    # Then
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_user_attempts_leaderboard" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_create_with_answers(db_session, db_engine):
+    """Test an attempt and all its answers are stored with one commit."""
+    # Given
+    quiz = create_quiz(db_session)
+    commits = []
+
+    def on_commit(conn):
+        commits.append(conn)
+
+    event.listen(db_engine, "commit", on_commit)
+
+    # When
+    try:
+        attempt = user_attempt_repo.create_with_answers(
+            db_session,
+            username="attempt_repo_author",
+            quiz_id=quiz.id,
+            score=1,
+            completion_time=4.0,
+            answers=[(1, [0]), (2, [1, 2])],
+        )
+    finally:
+        event.remove(db_engine, "commit", on_commit)
+
+    # Then
+    assert len(commits) == 1
+    answers = db_session.scalars(
+        select(UserAnswer).where(UserAnswer.attempt_id == attempt.id)
+    ).all()
+    assert {a.question_id: a.get_selected_options() for a in answers} == {
+        "1": [0],
+        "2": [1, 2],
+    }
+
+
+def test_create_with_answers_is_atomic(db_session):
+    """Test a failing answer insert leaves no partial attempt behind."""
+    # Given
+    quiz = create_quiz(db_session)
+    quiz_id = quiz.id
+
+    # When
+    with pytest.raises(IntegrityError):
+        user_attempt_repo.create_with_answers(
+            db_session,
+            username="attempt_repo_author",
+            quiz_id=quiz_id,
+            score=0,
+            completion_time=4.0,
+            answers=[(1, [0]), (1, [1])],  # Duplicate primary key
+        )
+
+    # Then
+    assert user_attempt_repo.count_by_quiz_id(db_session, quiz_id) == 0
+
+
+def test_export_query_filters_by_start_time(db_session):
+    """Test exported rows hold one row per answer of the attempts started in range."""
+    # Given
+    quiz = create_quiz(db_session)
+    attempts = [
+        UserAttempt(
+            username="attempt_repo_author",
+            quiz_id=quiz.id,
+            score=1,
+            completion_time=1.0,
+            started_at=datetime(2026, 1, day),
+        )
+        for day in (1, 2, 3)
+    ]
+    db_session.add_all(attempts)
+    db_session.flush()
+    db_session.add_all(
+        UserAnswer(attempt_id=attempts[1].id, question_id=question_id, selected_options="[0]")
+        for question_id in ("2", "1")
+    )
+    db_session.commit()
+
+    # When
+    rows = db_session.execute(
+        user_attempt_repo.export_query(
+            quiz.id, since=datetime(2026, 1, 2), until=datetime(2026, 1, 3)
+        )
+    ).all()
+    everything = db_session.execute(user_attempt_repo.export_query(quiz.id)).all()
+
+    # Then
+    assert [(row[0], row[5]) for row in rows] == [(attempts[1].id, "1"), (attempts[1].id, "2")]
+    assert [row[0] for row in everything] == [
+        attempts[0].id, attempts[1].id, attempts[1].id, attempts[2].id
+    ]
@@ -0,0 +1,114 @@
+"""Unit tests for the compiled answer key cache."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.service.answer_key import AnswerKeyCache, compile_answer_key
+
+
+def test_compile_answer_key():
+    """Test raw answer keys compile into frozensets per question."""
+    # When
+    answer_key = compile_answer_key({1: [0], 2: [1, 3], 3: []})
+
+    # Then
+    assert answer_key == {1: frozenset({0}), 2: frozenset({1, 3}), 3: frozenset()}
+
+
+def test_get_counts_hits_and_misses():
+    """Test the loader runs only on the first lookup of a quiz."""
+    # Given
+    cache = AnswerKeyCache()
+    loader = MagicMock(return_value={1: [0]})
+
+    # When
+    first = cache.get("quiz", 1, loader)
+    second = cache.get("quiz", 1, loader)
+
+    # Then
+    loader.assert_called_once()
+    assert first is second
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_invalidate_forces_reload():
+    """Test an invalidated quiz is loaded again."""
+    # Given
+    cache = AnswerKeyCache()
+    cache.get("quiz", 1, lambda: {1: [0]})
+
+    # When
+    cache.invalidate("quiz")
+    answer_key = cache.get("quiz", 1, lambda: {1: [0], 2: [1]})
+
+    # Then
+    assert set(answer_key) == {1, 2}
+    assert cache.stats()["misses"] == 2
+
+
+def test_invalidate_during_load_is_not_cached():
+    """Test a key loaded while the quiz changed is not stored."""
+    # Given
+    cache = AnswerKeyCache()
+
+    def stale_loader():
+        cache.invalidate("quiz")
+        return {1: [0]}
+
+    # When
+    cache.get("quiz", 1, stale_loader)
+
+    # Then
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction():
+    """Test the least recently used quiz is evicted over the limit."""
+    # Given
+    cache = AnswerKeyCache(max_entries=2)
+    cache.get("a", 1, lambda: {})
+    cache.get("b", 1, lambda: {})
+    cache.get("a", 1, lambda: {})
+
+    # When
+    cache.get("c", 1, lambda: {})
+
+    # Then
+    loader = MagicMock(return_value={})
+    cache.get("a", 1, loader)
+    loader.assert_not_called()
+    cache.get("b", 1, loader)
+    loader.assert_called_once()
+
+
+def test_newer_content_version_forces_reload():
+    """Test a key cached for an older content version is not served."""
+    # Given
+    cache = AnswerKeyCache()
+    cache.get("quiz", 1, lambda: {1: [0]})
+
+    # When
+    answer_key = cache.get("quiz", 2, lambda: {1: [0], 2: [1]})
+    again = cache.get("quiz", 2, MagicMock())
+
+    # Then
+    assert set(answer_key) == {1, 2}
+    assert again is answer_key
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+
+@pytest.mark.anyio
+async def test_get_async_awaits_loader_once():
+    """Test the async variant awaits its loader on a miss only."""
+    # Given
+    cache = AnswerKeyCache()
+    loader = AsyncMock(return_value={1: [0]})
+
+    # When
+    first = await cache.get_async("quiz", 1, loader)
+    second = await cache.get_async("quiz", 1, loader)
+
+    # Then
+    loader.assert_awaited_once()
+    assert first is second
@@ -0,0 +1,225 @@
+"""Unit tests for the shared cache backends and two-level response caching."""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from pydantic import BaseModel
+
+from backend.gateways.circuit_breaker import CircuitBreaker
+from backend.gateways.redis import RedisClient, RedisError
+from backend.service.cache_backend import (
+    CacheBackendError, MemoryCacheBackend, RedisCacheBackend
+)
+from backend.service import response_cache as response_cache_module
+from backend.service.response_cache import ResponseCache
+
+
+class Page(BaseModel):
+    """Small response model."""
+
+    text: str
+
+
+def wait_until(predicate, timeout: float = 2.0) -> bool:
+    """Poll until predicate holds, invalidations over Redis arrive asynchronously."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backends(request):
+    """Factory of backends sharing one store, one per simulated worker."""
+    if request.param == "memory":
+        backend = MemoryCacheBackend()
+        yield lambda: backend
+        return
+
+    server = request.getfixturevalue("fake_redis")
+    created = []
+
+    def create():
+        created.append(RedisCacheBackend(RedisClient(server.url), prefix="test:"))
+        return created[-1]
+
+    yield create
+    for backend in created:
+        backend.close()
+
+
+def test_backend_operations(backends):
+    """Test values expire, counters increment and messages are delivered."""
+    # Given
+    backend = backends()
+    received = []
+    backend.subscribe("channel", received.append)
+
+    # When
+    backend.set("kept", b"value", ttl=60)
+    backend.set("expired", b"value", ttl=0.001)
+    time.sleep(0.01)
+    counters = [backend.incr("counter"), backend.incr("counter")]
+    backend.publish("channel", b"message")
+
+    # Then
+    assert backend.get_many(["kept", "expired", "missing"]) == [b"value", None, None]
+    assert counters == [1, 2]
+    assert wait_until(lambda: received == [b"message"])
+
+
+def test_memory_backend_evicts_least_recently_used():
+    """Test the memory backend holds at most max_entries values."""
+    # Given
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", b"a", ttl=60)
+    backend.set("b", b"b", ttl=60)
+    backend.get_many(["a"])
+
+    # When
+    backend.set("c", b"c", ttl=60)
+
+    # Then
+    assert backend.get_many(["a", "b", "c"]) == [b"a", None, b"c"]
+
+
+def test_second_worker_reads_shared_response(backends):
+    """Test a response loaded by one worker is served to another from the shared level."""
+    # Given
+    first, second = ResponseCache(shared=backends()), ResponseCache(shared=backends())
+    first.get(("quiz", "info", 1), lambda: Page(text="a"), ttl=60, model=Page)
+    loader = MagicMock(return_value=Page(text="b"))
+
+    # When
+    page = second.get(("quiz", "info", 1), loader, ttl=60, model=Page)
+    second.get(("quiz", "info", 1), loader, ttl=60, model=Page)
+
+    # Then
+    loader.assert_not_called()
+    assert page == Page(text="a")
+    assert second.stats()["shared_hits"] == 1
+    assert second.stats()["hits"] == 1
+
+
+def test_responses_without_model_stay_local(backends):
+    """Test responses are only shared when they can be read back."""
+    # Given
+    first, second = ResponseCache(shared=backends()), ResponseCache(shared=backends())
+    first.get(("quiz", "info"), lambda: Page(text="a"), ttl=60)
+    loader = MagicMock(return_value=Page(text="b"))
+
+    # When
+    second.get(("quiz", "info"), loader, ttl=60)
+
+    # Then
+    loader.assert_called_once()
+
+
+def test_invalidation_reaches_other_workers(backends):
+    """Test invalidating on one worker drops the responses of the others."""
+    # Given
+    first, second = ResponseCache(shared=backends()), ResponseCache(shared=backends())
+    for cache in (first, second):
+        cache.get(("quiz", "leaderboard", 10), lambda: Page(text="old"), ttl=60, model=Page)
+        cache.get(("quiz", "questions", 1), lambda: Page(text="q"), ttl=60, model=Page)
+
+    # When
+    first.invalidate("quiz", "leaderboard")
+
+    # Then
+    assert wait_until(lambda: second.stats()["size"] == 1)
+    page = second.get(("quiz", "leaderboard", 10), lambda: Page(text="new"), ttl=60, model=Page)
+    assert page == Page(text="new")
+    loader = MagicMock(return_value=Page(text="x"))
+    second.get(("quiz", "questions", 1), loader, ttl=60, model=Page)
+    loader.assert_not_called()
+
+
+def test_response_loaded_before_invalidation_is_not_shared(backends):
+    """Test a response loaded concurrently with a write on another worker is not served."""
+    # Given
+    first, second = ResponseCache(shared=backends()), ResponseCache(shared=backends())
+
+    def stale_loader():
+        second.invalidate("quiz")
+        return Page(text="stale")
+
+    first.get(("quiz", "info", 1), stale_loader, ttl=60, model=Page)
+
+    # When
+    page = second.get(("quiz", "info", 1), lambda: Page(text="fresh"), ttl=60, model=Page)
+
+    # Then
+    assert page == Page(text="fresh")
+
+
+def test_unavailable_backend_falls_back_to_loader():
+    """Test backend failures are counted and the response is loaded locally."""
+    # Given
+    backend = MagicMock(spec=MemoryCacheBackend)
+    backend.get_many.side_effect = CacheBackendError("down")
+    backend.incr.side_effect = CacheBackendError("down")
+    cache = ResponseCache(shared=backend)
+
+    # When
+    page = cache.get(("quiz", "info", 1), lambda: Page(text="a"), ttl=60, model=Page)
+    cache.invalidate("quiz")
+
+    # Then
+    assert page == Page(text="a")
+    assert cache.stats()["shared_errors"] == 2
+
+
+def test_invalidation_listeners_hear_other_workers(backends):
+    """Test listeners are called with the invalidations of other workers only."""
+    # Given
+    first, second = ResponseCache(shared=backends()), ResponseCache(shared=backends())
+    heard = []
+    first.add_invalidation_listener(lambda quiz_id, kinds: heard.append(("first", kinds)))
+    second.add_invalidation_listener(lambda quiz_id, kinds: heard.append((quiz_id, kinds)))
+
+    # When
+    first.invalidate("quiz", "leaderboard")
+
+    # Then
+    assert wait_until(lambda: heard == [("quiz", ("leaderboard",))])
+
+
+def test_redis_breaker_skips_server_after_failures():
+    """Test commands fail at once without reaching Redis once the breaker opens."""
+    # Given
+    client = MagicMock(spec=RedisClient)
+    client.execute.side_effect = RedisError("Redis connection error: timed out")
+    backend = RedisCacheBackend(
+        client, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    )
+
+    # When
+    for _ in range(4):
+        with pytest.raises(CacheBackendError):
+            backend.get_many(["key"])
+
+    # Then
+    assert client.execute.call_count == 2
+
+
+def test_backend_is_created_on_start_and_closed_on_close(monkeypatch):
+    """Test the configured backend is only connected between start and close."""
+    # Given
+    backend = MagicMock(spec=MemoryCacheBackend)
+    monkeypatch.setattr(response_cache_module, "create_cache_backend", lambda: backend)
+    cache = ResponseCache()
+
+    # When
+    cache.start()
+    started = cache.shared
+    cache.close()
+
+    # Then
+    assert started is backend
+    backend.subscribe.assert_called_once()
+    backend.close.assert_called_once_with()
+    assert cache.shared is None
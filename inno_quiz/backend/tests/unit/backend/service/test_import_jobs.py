@@ -0,0 +1,195 @@
+"""Test background import jobs against the stub server."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import pytest
+
+from backend.models.import_job import ImportJob
+from backend.service.import_jobs import ImportJobRunner
+from backend.service.trivia_import import ImportPlan
+
+
+@pytest.fixture(autouse=True)
+def no_jobs(db_session):
+    """Run every test without jobs of other tests, later app starts would resume them."""
+    db_session.query(ImportJob).delete()
+    db_session.commit()
+    yield
+    db_session.query(ImportJob).delete()
+    db_session.commit()
+
+
+def stub_runner(async_session_factory, **kwargs) -> ImportJobRunner:
+    """Runner on the test database retrying at once."""
+    options = {"retries": 1, "retry_delay": 0}
+    options.update(kwargs)
+    return ImportJobRunner(async_session_factory, **options)
+
+
+async def read_job(async_session_factory, job_id) -> ImportJob:
+    """Load the stored state of a job."""
+    async with async_session_factory() as db:
+        return await db.get(ImportJob, job_id)
+
+
+@pytest.mark.anyio
+async def test_job_imports_in_background(trivia_import_stub, async_session_factory, empty_quiz):
+    """Test a submitted job is queued at once and imports every chunk."""
+    # Given
+    runner = stub_runner(async_session_factory)
+
+    # When
+    async with async_session_factory() as db:
+        job = await runner.submit(empty_quiz, 120, ["9"], "import_author", db=db)
+    await runner.wait()
+
+    # Then
+    assert job.status == "queued"
+    assert job.requested == 120
+    stored = await read_job(async_session_factory, job.id)
+    assert (stored.status, stored.imported, stored.unavailable) == ("succeeded", 120, 0)
+    assert ImportPlan.model_validate_json(stored.plan).remaining == []
+
+
+@pytest.mark.anyio
+async def test_jobs_beyond_workers_wait(async_session_factory, empty_quiz, monkeypatch):
+    """Test no more than workers jobs run at once."""
+    # Given
+    runner = stub_runner(async_session_factory, workers=2)
+    running = []
+    most_running = 0
+
+    async def slow_import(job_id, db):
+        nonlocal most_running
+        running.append(job_id)
+        most_running = max(most_running, len(running))
+        await asyncio.sleep(0.05)
+        running.remove(job_id)
+
+    monkeypatch.setattr(runner, "_import", slow_import)
+
+    # When
+    async with async_session_factory() as db:
+        for _ in range(5):
+            await runner.submit(empty_quiz, 1, ["9"], "import_author", db=db)
+    await runner.wait()
+
+    # Then
+    assert most_running == 2
+
+
+@pytest.mark.anyio
+async def test_unfinished_job_resumes(trivia_import_stub, async_session_factory, empty_quiz):
+    """Test a job interrupted by a restart continues from its stored plan."""
+    # Given
+    async with async_session_factory() as db:
+        job = ImportJob(
+            quiz_id=UUID(empty_quiz),
+            username="import_author",
+            status="running",
+            count=80,
+            categories="[9]",
+            difficulties="[null]",
+            plan=ImportPlan(remaining=[(9, None, 30)], token="token").model_dump_json(),
+            requested=80,
+            imported=50,
+        )
+        db.add(job)
+        await db.commit()
+    runner = stub_runner(async_session_factory)
+
+    # When
+    await runner.resume()
+    await runner.wait()
+    await runner.shutdown()
+
+    # Then
+    stored = await read_job(async_session_factory, job.id)
+    assert (stored.status, stored.imported) == ("succeeded", 80)
+    assert [params["amount"] for _, params in trivia_import_stub.log] == [["30"]]
+
+
+def owned_job(quiz_id: str, owner: str, heartbeat_at: datetime) -> ImportJob:
+    """Queued job of 10 questions owned by another worker."""
+    return ImportJob(
+        quiz_id=UUID(quiz_id),
+        username="import_author",
+        status="queued",
+        count=10,
+        categories="[9]",
+        difficulties="[null]",
+        requested=10,
+        owner=owner,
+        heartbeat_at=heartbeat_at,
+    )
+
+
+@pytest.mark.anyio
+async def test_resume_skips_jobs_of_live_workers(
+    trivia_import_stub, async_session_factory, empty_quiz
+):
+    """Test only jobs whose owner stopped renewing its lease are taken over."""
+    # Given
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    live = owned_job(empty_quiz, "live-worker", now)
+    stopped = owned_job(empty_quiz, "stopped-worker", now - timedelta(seconds=120))
+    async with async_session_factory() as db:
+        db.add_all([live, stopped])
+        await db.commit()
+    runner = stub_runner(async_session_factory, lease=60)
+
+    # When
+    await runner.resume()
+    await runner.wait()
+    await runner.shutdown()
+
+    # Then
+    assert (await read_job(async_session_factory, live.id)).status == "queued"
+    assert (await read_job(async_session_factory, stopped.id)).status == "succeeded"
+    assert trivia_import_stub.requests == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_resumes_run_job_once(
+    trivia_import_stub, async_session_factory, empty_quiz
+):
+    """Test of several workers starting at once only one claims an unfinished job."""
+    # Given
+    async with async_session_factory() as db:
+        job = owned_job(empty_quiz, None, None)
+        db.add(job)
+        await db.commit()
+    runners = [stub_runner(async_session_factory) for _ in range(3)]
+
+    # When
+    await asyncio.gather(*(runner.resume() for runner in runners))
+    for runner in runners:
+        await runner.wait()
+        await runner.shutdown()
+
+    # Then
+    stored = await read_job(async_session_factory, job.id)
+    assert (stored.status, stored.imported) == ("succeeded", 10)
+    assert stored.owner in {runner.owner for runner in runners}
+    assert trivia_import_stub.requests == 1
+
+
+@pytest.mark.anyio
+async def test_job_fails_after_retries(trivia_import_stub, async_session_factory, empty_quiz):
+    """Test a job gives up on an upstream that keeps throttling it."""
+    # Given
+    trivia_import_stub.response_codes = [5, 5]
+    runner = stub_runner(async_session_factory, retries=1)
+
+    # When
+    async with async_session_factory() as db:
+        job = await runner.submit(empty_quiz, 10, ["9"], "import_author", db=db)
+    await runner.wait()
+
+    # Then
+    stored = await read_job(async_session_factory, job.id)
+    assert stored.status == "failed"
+    assert "Too many requests" in stored.error
+    assert trivia_import_stub.requests == 2
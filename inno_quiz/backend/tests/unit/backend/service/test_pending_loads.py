@@ -0,0 +1,62 @@
+"""Unit tests for the generations of keys being loaded."""
+
+from backend.service.pending_loads import PendingLoads
+
+
+def test_unchanged_load_may_be_stored():
+    """Test a load finishing without invalidation reports its key unchanged."""
+    # Given
+    loads = PendingLoads()
+    generation = loads.start("quiz")
+
+    # When
+    unchanged = loads.finish("quiz", generation)
+
+    # Then
+    assert unchanged
+    assert len(loads) == 0
+
+
+def test_invalidation_makes_loads_in_flight_stale():
+    """Test every load of a key in flight is stale after an invalidation."""
+    # Given
+    loads = PendingLoads()
+    first = loads.start("quiz")
+    second = loads.start("quiz")
+    other = loads.start("other")
+
+    # When
+    loads.invalidate("quiz")
+
+    # Then
+    assert not loads.finish("quiz", first)
+    assert not loads.finish("quiz", second)
+    assert loads.finish("other", other)
+    assert len(loads) == 0
+
+
+def test_invalidating_idle_keys_keeps_nothing():
+    """Test invalidations of keys nobody is loading use no memory."""
+    # Given
+    loads = PendingLoads()
+
+    # When
+    for quiz_id in range(1000):
+        loads.invalidate(quiz_id)
+
+    # Then
+    assert len(loads) == 0
+    assert loads.finish(7, loads.start(7))
+
+
+def test_invalidate_all():
+    """Test all loads in flight are stale after invalidate_all."""
+    # Given
+    loads = PendingLoads()
+    generation = loads.start("quiz")
+
+    # When
+    loads.invalidate_all()
+
+    # Then
+    assert not loads.finish("quiz", generation)
@@ -0,0 +1,230 @@
+"""Test the question bank and its prefetcher against the stub server."""
+
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from backend.gateways.trivia import AsyncTriviaGateway, TriviaGateway, TriviaQuestion
+from backend.models import Question
+from backend.models.bank_question import BankQuestion
+from backend.models.lease import Lease
+from backend.repo.bank_question import bank_question as bank_repo
+from backend.service.question_bank import QuestionBank, QuestionBankPrefetcher
+
+# Nothing listens on the discard port, requests fail at once
+DOWN_URL = "http://127.0.0.1:9/api.php"
+
+
+def stub_bank(url: str) -> QuestionBank:
+    """Question bank reading through a gateway pointed at url without retries."""
+    return QuestionBank(AsyncTriviaGateway(base_url=url, retries=0))
+
+
+async def get_many(bank: QuestionBank, async_session_factory, amount: int, **kwargs):
+    """Get questions for a new quiz from the bank and close its gateway."""
+    async with async_session_factory() as db:
+        try:
+            return await bank.get_many(db, uuid4(), amount, **kwargs)
+        finally:
+            await bank.async_gateway.aclose()
+
+
+@pytest.fixture(autouse=True)
+def empty_bank(db_session):
+    """Start every test with an empty bank."""
+    db_session.query(BankQuestion).delete()
+    db_session.commit()
+
+
+@pytest.mark.anyio
+async def test_get_many_reads_through(async_session_factory, trivia_stub):
+    """Test fetched questions are banked and serve the next import."""
+    # Given
+    bank = stub_bank(trivia_stub.url)
+
+    # When
+    fetched = await get_many(bank, async_session_factory, 3, categories=[9])
+    served = await get_many(bank, async_session_factory, 3, categories=[9])
+
+    # Then
+    assert trivia_stub.requests == 1
+    assert {q.question for q in served} == {q.question for q in fetched}
+    assert bank.stats() == {"hits": 1, "misses": 1}
+
+
+@pytest.mark.anyio
+async def test_get_many_while_upstream_is_down(async_session_factory, trivia_stub):
+    """Test the bank serves what it holds without the upstream and fails with nothing banked."""
+    # Given
+    await get_many(stub_bank(trivia_stub.url), async_session_factory, 3, categories=[9])
+    bank = stub_bank(DOWN_URL)
+
+    # When
+    served = await get_many(bank, async_session_factory, 3, categories=[9])
+    short = await get_many(stub_bank(DOWN_URL), async_session_factory, 4, categories=[9])
+
+    # Then
+    assert len(served) == len(short) == 3
+    with pytest.raises(ConnectionError):
+        await get_many(stub_bank(DOWN_URL), async_session_factory, 4, categories=[18])
+
+
+@pytest.mark.anyio
+async def test_get_many_fetches_only_what_the_bank_lacks(
+    db_session, async_session_factory, trivia_stub
+):
+    """Test combinations the bank can serve are not fetched."""
+    # Given
+    await get_many(stub_bank(trivia_stub.url), async_session_factory, 2, categories=[9])
+    bank = stub_bank(trivia_stub.url)
+
+    # When
+    questions = await get_many(bank, async_session_factory, 2, categories=[9, 18])
+
+    # Then
+    assert len(questions) == 4
+    assert [params.get("category") for _, params in trivia_stub.log] == [["9"], ["18"]]
+    assert bank_repo.count_by_category(db_session) == {9: 2, 18: 2}
+
+
+@pytest.mark.anyio
+async def test_get_many_fetches_only_the_shortfall(async_session_factory, trivia_stub):
+    """Test a combination the bank serves in part is topped up with the missing questions."""
+    # Given
+    await get_many(stub_bank(trivia_stub.url), async_session_factory, 2, categories=[9])
+    bank = stub_bank(trivia_stub.url)
+
+    # When
+    questions = await get_many(bank, async_session_factory, 5, categories=[9])
+
+    # Then
+    assert len({q.question for q in questions}) == 5
+    assert trivia_stub.log[-1][1]["amount"] == ["3"]
+
+
+def test_prefetcher_tops_up_reserve(db_engine, db_session, trivia_stub):
+    """Test every category is filled to the reserve in batches of at most 50."""
+    # Given
+    prefetcher = QuestionBankPrefetcher(
+        TriviaGateway(base_url=trivia_stub.url),
+        sessionmaker(bind=db_engine),
+        categories=[9, 18],
+        reserve=60,
+    )
+
+    # When
+    added = prefetcher.top_up()
+    added_again = prefetcher.top_up()
+
+    # Then
+    assert added == 120
+    assert added_again == 0
+    assert [params["amount"] for _, params in trivia_stub.log] == [["50"], ["10"]] * 2
+    assert bank_repo.count_by_category(db_session) == {9: 60, 18: 60}
+
+
+def test_prefetcher_skips_exhausted_category(db_engine, db_session, trivia_stub):
+    """Test a category stops being fetched once the upstream repeats itself."""
+    # Given
+    trivia_stub.pool = 5
+    prefetcher = QuestionBankPrefetcher(
+        TriviaGateway(base_url=trivia_stub.url),
+        sessionmaker(bind=db_engine),
+        categories=[9],
+        reserve=20,
+    )
+
+    # When
+    added = prefetcher.top_up()
+
+    # Then
+    assert added == 5
+    assert trivia_stub.requests == 2
+
+
+def test_prefetcher_runs_in_lease_holder_only(db_engine, db_session, trivia_stub):
+    """Test of two workers sharing a lease only the holder prefetches."""
+    # Given
+    db_session.query(Lease).delete()
+    db_session.commit()
+    holder, other = (
+        QuestionBankPrefetcher(
+            TriviaGateway(base_url=trivia_stub.url),
+            sessionmaker(bind=db_engine),
+            categories=[9],
+            reserve=10,
+            lease_name="test-prefetch",
+        )
+        for _ in range(2)
+    )
+
+    # When
+    added = holder.top_up()
+    db_session.query(BankQuestion).delete()
+    db_session.commit()
+    added_by_other = other.top_up()
+
+    # Then
+    assert (added, added_by_other) == (10, 0)
+    assert trivia_stub.requests == 1
+
+
+def test_sample_wraps_around_and_skips_quiz_questions(db_session, empty_quiz):
+    """Test samples hold every matching question but the quiz's own, whatever the start."""
+    # Given
+    questions = [
+        TriviaQuestion(
+            category="General",
+            type="multiple",
+            difficulty="easy",
+            question=f"Banked {i}?",
+            correct_answer="a",
+            incorrect_answers=["b"],
+        )
+        for i in range(5)
+    ]
+    bank_repo.add_many(db_session, 9, questions)
+    db_session.add(Question(quiz_id=UUID(empty_quiz), text="Banked 2?"))
+    db_session.commit()
+
+    # When
+    samples = [
+        bank_repo.sample(db_session, amount=10, category_id=9, exclude_quiz_id=UUID(empty_quiz))
+        for _ in range(20)
+    ]
+    db_session.query(Question).filter_by(quiz_id=UUID(empty_quiz)).delete()
+    db_session.commit()
+
+    # Then
+    for sample in samples:
+        assert sorted(q.question for q in sample) == [
+            "Banked 0?", "Banked 1?", "Banked 3?", "Banked 4?"
+        ]
+    assert len(bank_repo.sample(db_session, amount=2, category_id=9)) == 2
+    assert bank_repo.sample(db_session, amount=2, category_id=18) == []
+
+
+def test_sample_picks_are_not_a_run_of_ids(db_session):
+    """Test samples are not consecutive questions of the bank."""
+    # Given
+    questions = [
+        TriviaQuestion(
+            category="General",
+            type="multiple",
+            difficulty="easy",
+            question=f"Banked {i}?",
+            correct_answer="a",
+            incorrect_answers=["b"],
+        )
+        for i in range(20)
+    ]
+    bank_repo.add_many(db_session, 9, questions)
+    order = {q.question: i for i, q in enumerate(questions)}
+
+    # When
+    samples = [bank_repo.sample(db_session, amount=3, category_id=9) for _ in range(30)]
+
+    # Then
+    runs = [{(start + i) % 20 for i in range(3)} for start in range(20)]
+    assert any({order[q.question] for q in sample} not in runs for sample in samples)
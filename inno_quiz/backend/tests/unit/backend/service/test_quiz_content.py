@@ -0,0 +1,122 @@
+"""Test bulk import and export of quiz content."""
+
+import json
+from uuid import UUID
+
+import pytest
+
+from backend.domain.quiz_request import ContentFormat
+from backend.models import Question, Quiz
+from backend.service import quiz_content
+from backend.service.errors import InvalidContentError
+
+
+async def chunked(content: bytes, size: int):
+    """Yield content in chunks of size bytes, as a request body arrives."""
+    for start in range(0, len(content), size):
+        yield content[start:start + size]
+
+
+def jsonl(count: int) -> bytes:
+    """JSON Lines content of count questions."""
+    return "".join(
+        json.dumps({"text": f"Q{i}?", "options": ["a", "b"], "correct_options": [1]}) + "\n"
+        for i in range(count)
+    ).encode()
+
+
+@pytest.mark.anyio
+async def test_import_inserts_in_batches(async_session_factory, db_session, empty_quiz):
+    """Test lines split across chunks are inserted one transaction per batch."""
+    # Given
+    content = jsonl(5)
+    quiz_id = UUID(empty_quiz)
+    version = db_session.get(Quiz, quiz_id).content_version
+
+    # When
+    async with async_session_factory() as db:
+        result = await quiz_content.import_content(
+            empty_quiz, ContentFormat.jsonl, chunked(content, 7), db, batch_size=2
+        )
+
+    # Then
+    assert result.imported == 5
+    assert result.failed == 0
+    texts = [q.text for q in db_session.query(Question).filter_by(quiz_id=quiz_id)]
+    assert texts == [f"Q{i}?" for i in range(5)]
+    # Each of the three batches bumped the content version
+    db_session.expire_all()
+    assert db_session.get(Quiz, quiz_id).content_version == version + 3
+
+
+@pytest.mark.anyio
+async def test_import_reports_lines_that_are_not_utf8(async_session_factory, empty_quiz):
+    """Test an undecodable line fails alone."""
+    # Given
+    content = jsonl(1) + b"\xff\xfe\n" + jsonl(1)
+
+    # When
+    async with async_session_factory() as db:
+        result = await quiz_content.import_content(
+            empty_quiz, ContentFormat.jsonl, chunked(content, 1024), db
+        )
+
+    # Then
+    assert result.imported == 2
+    assert [(error.line, error.error) for error in result.errors] == [
+        (2, "Line is not UTF-8")
+    ]
+
+
+@pytest.mark.anyio
+async def test_import_rejects_unknown_csv_header(async_session_factory, empty_quiz):
+    """Test CSV content must start with the export header."""
+    # Given
+    content = b"question,answers\nQ?,[]\n"
+
+    # When / Then
+    async with async_session_factory() as db:
+        with pytest.raises(InvalidContentError):
+            await quiz_content.import_content(
+                empty_quiz, ContentFormat.csv, chunked(content, 1024), db
+            )
+
+
+@pytest.mark.anyio
+async def test_import_fails_lines_past_the_length_cap(async_session_factory, empty_quiz):
+    """Test a line longer than the cap fails alone without being buffered."""
+    # Given
+    content = jsonl(1) + b"x" * 5000 + b"\n" + jsonl(1) + b"y" * 300
+
+    # When
+    async with async_session_factory() as db:
+        result = await quiz_content.import_content(
+            empty_quiz, ContentFormat.jsonl, chunked(content, 64), db, max_line_bytes=200
+        )
+
+    # Then
+    assert result.imported == 2
+    assert [(error.line, error.error) for error in result.errors] == [
+        (2, "Line is longer than 200 bytes"),
+        (4, "Line is longer than 200 bytes"),
+    ]
+
+
+@pytest.mark.anyio
+async def test_import_recovers_from_unbalanced_csv_quote(async_session_factory, empty_quiz):
+    """Test an unbalanced quote fails its record at the cap and later rows import."""
+    # Given
+    row = 'Q?,"[""a"", ""b""]",[1]\n'
+    content = ("text,options,correct_options\n" + '"Broken,[],[0]\n' + row * 20).encode()
+
+    # When
+    async with async_session_factory() as db:
+        result = await quiz_content.import_content(
+            empty_quiz, ContentFormat.csv, chunked(content, 16), db, max_line_bytes=100
+        )
+
+    # Then
+    assert result.errors[0].line == 2
+    assert result.errors[0].error.startswith("Record is longer than 100 bytes")
+    assert result.failed == 1
+    assert result.imported == 16
@@ -6,7 +6,12 @@ from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 from inno_quiz.backend.service import quiz as quiz_service
-from inno_quiz.backend.service.errors import QuizNotFoundError, UserNotFoundError
+from inno_quiz.backend.service.errors import (
+    DuplicateAnswerError,
+    QuestionNotInQuizError,
+    QuizNotFoundError,
+    UserNotFoundError,
+)
 from inno_quiz.backend.domain.question_request import QuestionRequest
 from inno_quiz.backend.domain.quiz_request import (
     QuizSubmissionRequest,
@@ -36,6 +41,7 @@ def mock_quiz():
     quiz.category = 9
     quiz.author_username = "testuser"
     quiz.created_at = datetime.now()
+    quiz.content_version = 1
     return quiz
 
 
@@ -55,6 +61,7 @@ def mock_question_with_options():
     option2.is_correct = False
 
     mock_options = [option1, option2]
+    question.answer_options = mock_options
 
     return question, mock_options
 
@@ -71,7 +78,7 @@ def test_add_question(mock_repo, mock_db, mock_quiz, mock_question_with_options)
 
     question, options = mock_question_with_options
     mock_repo.question.create_with_options.return_value = question
-    mock_repo.answer_option.get_by_question_id.return_value = options
+    mock_repo.question.get_with_options_by_ids.return_value = [question]
 
     # When
     with patch("uuid.UUID", side_effect=lambda x: x):
@@ -139,8 +146,7 @@ def test_get_quiz_questions(mock_repo, mock_db, mock_quiz, mock_question_with_op
     question, options = mock_question_with_options
 
     mock_repo.quiz.get_by_id.return_value = mock_quiz
-    mock_repo.question.get_by_quiz_id.return_value = [question]
-    mock_repo.answer_option.get_by_question_id.return_value = options
+    mock_repo.question.get_with_options_by_quiz_id.return_value = [question]
 
     # When
     with patch("uuid.UUID", side_effect=lambda x: x):
@@ -158,13 +164,11 @@ def test_get_quiz_questions(mock_repo, mock_db, mock_quiz, mock_question_with_op
     assert question_response.correct_options == [0]  # Index 0 is correct
 
 
-def test_submit_quiz_answers(mock_repo, mock_db, mock_quiz, mock_question_with_options):
+def test_submit_quiz_answers(mock_repo, mock_db, mock_quiz):
     """Test submitting answers for a quiz."""
     # Given
     quiz_id = mock_quiz.id
     username = "test_user"  # Use username instead of UUID
-    question, options = mock_question_with_options
-    question_id = question.id
 
     # Mock user
     mock_user = MagicMock()
@@ -172,25 +176,24 @@ def test_submit_quiz_answers(mock_repo, mock_db, mock_quiz, mock_question_with_o
 
     # Mock attempt
     mock_attempt = MagicMock()
-    mock_attempt.id = str(uuid.uuid4())
+    mock_attempt.id = 2
 
     # Set up repository mocks
     mock_repo.quiz.get_by_id.return_value = mock_quiz
     mock_repo.user.get_by_username.return_value = mock_user
-    mock_repo.question.count_by_quiz_id.return_value = 1
-    mock_repo.question.get_by_id.return_value = question
-    mock_repo.answer_option.get_by_question_id.return_value = options
-    mock_repo.user_attempt.create.return_value = mock_attempt
-    mock_repo.user_attempt.get_by_quiz_id.return_value = [mock_attempt]
+    mock_repo.question.get_answer_key.return_value = {1: [0], 2: [1, 2]}
+    mock_repo.user_attempt.create_with_answers.return_value = mock_attempt
+    mock_repo.user_attempt.get_rank.return_value = 1
+    # The stored attempt is already counted by the histogram
+    mock_repo.user_attempt.get_score_counts.return_value = ({0: 1, 1: 1}, 2)
 
     # Create the request
     request = QuizSubmissionRequest(
         quiz_id=quiz_id,
         user_id=username,  # Username instead of UUID
         answers=[
-            QuizAnswerRequest(
-                question_id=question_id, selected_options=[0]  # Correct answer
-            )
+            QuizAnswerRequest(question_id="1", selected_options=[0]),  # Correct answer
+            QuizAnswerRequest(question_id="2", selected_options=[2]),  # Partial answer
         ],
         completion_time=10.5,
     )
@@ -202,9 +205,55 @@ def test_submit_quiz_answers(mock_repo, mock_db, mock_quiz, mock_question_with_o
     # Then
     assert result.quiz_id == str(mock_quiz.id)
     assert result.score == 1
-    assert result.total == 1
+    assert result.total == 2
     assert result.completion_time == 10.5
     assert result.rank == 1  # First attempt
+    assert result.percentile == 50.0
+    mock_repo.question.get_by_id.assert_not_called()
+    mock_repo.answer_option.get_by_question_id.assert_not_called()
+    mock_repo.user_attempt.create_with_answers.assert_called_once()
+    saved = mock_repo.user_attempt.create_with_answers.call_args.kwargs["answers"]
+    assert saved == [(1, [0]), (2, [2])]
+    mock_repo.user_answer.create.assert_not_called()
+
+    # A second submission is scored from the cached answer key
+    quiz_service.submit_quiz_answers(request, mock_db)
+    mock_repo.question.get_answer_key.assert_called_once()
+    mock_repo.user_attempt.get_by_quiz_id.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "answers, error",
+    [
+        ([QuizAnswerRequest(question_id="99", selected_options=[0])], QuestionNotInQuizError),
+        ([QuizAnswerRequest(question_id="abc", selected_options=[0])], QuestionNotInQuizError),
+        (
+            [
+                QuizAnswerRequest(question_id="1", selected_options=[0]),
+                QuizAnswerRequest(question_id="1", selected_options=[1]),
+            ],
+            DuplicateAnswerError,
+        ),
+    ],
+)
+def test_submit_quiz_answers_rejects_foreign_questions(
+    mock_repo, mock_db, mock_quiz, answers, error
+):
+    """Test answers to questions outside the quiz reject the whole submission."""
+    # Given
+    mock_repo.quiz.get_by_id.return_value = mock_quiz
+    mock_repo.user.get_by_username.return_value = MagicMock(username="test_user")
+    mock_repo.question.get_answer_key.return_value = {1: [0]}
+
+    request = QuizSubmissionRequest(
+        quiz_id=mock_quiz.id, user_id="test_user", answers=answers, completion_time=10.5
+    )
+
+    # When / Then
+    with pytest.raises(error):
+        quiz_service.submit_quiz_answers(request, mock_db)
+
+    mock_repo.user_attempt.create_with_answers.assert_not_called()
 
 
 def test_submit_quiz_answers_quiz_not_found(mock_repo, mock_db):
@@ -0,0 +1,164 @@
+"""Unit tests for the service response cache."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic import BaseModel
+
+from backend.service.response_cache import ResponseCache
+
+
+class Page(BaseModel):
+    """Small response model."""
+
+    text: str
+
+
+def page_size(text: str) -> int:
+    """Size the cache accounts for a page."""
+    return len(Page(text=text).model_dump_json())
+
+
+def test_get_counts_hits_and_misses():
+    """Test the loader runs once and later lookups are served from memory."""
+    # Given
+    cache = ResponseCache()
+    loader = MagicMock(return_value=Page(text="a"))
+
+    # When
+    first = cache.get(("quiz", "info"), loader, ttl=60)
+    second = cache.get(("quiz", "info"), loader, ttl=60)
+
+    # Then
+    loader.assert_called_once()
+    assert first is second
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "expirations": 0,
+        "size": 1,
+        "bytes": page_size("a"),
+        "shared_hits": 0,
+        "shared_errors": 0,
+    }
+
+
+def test_expired_entry_is_reloaded():
+    """Test entries older than their TTL are loaded again."""
+    # Given
+    cache = ResponseCache()
+    cache.get(("quiz", "leaderboard"), lambda: Page(text="old"), ttl=0)
+
+    # When
+    page = cache.get(("quiz", "leaderboard"), lambda: Page(text="new"), ttl=0)
+
+    # Then
+    assert page.text == "new"
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["bytes"] == page_size("new")
+
+
+def test_invalidate_kinds():
+    """Test invalidating some kinds keeps the other responses of the quiz."""
+    # Given
+    cache = ResponseCache()
+    cache.get(("quiz", "questions", 1), lambda: Page(text="q"), ttl=60)
+    cache.get(("quiz", "leaderboard", 10, None), lambda: Page(text="l"), ttl=60)
+    cache.get(("other", "leaderboard", 10, None), lambda: Page(text="o"), ttl=60)
+
+    # When
+    cache.invalidate("quiz", "leaderboard")
+
+    # Then
+    loader = MagicMock(return_value=Page(text="x"))
+    cache.get(("quiz", "questions", 1), loader, ttl=60)
+    cache.get(("other", "leaderboard", 10, None), loader, ttl=60)
+    loader.assert_not_called()
+    cache.get(("quiz", "leaderboard", 10, None), loader, ttl=60)
+    loader.assert_called_once()
+
+
+def test_invalidate_during_load_is_not_cached():
+    """Test a response loaded while the quiz changed is not stored."""
+    # Given
+    cache = ResponseCache()
+
+    def stale_loader():
+        cache.invalidate("quiz")
+        return Page(text="stale")
+
+    # When
+    cache.get(("quiz", "info"), stale_loader, ttl=60)
+
+    # Then
+    assert cache.stats()["size"] == 0
+
+
+def test_evicts_least_recently_used_over_byte_limit():
+    """Test the least recently used entries are evicted to stay within max_bytes."""
+    # Given
+    cache = ResponseCache(max_bytes=2 * page_size("a"))
+    cache.get(("a", "info"), lambda: Page(text="a"), ttl=60)
+    cache.get(("b", "info"), lambda: Page(text="b"), ttl=60)
+    cache.get(("a", "info"), lambda: Page(text="a"), ttl=60)
+
+    # When
+    cache.get(("c", "info"), lambda: Page(text="c"), ttl=60)
+    cache.get(("d", "info"), lambda: Page(text="d" * 1000), ttl=60)  # Over the limit
+
+    # Then
+    stats = cache.stats()
+    assert (stats["size"], stats["evictions"]) == (2, 1)
+    assert stats["bytes"] == 2 * page_size("a")
+    loader = MagicMock(return_value=Page(text="x"))
+    cache.get(("a", "info"), loader, ttl=60)
+    cache.get(("c", "info"), loader, ttl=60)
+    loader.assert_not_called()
+
+
+def test_evicts_over_entry_limit():
+    """Test the cache holds at most max_entries responses."""
+    # Given
+    cache = ResponseCache(max_entries=2)
+
+    # When
+    for quiz_id in "abc":
+        cache.get((quiz_id, "info"), lambda: Page(text="p"), ttl=60)
+
+    # Then
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.anyio
+async def test_get_async_awaits_loader_once():
+    """Test the async variant awaits its loader on a miss only."""
+    # Given
+    cache = ResponseCache()
+    loader = AsyncMock(return_value=Page(text="a"))
+
+    # When
+    first = await cache.get_async(("quiz", "info"), loader, ttl=60)
+    second = await cache.get_async(("quiz", "info"), loader, ttl=60)
+
+    # Then
+    loader.assert_awaited_once()
+    assert first is second
+
+
+@pytest.mark.anyio
+async def test_invalidate_async_during_load_is_not_cached():
+    """Test a response loaded while the quiz changed is not stored by the async variant."""
+    # Given
+    cache = ResponseCache()
+
+    async def stale_loader():
+        await cache.invalidate_async("quiz")
+        return Page(text="stale")
+
+    # When
+    await cache.get_async(("quiz", "info"), stale_loader, ttl=60)
+
+    # Then
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,138 @@
+"""Unit tests for per-quiz score histograms."""
+
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.service.score_distribution import ScoreDistributions, ScoreHistogram
+
+
+def test_histogram_percentile():
+    """Test the percentile is the share of attempts with a lower score."""
+    # Given
+    histogram = ScoreHistogram({0: 1, 2: 2, 5: 1})
+
+    # Then
+    assert histogram.total == 4
+    assert histogram.percentile(0) == 0.0
+    assert histogram.percentile(2) == 25.0
+    assert histogram.percentile(5) == 75.0
+    assert histogram.buckets() == [(0, 1), (2, 2), (5, 1)]
+
+
+def test_histogram_empty():
+    """Test an empty histogram reports zero percentile."""
+    assert ScoreHistogram({}).percentile(3) == 0.0
+
+
+def test_record_builds_once_then_increments():
+    """Test the loader runs on first use only and later attempts are added."""
+    # Given
+    distributions = ScoreDistributions()
+    loader = MagicMock(return_value=({1: 1}, 1))
+
+    # When
+    distributions.record("quiz", 1, 1, loader)
+    histogram = distributions.record("quiz", 2, 3, loader)
+
+    # Then
+    loader.assert_called_once()
+    assert histogram.buckets() == [(1, 1), (3, 1)]
+    assert histogram.percentile(3) == 50.0
+
+
+def test_record_skips_attempt_counted_by_rebuild():
+    """Test an attempt the rebuilt histogram already counts is not added twice."""
+    # Given
+    distributions = ScoreDistributions(max_age=0)
+
+    # When
+    histogram = distributions.record("quiz", 7, 2, lambda: ({1: 3, 2: 1}, 9))
+
+    # Then
+    assert histogram.total == 4
+    assert histogram.buckets() == [(1, 3), (2, 1)]
+
+
+def test_stale_histogram_is_rebuilt():
+    """Test histograms older than max_age are rebuilt from the loader."""
+    # Given
+    distributions = ScoreDistributions(max_age=0)
+    distributions.get("quiz", lambda: ({1: 1}, 1))
+
+    # When
+    histogram = distributions.get("quiz", lambda: ({1: 1, 2: 4}, 5))
+
+    # Then
+    assert histogram.total == 5
+
+
+def test_loader_runs_outside_the_lock():
+    """Test a slow build does not block other callers."""
+    # Given
+    distributions = ScoreDistributions()
+    other = threading.Thread(target=distributions.get, args=("other", lambda: ({}, 0)))
+
+    def loader():
+        other.start()
+        other.join(timeout=5)
+        return {}, 0
+
+    # When
+    distributions.get("quiz", loader)
+
+    # Then
+    assert not other.is_alive()
+
+
+def test_invalidation_during_build_discards_it():
+    """Test a histogram built before an invalidation is not stored."""
+    # Given
+    distributions = ScoreDistributions()
+
+    def loader():
+        distributions.invalidate("quiz")
+        return {1: 1}, 1
+
+    # When
+    distributions.get("quiz", loader)
+    histogram = distributions.get("quiz", lambda: ({1: 2}, 2))
+
+    # Then
+    assert histogram.total == 2
+
+
+def test_least_recently_used_histogram_is_dropped():
+    """Test histograms are dropped least recently used first over max_entries."""
+    # Given
+    distributions = ScoreDistributions(max_entries=2)
+    distributions.get("a", lambda: ({1: 1}, 1))
+    distributions.get("b", lambda: ({1: 1}, 2))
+    distributions.get("a", MagicMock())
+
+    # When
+    distributions.get("c", lambda: ({1: 1}, 3))
+
+    # Then
+    loader = MagicMock(return_value=({1: 1}, 3))
+    distributions.get("a", loader)
+    loader.assert_not_called()
+    distributions.get("b", loader)
+    loader.assert_called_once()
+
+
+@pytest.mark.anyio
+async def test_record_async_builds_once_then_increments():
+    """Test the async variant awaits its loader on first use only."""
+    # Given
+    distributions = ScoreDistributions()
+    loader = AsyncMock(return_value=({1: 1}, 1))
+
+    # When
+    await distributions.record_async("quiz", 1, 1, loader)
+    histogram = await distributions.record_async("quiz", 2, 3, loader)
+
+    # Then
+    loader.assert_awaited_once()
+    assert histogram.buckets() == [(1, 1), (3, 1)]
@@ -0,0 +1,130 @@
+"""Test chunked imports against the stub server."""
+
+import pytest
+
+from backend.service import trivia_import
+from backend.service.errors import InvalidContinuationError
+
+
+async def run_import(async_session_factory, quiz_id, plan, unavailable=0, budget=30.0):
+    """Run an import on a fresh asyncio session."""
+    async with async_session_factory() as db:
+        return await trivia_import.import_questions(quiz_id, plan, db, unavailable, budget)
+
+
+def api_calls(stub):
+    """Query parameters of the question requests the stub received."""
+    return [params for _, params in stub.log if "amount" in params]
+
+
+@pytest.mark.anyio
+async def test_large_import_is_fetched_in_chunks(
+    trivia_import_stub, async_session_factory, empty_quiz
+):
+    """Test a count above 50 is split into chunks sharing a session token."""
+    # Given
+    plan, unavailable = await trivia_import.plan_import(120, [9], [None])
+
+    # When
+    result = await run_import(async_session_factory, empty_quiz, plan, unavailable)
+
+    # Then
+    assert len(result.questions) == 120
+    assert len({q.text for q in result.questions}) == 120
+    assert result.continuation is None
+    calls = api_calls(trivia_import_stub)
+    assert [params["amount"] for params in calls] == [["50"], ["50"], ["20"]]
+    assert {params["token"][0] for params in calls} == {plan.token}
+
+
+@pytest.mark.anyio
+async def test_import_is_capped_to_category_count(
+    trivia_import_stub, async_session_factory, empty_quiz
+):
+    """Test questions the category does not have are reported, not requested."""
+    # Given
+    trivia_import_stub.counts["easy"] = 30
+
+    # When
+    plan, unavailable = await trivia_import.plan_import(60, [9], ["easy"])
+    result = await run_import(async_session_factory, empty_quiz, plan, unavailable)
+
+    # Then
+    assert len(result.questions) == 30
+    assert result.unavailable == 30
+    assert [params["amount"] for params in api_calls(trivia_import_stub)] == [["30"]]
+
+
+@pytest.mark.anyio
+async def test_exhausted_combination_does_not_fail_the_import(
+    trivia_import_stub, async_session_factory, empty_quiz
+):
+    """Test response code 1 for one combination keeps the questions of the others."""
+    # Given
+    trivia_import_stub.response_codes = [1]
+    plan, _ = await trivia_import.plan_import(10, [9], ["easy", "hard"])
+
+    # When
+    result = await run_import(async_session_factory, empty_quiz, plan)
+
+    # Then
+    assert len(result.questions) == 10
+    assert result.unavailable == 10
+    assert result.continuation is None
+
+
+@pytest.mark.anyio
+async def test_rate_limited_import_returns_continuation(
+    trivia_import_stub, async_session_factory, empty_quiz
+):
+    """Test response code 5 ends the import early and its continuation resumes it."""
+    # Given
+    trivia_import_stub.response_codes = [0, 5]
+    plan, _ = await trivia_import.plan_import(120, [9], [None])
+
+    # When
+    partial = await run_import(async_session_factory, empty_quiz, plan)
+    rest = await run_import(
+        async_session_factory, empty_quiz, trivia_import.decode_continuation(partial.continuation)
+    )
+
+    # Then
+    assert len(partial.questions) == 50
+    assert len(rest.questions) == 70
+    assert rest.continuation is None
+
+
+@pytest.mark.anyio
+async def test_import_stops_at_budget(
+    trivia_import_stub, async_session_factory, empty_quiz
+):
+    """Test an import out of time answers after one round with a continuation."""
+    # Given
+    plan, _ = await trivia_import.plan_import(120, [9], [None])
+
+    # When
+    result = await run_import(async_session_factory, empty_quiz, plan, budget=0)
+
+    # Then
+    assert len(result.questions) == 50
+    assert trivia_import.decode_continuation(result.continuation).remaining == [(9, None, 70)]
+
+
+@pytest.mark.anyio
+async def test_failed_first_round_raises(
+    trivia_import_stub, async_session_factory, empty_quiz
+):
+    """Test an import that got nothing fails instead of answering empty."""
+    # Given
+    trivia_import_stub.response_codes = [5]
+    plan, _ = await trivia_import.plan_import(10, [9], [None])
+
+    # When / Then
+    with pytest.raises(ConnectionError):
+        await run_import(async_session_factory, empty_quiz, plan)
+
+
+def test_invalid_continuation():
+    """Test a tampered continuation is rejected."""
+    with pytest.raises(InvalidContinuationError):
+        trivia_import.decode_continuation("not-a-continuation")
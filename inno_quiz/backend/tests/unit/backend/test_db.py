@@ -0,0 +1,101 @@
+"""Test database engine and session configuration."""
+
+import pytest
+from fastapi import Request
+from sqlalchemy.exc import OperationalError
+
+from backend import db as db_module
+from backend.config import settings
+from backend.db import WRITER_OPTIONS, create_db_engine, get_db, get_engine_options
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path, monkeypatch):
+    """Engine with the SQLite profile and a short busy timeout."""
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 100)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+    yield engine
+    engine.dispose()
+
+
+def test_sqlite_profile_pragmas(sqlite_engine):
+    """Test new SQLite connections get the configured PRAGMA profile."""
+    # When
+    with sqlite_engine.connect() as connection:
+        pragmas = {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size")
+        }
+
+    # Then
+    assert pragmas == {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "busy_timeout": 100,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KIB,
+    }
+
+
+def test_writer_takes_write_lock_at_begin(sqlite_engine):
+    """Test writer transactions lock at BEGIN while readers keep reading."""
+    # Given
+    write_engine = sqlite_engine.execution_options(**WRITER_OPTIONS)
+
+    with write_engine.begin() as writer:
+        writer.exec_driver_sql("SELECT COUNT(*) FROM items").scalar()
+
+        # When / Then
+        with sqlite_engine.connect() as reader:
+            assert reader.exec_driver_sql("SELECT COUNT(*) FROM items").scalar() == 0
+        with pytest.raises(OperationalError, match="database is locked"):
+            with write_engine.begin() as other_writer:
+                other_writer.exec_driver_sql("SELECT 1")
+
+        writer.exec_driver_sql("INSERT INTO items (id) VALUES (1)")
+
+    with sqlite_engine.connect() as reader:
+        assert reader.exec_driver_sql("SELECT COUNT(*) FROM items").scalar() == 1
+
+
+@pytest.mark.parametrize(
+    "url, pooled",
+    [
+        ("sqlite:///./inno_quiz.db", True),
+        ("sqlite://", False),
+        ("postgresql://u:p@db/quiz", True),
+    ],
+)
+def test_get_engine_options(url, pooled):
+    """Test pool settings apply to every database except in-memory SQLite."""
+    # When
+    options = get_engine_options(url)
+
+    # Then
+    assert options["pool_pre_ping"] == settings.DB_POOL_PRE_PING
+    assert ("pool_size" in options) == pooled
+    if pooled:
+        assert options["pool_size"] == settings.DB_POOL_SIZE
+        assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+
+
+@pytest.mark.parametrize(
+    "method, writer", [("GET", False), ("HEAD", False), ("POST", True), ("DELETE", True)]
+)
+def test_get_db_binds_writers(method, writer):
+    """Test sessions of writing requests are bound to the writer engine."""
+    # Given
+    request = Request({"type": "http", "method": method, "headers": []})
+
+    # When
+    sessions = get_db(request)
+    session = next(sessions)
+    bind = session.get_bind()
+    sessions.close()
+
+    # Then
+    assert (bind is db_module.write_engine) == writer
+    assert bind.get_execution_options().get("sqlite_begin") == (
+        "IMMEDIATE" if writer else None
+    )
@@ -1,6 +1,9 @@
+import copy
+from collections import OrderedDict
+
 import requests
 import streamlit as st
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import time
 import socket
 import uuid
@@ -12,6 +15,14 @@ BASE_URL = "http://localhost:8000"
 MAX_RETRIES = 2
 RETRY_DELAY = 2  # seconds
 
+# Revalidated GET responses kept per session, least recently used dropped first
+ETAG_CACHE_MAX_ENTRIES = 32
+
+# Cookies the backend sets to route a session's reads, kept across its requests
+# so reads after a write go to the primary database. The access token is sent
+# explicitly with every request, so logging out takes effect at once
+ROUTING_COOKIES = ("read_primary",)
+
 
 def is_backend_available():
     """Check if the backend server is running"""
@@ -54,6 +65,34 @@ def handle_response(response):
         return None
 
 
+def get_etag_cache() -> "OrderedDict[Tuple[str, str], Tuple[str, Any]]":
+    """
+    Get the ETag and body of revalidated GET responses of the current session,
+    keyed by the request's Authorization header and URL
+    """
+    if 'etag_cache' not in st.session_state:
+        st.session_state['etag_cache'] = OrderedDict()
+    return st.session_state['etag_cache']
+
+
+def get_cookie_jar() -> requests.cookies.RequestsCookieJar:
+    """
+    Get the routing cookies of the current session, see `ROUTING_COOKIES`
+    """
+    if 'cookie_jar' not in st.session_state:
+        st.session_state['cookie_jar'] = requests.cookies.RequestsCookieJar()
+    return st.session_state['cookie_jar']
+
+
+def keep_routing_cookies(response) -> None:
+    """
+    Keep the routing cookies a response sets for the next requests of the session
+    """
+    for cookie in response.cookies:
+        if cookie.name in ROUTING_COOKIES:
+            get_cookie_jar().set_cookie(cookie)
+
+
 def get_auth_headers() -> Dict[str, str]:
     """Get authentication headers if user is logged in"""
     headers = {"Content-Type": "application/json"}
@@ -77,9 +116,21 @@ def get_auth_cookies() -> Dict[str, str]:
 
 
 def execute_request(method, url, **kwargs):
-    """Execute a request with retry logic for connection errors"""
+    """
+    Execute a request with retry logic for connection errors.
+    With revalidate=True a GET sends the ETag of the last response for the URL
+    and reuses its body when the server answers 304 Not Modified
+    """
     headers = kwargs.pop('headers', {})
-    cookies = kwargs.pop('cookies', {})
+    cookies = get_cookie_jar().copy()
+    cookies.update(kwargs.pop('cookies', {}))
+    revalidate = kwargs.pop('revalidate', False)
+    etag_cache = get_etag_cache() if revalidate else None
+    cache_key = (headers.get("Authorization", ""), url)
+    cached = etag_cache.get(cache_key) if revalidate else None
+    if cached is not None:
+        etag_cache.move_to_end(cache_key)
+        headers = {**headers, "If-None-Match": cached[0]}
 
     # Check if backend is available before making requests
     if not is_backend_available():
@@ -106,8 +157,18 @@ SECRET_KEY=your_secret_key_here poetry run uvicorn backend.main:app --reload
             else:
                 st.error(f"Unsupported HTTP method: {method}")
                 return None
-
-            return handle_response(response)
+            keep_routing_cookies(response)
+
+            if cached is not None and response.status_code == 304:
+                # Callers may modify the data they get
+                return copy.deepcopy(cached[1])
+            data = handle_response(response)
+            if revalidate and data is not None and "ETag" in response.headers:
+                etag_cache[cache_key] = (response.headers["ETag"], copy.deepcopy(data))
+                etag_cache.move_to_end(cache_key)
+                if len(etag_cache) > ETAG_CACHE_MAX_ENTRIES:
+                    etag_cache.popitem(last=False)
+            return data
         except requests.exceptions.ConnectionError as e:
             if attempt < MAX_RETRIES:
                 # Show retry message
@@ -171,7 +232,8 @@ def get_quiz_info(quiz_id: str) -> Optional[Dict[str, Any]]:
         'GET',
         f"{BASE_URL}/v1/quiz/{formatted_quiz_id}",
         headers=headers,
-        cookies=cookies)
+        cookies=cookies,
+        revalidate=True)
 
 
 def add_question(quiz_id: str, question_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -215,7 +277,7 @@ def get_quiz_questions(quiz_id: str) -> Optional[Dict[str, Any]]:
     formatted_quiz_id = ensure_uuid_format(quiz_id)
 
     return execute_request('GET', f"{BASE_URL}/v1/quiz/{formatted_quiz_id}/questions",
-                           headers=headers, cookies=cookies)
+                           headers=headers, cookies=cookies, revalidate=True)
 
 
 def ensure_uuid_format(id_value: str) -> str:
@@ -258,8 +320,8 @@ def submit_quiz_answers(quiz_id: str, answers: Dict[str, Any]) -> Optional[Dict[
                            json=answers, headers=headers, cookies=cookies)
 
 
-def get_quiz_leaderboard(quiz_id: str) -> Optional[Dict[str, Any]]:
-    """Get the leaderboard for a specific quiz"""
+def get_quiz_leaderboard(quiz_id: str, limit: int = 10) -> Optional[Dict[str, Any]]:
+    """Get the top entries of the leaderboard for a specific quiz"""
     headers = get_auth_headers()
     cookies = get_auth_cookies()
 
@@ -269,6 +331,7 @@ def get_quiz_leaderboard(quiz_id: str) -> Optional[Dict[str, Any]]:
     return execute_request(
         'GET',
         f"{BASE_URL}/v1/quiz/{formatted_quiz_id}/leaderboard",
+        params={"limit": limit},
         headers=headers,
         cookies=cookies)
 
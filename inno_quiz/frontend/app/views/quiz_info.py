@@ -84,7 +84,9 @@ def show_quiz_info_page():
 
                 # Add a small explanation
                 st.caption(
-                    "Leaderboard shows the highest scores achieved by users who completed this quiz, sorted by score and completion time.")
+                    f"Leaderboard shows the top {len(leaderboard_entries)} of "
+                    f"{leaderboard_data.get('total_entries', len(leaderboard_entries))} attempts "
+                    "on this quiz, sorted by score and completion time.")
             else:
                 st.info("No scores yet for this quiz. Be the first to complete it!")
 
@@ -1,5 +1,7 @@
 import unittest
+from collections import OrderedDict
 from unittest.mock import patch, MagicMock
+import requests
 from requests.exceptions import ConnectionError
 import streamlit as st
 from frontend.app.utils.api import create_quiz, get_user_quizzes
@@ -68,6 +70,54 @@ class TestConnectionHandling(unittest.TestCase):
         mock_socket_instance.connect_ex.assert_called_once_with(('localhost', 8000))
         self.assertTrue(result)
 
+    @patch('frontend.app.utils.api.is_backend_available', return_value=True)
+    @patch('frontend.app.utils.api.requests.get')
+    def test_revalidated_responses_are_bounded_per_session(self, mock_get, mock_available):
+        """Test that revalidated responses are kept in the session and the oldest are dropped"""
+        from frontend.app.utils import api
+
+        st.session_state['etag_cache'] = OrderedDict()
+        response = MagicMock(status_code=200, headers={"ETag": '"1"'})
+        response.json.return_value = {"name": "Quiz"}
+        mock_get.return_value = response
+
+        # Fetch one URL more than the cache holds
+        with patch.object(api, 'ETAG_CACHE_MAX_ENTRIES', 2):
+            for quiz_id in ("a", "b", "c"):
+                api.execute_request('GET', f"{api.BASE_URL}/v1/quiz/{quiz_id}", revalidate=True)
+
+        # Only the two most recent responses are kept, in this session's state
+        urls = [url for _, url in st.session_state['etag_cache']]
+        self.assertEqual(urls, [f"{api.BASE_URL}/v1/quiz/b", f"{api.BASE_URL}/v1/quiz/c"])
+
+    @patch('frontend.app.utils.api.is_backend_available', return_value=True)
+    @patch('frontend.app.utils.api.requests.get')
+    @patch('frontend.app.utils.api.requests.post')
+    def test_routing_cookies_are_kept_for_the_session(self, mock_post, mock_get, mock_available):
+        """Test reads after a write send the backend's read_primary cookie, not others"""
+        from frontend.app.utils import api
+
+        st.session_state['cookie_jar'] = requests.cookies.RequestsCookieJar()
+        written = MagicMock(status_code=201, headers={})
+        written.json.return_value = {"id": 1}
+        written.cookies = requests.cookies.RequestsCookieJar()
+        written.cookies.set("read_primary", "1")
+        written.cookies.set("access_token", "Bearer old")
+        mock_post.return_value = written
+        read = MagicMock(status_code=200, headers={})
+        read.json.return_value = {"entries": []}
+        read.cookies = requests.cookies.RequestsCookieJar()
+        mock_get.return_value = read
+
+        # Write, then read
+        api.execute_request('POST', f"{api.BASE_URL}/v1/quiz/", json={})
+        api.execute_request('GET', f"{api.BASE_URL}/v1/quiz/a/leaderboard")
+
+        # The read carries the routing cookie only
+        sent = mock_get.call_args.kwargs["cookies"]
+        self.assertEqual(sent.get("read_primary"), "1")
+        self.assertIsNone(sent.get("access_token"))
+
 
 if __name__ == '__main__':
     unittest.main()